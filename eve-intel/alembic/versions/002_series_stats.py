@@ -0,0 +1,39 @@
+"""Rolling series statistics
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Welford state per (item, hub, window)
+    op.create_table(
+        'analytics_series_stats',
+        sa.Column('item_id', sa.BigInteger(), nullable=False),
+        sa.Column('hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('window_days', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('mean', sa.Float(), nullable=False),
+        sa.Column('m2', sa.Float(), nullable=False),
+        sa.Column('last_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('item_id', 'hub_id', 'window_days')
+    )
+    op.create_index('idx_series_stats_window_hub', 'analytics_series_stats', ['window_days', 'hub_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_series_stats')
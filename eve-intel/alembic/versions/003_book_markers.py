@@ -0,0 +1,36 @@
+"""Order book change markers
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Book hash per (item, hub) as of the last saved analytics run
+    op.create_table(
+        'analytics_book_marker',
+        sa.Column('item_id', sa.BigInteger(), nullable=False),
+        sa.Column('hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('book_hash', sa.String(length=64), nullable=False),
+        sa.Column('run_id', sa.BigInteger(), nullable=False),
+        sa.Column('params_key', sa.String(length=255), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('item_id', 'hub_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_book_marker')
@@ -0,0 +1,27 @@
+"""Run metadata
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Execution details per run (workers, timings, scaling efficiency)
+    op.add_column('analytics_arbitrage_run', sa.Column('meta', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analytics_arbitrage_run', 'meta')
@@ -0,0 +1,38 @@
+"""Empirical decay buckets
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Spread survival curves per (margin, liquidity, volatility) bucket
+    op.create_table(
+        'analytics_decay_bucket',
+        sa.Column('margin_bucket', sa.Integer(), nullable=False),
+        sa.Column('liquidity_bucket', sa.Integer(), nullable=False),
+        sa.Column('volatility_bucket', sa.Integer(), nullable=False),
+        sa.Column('samples', sa.Integer(), nullable=False),
+        sa.Column('events', sa.Integer(), nullable=False),
+        sa.Column('median_hours', sa.Float(), nullable=True),
+        sa.Column('survival', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('margin_bucket', 'liquidity_bucket', 'volatility_bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_decay_bucket')
@@ -0,0 +1,27 @@
+"""Series liquidity
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Trimmed mean daily traded ISK, cached next to the rolling statistics
+    op.add_column('analytics_series_stats', sa.Column('liquidity_isk', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analytics_series_stats', 'liquidity_isk')
@@ -0,0 +1,29 @@
+"""Series price bands
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-03-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lowest and highest traded price over the window, used to prune hopeless pairs
+    op.add_column('analytics_series_stats', sa.Column('price_low', sa.Float(), nullable=True))
+    op.add_column('analytics_series_stats', sa.Column('price_high', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analytics_series_stats', 'price_high')
+    op.drop_column('analytics_series_stats', 'price_low')
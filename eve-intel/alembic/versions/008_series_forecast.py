@@ -0,0 +1,39 @@
+"""Series forecasts
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Online Holt forecaster state per (item, hub) series
+    op.create_table(
+        'analytics_series_forecast',
+        sa.Column('item_id', sa.BigInteger(), nullable=False),
+        sa.Column('hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('level', sa.Float(), nullable=False),
+        sa.Column('trend', sa.Float(), nullable=False),
+        sa.Column('observations', sa.Integer(), nullable=False),
+        sa.Column('last_date', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('item_id', 'hub_id')
+    )
+    op.create_index('idx_series_forecast_hub', 'analytics_series_forecast', ['hub_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_series_forecast_hub', table_name='analytics_series_forecast')
+    op.drop_table('analytics_series_forecast')
@@ -0,0 +1,39 @@
+"""Keyset pagination indexes for arbitrage items
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-03-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pages of a run ordered by (ev_isk, id); filter columns included for index-only filtering
+    op.create_index(
+        'idx_arb_item_run_ev',
+        'analytics_arbitrage_item',
+        ['run_id', 'ev_isk', 'id'],
+        postgresql_include=['item_id', 'from_hub_id', 'to_hub_id', 'net_margin_pct', 'decay_score'],
+    )
+    # Pages of one route within a run
+    op.create_index(
+        'idx_arb_item_run_route',
+        'analytics_arbitrage_item',
+        ['run_id', 'from_hub_id', 'to_hub_id', 'ev_isk', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_arb_item_run_route', table_name='analytics_arbitrage_item')
+    op.drop_index('idx_arb_item_run_ev', table_name='analytics_arbitrage_item')
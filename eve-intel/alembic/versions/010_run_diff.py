@@ -0,0 +1,43 @@
+"""Stored run-to-run diffs
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-03-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Routes added, removed or moved in each run against the run before it
+    op.create_table(
+        'analytics_run_diff',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('run_id', sa.BigInteger(), nullable=False),
+        sa.Column('base_run_id', sa.BigInteger(), nullable=False),
+        sa.Column('change', sa.String(length=16), nullable=False),
+        sa.Column('item_id', sa.BigInteger(), nullable=False),
+        sa.Column('from_hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('to_hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('ev_isk', sa.Float(), nullable=True),
+        sa.Column('net_margin_pct', sa.Float(), nullable=True),
+        sa.Column('prev_ev_isk', sa.Float(), nullable=True),
+        sa.Column('prev_net_margin_pct', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_run_diff_run', 'analytics_run_diff', ['run_id', 'change'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_run_diff_run', table_name='analytics_run_diff')
+    op.drop_table('analytics_run_diff')
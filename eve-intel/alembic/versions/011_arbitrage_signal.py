@@ -0,0 +1,73 @@
+"""Persistent arbitrage signals
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-04-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per route, upserted by every run that finds it
+    op.create_table(
+        'analytics_arbitrage_signal',
+        sa.Column('item_id', sa.BigInteger(), nullable=False),
+        sa.Column('from_hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('to_hub_id', sa.BigInteger(), nullable=False),
+        sa.Column('first_seen', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_seen', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('first_run_id', sa.BigInteger(), nullable=False),
+        sa.Column('last_run_id', sa.BigInteger(), nullable=False),
+        sa.Column('run_count', sa.Integer(), nullable=False),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('buy_price', sa.Float(), nullable=False),
+        sa.Column('sell_price', sa.Float(), nullable=False),
+        sa.Column('spread_pct', sa.Float(), nullable=False),
+        sa.Column('fees_total', sa.Float(), nullable=False),
+        sa.Column('liquidity_24h', sa.Float(), nullable=True),
+        sa.Column('ev_isk', sa.Float(), nullable=False),
+        sa.Column('net_margin_pct', sa.Float(), nullable=False),
+        sa.Column('decay_score', sa.Float(), nullable=True),
+        sa.Column('capital_required', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('item_id', 'from_hub_id', 'to_hub_id')
+    )
+    op.create_index('idx_arb_signal_last_run', 'analytics_arbitrage_signal', ['last_run_id'])
+    op.create_index('idx_arb_signal_active_ev', 'analytics_arbitrage_signal', ['active', 'ev_isk'])
+
+    # Seed from the latest completed run so runs without per-run items can carry from it
+    op.execute(
+        """
+        INSERT INTO analytics_arbitrage_signal (
+            item_id, from_hub_id, to_hub_id, first_seen, last_seen, first_run_id,
+            last_run_id, run_count, active, buy_price, sell_price, spread_pct, fees_total,
+            liquidity_24h, ev_isk, net_margin_pct, decay_score, capital_required
+        )
+        SELECT DISTINCT ON (i.item_id, i.from_hub_id, i.to_hub_id)
+            i.item_id, i.from_hub_id, i.to_hub_id, r.created_at, r.created_at, r.run_id,
+            r.run_id, 1, true, i.buy_price, i.sell_price, i.spread_pct, i.fees_total,
+            i.liquidity_24h, i.ev_isk, i.net_margin_pct, i.decay_score, i.capital_required
+        FROM analytics_arbitrage_item i
+        JOIN (
+            SELECT run_id, created_at FROM analytics_arbitrage_run
+            WHERE status = 'completed' ORDER BY run_id DESC LIMIT 1
+        ) r ON r.run_id = i.run_id
+        ORDER BY i.item_id, i.from_hub_id, i.to_hub_id, i.ev_isk DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_arb_signal_active_ev', table_name='analytics_arbitrage_signal')
+    op.drop_index('idx_arb_signal_last_run', table_name='analytics_arbitrage_signal')
+    op.drop_table('analytics_arbitrage_signal')
@@ -0,0 +1,30 @@
+"""Run compaction marker
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-04-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Set when retention downsamples a run to its top N items
+    op.add_column(
+        'analytics_arbitrage_run',
+        sa.Column('compacted_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('analytics_arbitrage_run', 'compacted_at')
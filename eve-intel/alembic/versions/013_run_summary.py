@@ -0,0 +1,117 @@
+"""Per-run summary rows for dashboards
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-04-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from eve_intel.settings import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per run with its aggregates, written when the run is saved
+    op.create_table(
+        'analytics_run_summary',
+        sa.Column('run_id', sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('candidates', sa.Integer(), nullable=False),
+        sa.Column('items', sa.Integer(), nullable=False),
+        sa.Column('hub_pairs', sa.Integer(), nullable=False),
+        sa.Column('ev_total', sa.Float(), nullable=False),
+        sa.Column('ev_p50', sa.Float(), nullable=True),
+        sa.Column('ev_p90', sa.Float(), nullable=True),
+        sa.Column('ev_p99', sa.Float(), nullable=True),
+        sa.Column('ev_max', sa.Float(), nullable=True),
+        sa.Column('margin_avg', sa.Float(), nullable=True),
+        sa.Column('capital_total', sa.Float(), nullable=False),
+        sa.Column('best_by_pair', sa.JSON(), nullable=False),
+        sa.Column('top', sa.JSON(), nullable=False),
+        sa.Column('stage_seconds', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('run_id')
+    )
+    op.create_index('idx_run_summary_created', 'analytics_run_summary', ['created_at'])
+
+    # Backfill completed runs from their stored items (no stage timings were recorded).
+    # Compacted runs only kept their top items, so their counts and EV aggregates come
+    # from the totals retention recorded in meta->'compaction'; their percentiles are
+    # unknown and item, pair and per-pair counts cover the kept items only
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO analytics_run_summary (
+                run_id, created_at, candidates, items, hub_pairs, ev_total, ev_p50, ev_p90,
+                ev_p99, ev_max, margin_avg, capital_total, best_by_pair, top
+            )
+            SELECT
+                r.run_id, r.created_at,
+                CASE WHEN r.compacted_at IS NULL THEN COUNT(i.id)
+                    ELSE (r.meta->'compaction'->>'items')::int END,
+                COUNT(DISTINCT i.item_id),
+                COUNT(DISTINCT (i.from_hub_id, i.to_hub_id)),
+                CASE WHEN r.compacted_at IS NULL THEN COALESCE(SUM(i.ev_isk), 0)
+                    ELSE COALESCE((r.meta->'compaction'->>'ev_total')::float, 0) END,
+                CASE WHEN r.compacted_at IS NULL
+                    THEN PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY i.ev_isk) END,
+                CASE WHEN r.compacted_at IS NULL
+                    THEN PERCENTILE_CONT(0.9) WITHIN GROUP (ORDER BY i.ev_isk) END,
+                CASE WHEN r.compacted_at IS NULL
+                    THEN PERCENTILE_CONT(0.99) WITHIN GROUP (ORDER BY i.ev_isk) END,
+                CASE WHEN r.compacted_at IS NULL THEN MAX(i.ev_isk)
+                    ELSE (r.meta->'compaction'->>'ev_max')::float END,
+                CASE WHEN r.compacted_at IS NULL THEN AVG(i.net_margin_pct)
+                    ELSE (r.meta->'compaction'->>'margin_avg')::float END,
+                CASE WHEN r.compacted_at IS NULL THEN COALESCE(SUM(i.capital_required), 0)
+                    ELSE COALESCE((r.meta->'compaction'->>'capital_total')::float, 0) END,
+                COALESCE(
+                    (
+                        SELECT json_agg(p ORDER BY p.ev_isk DESC)
+                        FROM (
+                            SELECT DISTINCT ON (from_hub_id, to_hub_id)
+                                from_hub_id, to_hub_id, COUNT(*) OVER w AS candidates,
+                                SUM(ev_isk) OVER w AS ev_total, item_id, ev_isk, net_margin_pct
+                            FROM analytics_arbitrage_item
+                            WHERE run_id = r.run_id
+                            WINDOW w AS (PARTITION BY from_hub_id, to_hub_id)
+                            ORDER BY from_hub_id, to_hub_id, ev_isk DESC
+                        ) p
+                    ),
+                    '[]'::json
+                ),
+                COALESCE(
+                    (
+                        SELECT json_agg(t ORDER BY t.ev_isk DESC)
+                        FROM (
+                            SELECT item_id, from_hub_id, to_hub_id, buy_price, sell_price,
+                                net_margin_pct, ev_isk, capital_required
+                            FROM analytics_arbitrage_item
+                            WHERE run_id = r.run_id
+                            ORDER BY ev_isk DESC
+                            LIMIT :top_n
+                        ) t
+                    ),
+                    '[]'::json
+                )
+            FROM analytics_arbitrage_run r
+            LEFT JOIN analytics_arbitrage_item i ON i.run_id = r.run_id
+            WHERE r.status = 'completed'
+            GROUP BY r.run_id
+            """
+        ).bindparams(top_n=settings.summary_top_n)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_run_summary_created', table_name='analytics_run_summary')
+    op.drop_table('analytics_run_summary')
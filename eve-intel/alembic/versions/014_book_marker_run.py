@@ -0,0 +1,28 @@
+"""Book marker lookup by run
+
+Revision ID: 014
+Revises: 013
+Create Date: 2025-04-26 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Incremental planning reads the markers of the base run and parameters only
+    op.create_index(
+        'idx_book_marker_run', 'analytics_book_marker', ['run_id', 'params_key']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_book_marker_run', table_name='analytics_book_marker')
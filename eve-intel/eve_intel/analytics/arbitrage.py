@@ -1,30 +1,64 @@
 """Arbitrage discovery and analysis."""
 
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import List, Optional
-
+import heapq
+import math
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
-
-from eve_intel.analytics.fees import (
-    calculate_net_margin_pct,
-    calculate_spread_pct,
-    calculate_total_fees,
+from sqlalchemy.orm import Session
+
+from eve_intel.analytics.books import MarketBooks
+from eve_intel.analytics.decay import DecayTable, load_decay_table
+from eve_intel.analytics.fees import FeeProfile, calculate_spread_pct, default_fee_profile
+from eve_intel.analytics.pruning import PairPruner
+from eve_intel.analytics.quality import load_clean_books
+from eve_intel.analytics.risk import calculate_decay_score
+from eve_intel.analytics.routes import RouteGraph, load_route_graph
+from eve_intel.analytics.station import StationTradeCandidate, scan_station_trades
+from eve_intel.analytics.stats import (
+    liquidity_as_of,
+    load_forecast_drift,
+    load_liquidity,
+    load_price_bands,
+    load_volatility,
+    price_bands_as_of,
+    volatility_as_of,
 )
-from eve_intel.analytics.risk import calculate_decay_score, calculate_price_volatility
+from eve_intel.db.models import AnalyticsArbitrageItem, AnalyticsArbitrageSignal
 from eve_intel.db.repositories import (
     ArbitrageItemRepository,
     ArbitrageRunRepository,
+    ArbitrageSignalRepository,
+    BookMarkerRepository,
+    MarketRepository,
     OrderSnapshotRepository,
     PriceHistoryRepository,
+    RunDiffRepository,
+    RunSummaryRepository,
 )
 from eve_intel.logging import get_logger
 from eve_intel.settings import settings
 
 logger = get_logger(__name__)
 
+# Saved results come from per-run items or, when those are not stored, from signals
+StoredResult = Union[AnalyticsArbitrageItem, AnalyticsArbitrageSignal]
 
-@dataclass
+# 24h liquidity assumed for the demo quotes used when no order snapshots exist
+MOCK_LIQUIDITY_ISK_24H = 1_500_000_000.0
+
+
+class RunItemsNotStoredError(Exception):
+    """Raised when a past run's results are asked for but per-run items are not stored."""
+
+
+@dataclass(slots=True)
 class ArbitrageCandidate:
     """Arbitrage opportunity candidate."""
 
@@ -40,60 +74,639 @@ class ArbitrageCandidate:
     net_margin_pct: float
     decay_score: float
     capital_required: float
+    jumps: Optional[int] = None
+    ev_per_jump: Optional[float] = None
+    lifetime_hours: Optional[float] = None
+    forecast_sell_price: Optional[float] = None
+    forecast_ev_isk: Optional[float] = None
+
+
+@dataclass
+class QuoteColumns:
+    """Fee-independent route inputs in columnar form, shared across fee profiles."""
+
+    item_id: array = field(default_factory=lambda: array("q"))
+    from_hub_id: array = field(default_factory=lambda: array("q"))
+    to_hub_id: array = field(default_factory=lambda: array("q"))
+    buy_price: array = field(default_factory=lambda: array("d"))
+    sell_price: array = field(default_factory=lambda: array("d"))
+    liquidity_24h: array = field(default_factory=lambda: array("d"))
+    volatility: array = field(default_factory=lambda: array("d"))
+    # Sell price expected at the destination once the haul arrives
+    exit_price: array = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        return len(self.item_id)
+
+    def append(
+        self,
+        item_id: int,
+        from_hub_id: int,
+        to_hub_id: int,
+        buy_price: float,
+        sell_price: float,
+        liquidity_24h: float,
+        volatility: float = 0.0,
+        exit_price: Optional[float] = None,
+    ) -> None:
+        """Append one route; the exit price defaults to the current sell price."""
+        self.item_id.append(item_id)
+        self.from_hub_id.append(from_hub_id)
+        self.to_hub_id.append(to_hub_id)
+        self.buy_price.append(buy_price)
+        self.sell_price.append(sell_price)
+        self.liquidity_24h.append(liquidity_24h)
+        self.volatility.append(volatility)
+        self.exit_price.append(sell_price if exit_price is None else exit_price)
+
+    def take(self, rows: Iterable[int]) -> "QuoteColumns":
+        """Copy the given rows into a new set of columns."""
+        rows = list(rows)
+        return QuoteColumns(
+            **{
+                name: array(column.typecode, (column[i] for i in rows))
+                for name, column in vars(self).items()
+            }
+        )
+
+
+@dataclass
+class CandidateColumns:
+    """Fee-dependent results per quote row, in columnar form."""
+
+    quotes: QuoteColumns
+    fees_total: array
+    net_margin_pct: array
+    ev_isk: array
+    capital_required: array
+    forecast_ev_isk: array
+    decay: Optional[DecayTable] = None
+
+    def __len__(self) -> int:
+        return len(self.ev_isk)
+
+    def row(self, i: int) -> ArbitrageCandidate:
+        """
+        Materialize one row as a candidate; spread and decay are computed here.
+
+        Decay comes from the fitted decay table when the row's bucket has one,
+        otherwise from the heuristic score.
+        """
+        q = self.quotes
+        buy_price = q.buy_price[i]
+        sell_price = q.sell_price[i]
+        margin = self.net_margin_pct[i]
+
+        estimate = None
+        if self.decay is not None:
+            estimate = self.decay.lookup(margin, q.liquidity_24h[i], q.volatility[i])
+        if estimate is not None:
+            decay_score, lifetime_hours = estimate
+        else:
+            decay_score = calculate_decay_score(margin, q.liquidity_24h[i], q.volatility[i])
+            lifetime_hours = None
+
+        return ArbitrageCandidate(
+            item_id=q.item_id[i],
+            from_hub_id=q.from_hub_id[i],
+            to_hub_id=q.to_hub_id[i],
+            buy_price=buy_price,
+            sell_price=sell_price,
+            spread_pct=calculate_spread_pct(buy_price, sell_price),
+            fees_total=self.fees_total[i],
+            liquidity_24h=q.liquidity_24h[i],
+            ev_isk=self.ev_isk[i],
+            net_margin_pct=margin,
+            decay_score=decay_score,
+            capital_required=self.capital_required[i],
+            lifetime_hours=lifetime_hours,
+            forecast_sell_price=q.exit_price[i],
+            forecast_ev_isk=self.forecast_ev_isk[i],
+        )
+
+
+def score_quotes(
+    quotes: QuoteColumns,
+    profile: FeeProfile,
+    capture_ratio: float,
+    decay: Optional[DecayTable] = None,
+) -> CandidateColumns:
+    """
+    Apply a fee profile to every quote row and compute fees, net margin and EV.
+
+    Forecast EV is the same trade sold at the quote's exit price instead.
+    """
+    broker = profile.broker_fee_pct / 100.0
+    # Sell side pays broker fee + sales tax
+    sell_rate = broker + profile.sales_tax_pct / 100.0
+
+    buy = quotes.buy_price
+    sell = quotes.sell_price
+    n = len(quotes)
+
+    fees_total = array("d", (buy[i] * broker + sell[i] * sell_rate for i in range(n)))
+    net_margin_pct = array(
+        "d",
+        (
+            ((sell[i] - buy[i] - fees_total[i]) / buy[i]) * 100.0 if buy[i] > 0 else 0.0
+            for i in range(n)
+        ),
+    )
+    # Capital required (assume 1 day of trading at capture ratio)
+    capital_required = array("d", (liq * capture_ratio for liq in quotes.liquidity_24h))
+    # Estimate EV based on liquidity and margin
+    ev_isk = array("d", (capital_required[i] * net_margin_pct[i] / 100.0 for i in range(n)))
+    exit_ = quotes.exit_price
+    forecast_ev_isk = array(
+        "d",
+        (
+            capital_required[i] * (exit_[i] * (1 - sell_rate) - buy[i] * (1 + broker)) / buy[i]
+            if buy[i] > 0
+            else 0.0
+            for i in range(n)
+        ),
+    )
+
+    return CandidateColumns(
+        quotes=quotes,
+        fees_total=fees_total,
+        net_margin_pct=net_margin_pct,
+        ev_isk=ev_isk,
+        capital_required=capital_required,
+        forecast_ev_isk=forecast_ev_isk,
+        decay=decay,
+    )
+
+
+def quotes_from_books(
+    books: MarketBooks,
+    only_items: Optional[Iterable[int]] = None,
+    pruner: Optional[PairPruner] = None,
+) -> QuoteColumns:
+    """
+    Pair every hub's best ask with the best ask at every other hub of the same item.
+
+    With a ``pruner``, items and hub pairs whose historical price bands can
+    never reach its margin threshold are skipped before any quote is built.
+    """
+    quotes = QuoteColumns()
+    for item_id, rows in books.rows_by_item(only_items).items():
+        if pruner is not None and pruner.skip_item(books, rows):
+            continue
+        for i in rows:
+            buy_price = books.best_ask[i]
+            if math.isinf(buy_price):
+                continue
+            for j in rows:
+                sell_price = books.best_ask[j]
+                if j == i or math.isinf(sell_price) or sell_price <= buy_price:
+                    continue
+                if pruner is not None and pruner.skip_pair(books, i, j):
+                    continue
+                quotes.append(
+                    item_id,
+                    books.hub_id[i],
+                    books.hub_id[j],
+                    buy_price,
+                    sell_price,
+                    # The thinner market caps how much of the route we can trade
+                    min(books.liquidity[i], books.liquidity[j]),
+                    # Either leg moving against us hurts, so take the worse hub
+                    max(books.volatility[i], books.volatility[j]),
+                    sell_price * (1 + books.forecast_drift[j]),
+                )
+    return quotes
+
+
+def rank_key(by_forecast: bool = False) -> Callable[[ArbitrageCandidate], float]:
+    """Sort key of ranked candidates: EV, or forecast EV when ranking by forecast."""
+    if by_forecast:
+        return lambda c: c.forecast_ev_isk if c.forecast_ev_isk is not None else c.ev_isk
+    return lambda c: c.ev_isk
+
+
+def rank_candidates(
+    candidates: CandidateColumns,
+    min_ev: float,
+    min_margin: float,
+    top_k: Optional[int] = None,
+    by_forecast: bool = False,
+) -> List[ArbitrageCandidate]:
+    """
+    Filter rows by thresholds and return them ranked by EV descending.
+
+    With ``by_forecast`` the EV threshold and ranking use the forecast EV at
+    the haul horizon instead. With ``top_k`` the best rows are selected with
+    a bounded heap instead of a full sort, and only those rows are
+    materialized as candidates.
+    """
+    ev = candidates.forecast_ev_isk if by_forecast else candidates.ev_isk
+    margin = candidates.net_margin_pct
+    passing = [i for i in range(len(candidates)) if ev[i] >= min_ev and margin[i] >= min_margin]
+
+    if top_k is not None and top_k < len(passing):
+        selected = heapq.nlargest(top_k, passing, key=ev.__getitem__)
+    else:
+        selected = sorted(passing, key=ev.__getitem__, reverse=True)
+
+    return [candidates.row(i) for i in selected]
 
 
 class ArbitrageEngine:
     """Arbitrage discovery and calculation engine."""
 
-    def __init__(self, session: AsyncSession) -> None:
+    # Share of daily liquidity we assume we can capture
+    capture_ratio = 0.1
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        workers: Optional[int] = None,
+        as_of: Optional[datetime] = None,
+        decay: Optional[DecayTable] = None,
+    ) -> None:
         self.session = session
+        self.workers = workers or settings.analytics_workers
+        # Evaluate the market as it was at this time (backtests), latest when None
+        self.as_of = as_of
+        self.run_meta: dict = {}
         self.order_repo = OrderSnapshotRepository(session)
         self.price_repo = PriceHistoryRepository(session)
         self.run_repo = ArbitrageRunRepository(session)
         self.item_repo = ArbitrageItemRepository(session)
+        self.marker_repo = BookMarkerRepository(session)
+        self.diff_repo = RunDiffRepository(session)
+        self.signal_repo = ArbitrageSignalRepository(session)
+        self.summary_repo = RunSummaryRepository(session)
+        self._books: Optional[MarketBooks] = None
+        self._routes: Optional[RouteGraph] = None
+        self._routes_loaded = False
+        self._decay: Optional[DecayTable] = decay
+        self._params_key: Optional[str] = None
+        # Diff message of a run saved with publish=False, for the caller to publish
+        self.unpublished_diff: Optional[dict] = None
 
     async def find_arbitrage_opportunities(
         self,
         min_ev_isk: Optional[float] = None,
         min_margin_pct: Optional[float] = None,
         min_liquidity: Optional[float] = None,
+        fee_profile: Optional[FeeProfile] = None,
+        incremental: bool = False,
+        top_k: Optional[int] = None,
+        rank_by_forecast: Optional[bool] = None,
     ) -> List[ArbitrageCandidate]:
-        """Find cross-hub arbitrage opportunities."""
+        """
+        Find cross-hub arbitrage opportunities.
+
+        With ``incremental=True`` only items whose order books changed since the
+        last saved run are recomputed; results for the other items are carried
+        forward from that run. Falls back to a full recomputation when the last
+        run used other parameters or is older than the full refresh interval.
+        Forecasts move even when books do not, so ranking by forecast always
+        recomputes in full, as does ``top_k``: the base run only stored its top
+        K, so an unchanged item ranked below them could not be promoted.
+
+        Carried rows keep the base run's liquidity, EV and decay score and have
+        no lifetime or forecast fields; the full refresh interval bounds how
+        stale those get.
+        """
+        profile = fee_profile or default_fee_profile()
+        by_forecast = settings.rank_by_forecast if rank_by_forecast is None else rank_by_forecast
+        params_key = self._make_params_key(
+            profile, min_ev_isk, min_margin_pct, min_liquidity, top_k
+        )
+
+        only_items: Optional[Set[int]] = None
+        carried: List[ArbitrageCandidate] = []
+        if incremental and not by_forecast and top_k is None:
+            plan = await self._plan_incremental(params_key)
+            if plan is not None:
+                only_items, base_run_id = plan
+                with self._stage("carry_forward"):
+                    stored = await self._stored_results(base_run_id, sorted(only_items))
+                    carried = [self._from_stored(row) for row in stored]
+                    await self._annotate_routes(carried)
+
+        scenarios = await self.find_arbitrage_scenarios(
+            [profile],
+            min_ev_isk=min_ev_isk,
+            min_margin_pct=min_margin_pct,
+            min_liquidity=min_liquidity,
+            only_items=only_items,
+            top_k=top_k,
+            rank_by_forecast=by_forecast,
+        )
+        self._params_key = params_key
+
+        if only_items is None:
+            return scenarios[profile.name]
+
+        results = scenarios[profile.name] + carried
+        results.sort(key=lambda x: x.ev_isk, reverse=True)
+
+        logger.info(
+            "arbitrage_incremental",
+            recomputed_items=len(only_items),
+            recomputed=len(scenarios[profile.name]),
+            carried=len(carried),
+        )
+
+        return results
+
+    async def find_arbitrage_scenarios(
+        self,
+        profiles: List[FeeProfile],
+        min_ev_isk: Optional[float] = None,
+        min_margin_pct: Optional[float] = None,
+        min_liquidity: Optional[float] = None,
+        only_items: Optional[Iterable[int]] = None,
+        top_k: Optional[int] = None,
+        rank_by_forecast: Optional[bool] = None,
+    ) -> Dict[str, List[ArbitrageCandidate]]:
+        """
+        Evaluate several fee profiles against the same market data in one pass.
+
+        Quotes, spreads, liquidity and volatility are loaded once; only the
+        fee-dependent columns are recomputed per profile. With more than one
+        worker, order books are sharded by item across a process pool.
+        Results are ranked by EV, or by forecast EV at the haul horizon with
+        ``rank_by_forecast``, and cut to ``top_k`` when given.
+        """
         min_ev = min_ev_isk or settings.min_ev_isk
         min_margin = min_margin_pct or settings.min_net_margin_pct
         min_liq = min_liquidity or settings.min_liquidity_isk_24h
+        by_forecast = settings.rank_by_forecast if rank_by_forecast is None else rank_by_forecast
+        self.run_meta["rank_by"] = "forecast_ev" if by_forecast else "ev"
 
         logger.info(
             "finding_arbitrage",
             min_ev=min_ev,
             min_margin=min_margin,
             min_liquidity=min_liq,
+            profiles=[p.name for p in profiles],
+        )
+
+        started = time.perf_counter()
+        with self._stage("load_books"):
+            books = await self._load_books()
+            decay = await self._load_decay()
+        # Pruning uses the cheapest profile so no profile loses a reachable pair
+        pruner = PairPruner.from_profiles(profiles, min_margin, settings.prune_band_slack_pct)
+        if self.workers > 1 and len(books) > 0:
+            # Imported here, the parallel module builds on this one
+            from eve_intel.analytics.parallel import score_books_parallel
+
+            with self._stage("score"):
+                results, meta = await score_books_parallel(
+                    books,
+                    profiles,
+                    self.workers,
+                    self.capture_ratio,
+                    (min_ev, min_margin, min_liq),
+                    only_items=sorted(only_items) if only_items is not None else None,
+                    top_k=top_k,
+                    decay=decay,
+                    pruner=pruner,
+                    by_forecast=by_forecast,
+                )
+            self.run_meta.update(meta)
+            for profile in profiles:
+                with self._stage("annotate"):
+                    await self._annotate_routes(results[profile.name])
+                logger.info(
+                    "arbitrage_found", profile=profile.name, filtered=len(results[profile.name])
+                )
+            return results
+
+        with self._stage("load_quotes"):
+            quotes = await self._load_quotes(only_items, pruner)
+
+        # Liquidity filter does not depend on fees, apply it once
+        liquidity = quotes.liquidity_24h
+        quotes = quotes.take(i for i in range(len(quotes)) if liquidity[i] >= min_liq)
+
+        results = {}
+        for profile in profiles:
+            with self._stage("score"):
+                candidates = self._score_quotes(quotes, profile)
+
+                # Filter by thresholds and select the best rows by EV
+                filtered = rank_candidates(candidates, min_ev, min_margin, top_k, by_forecast)
+            with self._stage("annotate"):
+                await self._annotate_routes(filtered)
+            results[profile.name] = filtered
+
+            logger.info(
+                "arbitrage_found",
+                profile=profile.name,
+                total=len(candidates),
+                filtered=len(filtered),
+            )
+
+        self.run_meta.update(
+            {
+                "workers": 1,
+                "wall_seconds": round(time.perf_counter() - started, 4),
+                "pair_pruning": pruner.stats.as_meta(),
+            }
         )
 
-        candidates = []
+        return results
 
-        # For MVP, use mock data since we need real ESI integration
-        # In production, this would fetch latest order snapshots and analyze spreads
-        candidates = await self._generate_mock_candidates()
+    async def find_station_trades(
+        self,
+        min_ev_isk: Optional[float] = None,
+        min_margin_pct: Optional[float] = None,
+        fee_profile: Optional[FeeProfile] = None,
+        top_k: Optional[int] = None,
+    ) -> List[StationTradeCandidate]:
+        """
+        Find same-hub station trading opportunities.
+
+        Scans the bid/ask spread of every book loaded for cross-hub arbitrage,
+        so running both modes on one engine costs a single order book load.
+        The best ``station_run_top_n`` trades are kept in the run metadata,
+        where read endpoints serve them from once the run is saved.
+        """
+        profile = fee_profile or default_fee_profile()
+        min_ev = min_ev_isk or settings.station_min_ev_isk
+        min_margin = min_margin_pct or settings.min_net_margin_pct
 
-        # Filter by thresholds
-        filtered = [
-            c
-            for c in candidates
-            if c.ev_isk >= min_ev
-            and c.net_margin_pct >= min_margin
-            and c.liquidity_24h >= min_liq
-        ]
+        books = await self._load_books()
+        if len(books) == 0:
+            return []
+
+        since = datetime.now(UTC) - timedelta(days=settings.station_volume_days)
+        daily_volume = await self.price_repo.get_avg_daily_volume(settings.market_hub_ids, since)
+
+        results = scan_station_trades(
+            books,
+            daily_volume,
+            profile,
+            settings.station_market_share_pct / 100.0,
+            min_ev,
+            min_margin,
+            top_k,
+        )
+        self.run_meta["station_trades"] = len(results)
+        self.run_meta["station"] = [asdict(t) for t in results[: settings.station_run_top_n]]
 
-        # Sort by EV descending
-        filtered.sort(key=lambda x: x.ev_isk, reverse=True)
+        logger.info(
+            "station_trades_found",
+            profile=profile.name,
+            books=len(books),
+            filtered=len(results),
+        )
 
-        logger.info("arbitrage_found", total=len(candidates), filtered=len(filtered))
+        return results
 
-        return filtered
+    def find_chains(
+        self,
+        candidates: List[ArbitrageCandidate],
+        max_hops: Optional[int] = None,
+        top_k: Optional[int] = None,
+    ) -> list:
+        """
+        Find the best multi-hop chains over already ranked candidates.
+
+        Pass the full threshold-passing candidate set, not a top-K cut, so
+        that weaker legs can still complete strong chains. The top chains
+        and search statistics are recorded in the run metadata.
+        """
+        # Imported here, the chains module builds on this one
+        from eve_intel.analytics.chains import find_chains
+
+        chains, stats = find_chains(
+            candidates,
+            max_hops=max_hops or settings.chain_max_hops,
+            top_k=top_k or settings.chain_top_k,
+        )
+        self.run_meta["chain_search"] = vars(stats)
+        self.run_meta["chains"] = [
+            {
+                "hubs": chain.hubs,
+                "items": [leg.item_id for leg in chain.legs],
+                "ev_isk": chain.ev_isk,
+                "jumps": chain.jumps,
+            }
+            for chain in chains
+        ]
+        return chains
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to the run's per-stage timings."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stages = self.run_meta.setdefault("stage_seconds", {})
+            stages[name] = round(stages.get(name, 0.0) + time.perf_counter() - started, 4)
+
+    def _score_quotes(self, quotes: QuoteColumns, profile: FeeProfile) -> CandidateColumns:
+        """Apply a fee profile to quotes and compute fees, margin and EV per row."""
+        return score_quotes(quotes, profile, self.capture_ratio, self._decay)
+
+    async def _load_decay(self) -> Optional[DecayTable]:
+        """Load the fitted decay table (once per engine), None when nothing is fitted."""
+        if self._decay is None:
+            # The stored table is fitted from recent spreads; historical evaluations get
+            # theirs passed in (see DecayFitter.table) and score heuristically without one
+            self._decay = (
+                DecayTable() if self.as_of is not None else await load_decay_table(self.session)
+            )
+        return self._decay or None
+
+    async def _load_routes(self) -> Optional[RouteGraph]:
+        """Load the hub route graph (once per engine), None when no adjacency data exists."""
+        if not self._routes_loaded:
+            wanted = set(settings.route_hub_ids)
+            hub_systems = {
+                m.hub_id: m.system_id
+                for m in await MarketRepository(self.session).get_all()
+                if m.hub_id in wanted and m.system_id is not None
+            }
+            self._routes = load_route_graph(
+                hub_systems, settings.route_jumps_file, settings.route_cache_dir
+            )
+            self._routes_loaded = True
+        return self._routes
+
+    async def _annotate_routes(self, candidates: List[ArbitrageCandidate]) -> None:
+        """Add jump counts and EV per jump to candidates when the route graph is available."""
+        if not candidates:
+            return
+        routes = await self._load_routes()
+        if routes is not None:
+            routes.annotate(candidates)
+
+    async def _load_books(self) -> MarketBooks:
+        """Load top-of-book arrays from the latest snapshot of each hub (once per engine)."""
+        if self._books is None:
+            # Bait and junk orders are dropped before they can become best bid/ask
+            books, quality = await load_clean_books(
+                self.session, settings.market_hub_ids, as_of=self.as_of
+            )
+            self.run_meta["order_quality"] = quality.as_meta()
+
+            # Rolling volatility, liquidity and price bands are maintained at ingestion,
+            # bulk reads here; historical evaluations recompute them from the price
+            # history window instead
+            if len(books) > 0:
+                hub_ids = sorted(set(books.hub_id))
+                if self.as_of is None:
+                    volatility = await load_volatility(self.session, hub_ids=hub_ids)
+                    liquidity = await load_liquidity(self.session, hub_ids)
+                    bands = await load_price_bands(self.session, hub_ids)
+                    # Forecaster state only describes the present, backtests run without it
+                    drift = await load_forecast_drift(
+                        self.session,
+                        hub_ids,
+                        datetime.now(UTC) + timedelta(hours=settings.forecast_haul_hours),
+                    )
+                else:
+                    volatility = await volatility_as_of(
+                        self.session, sorted(set(books.item_id)), hub_ids, self.as_of
+                    )
+                    liquidity = await liquidity_as_of(self.session, hub_ids, self.as_of)
+                    bands = await price_bands_as_of(self.session, hub_ids, self.as_of)
+                    drift = {}
+                for i in range(len(books)):
+                    key = (books.item_id[i], books.hub_id[i])
+                    books.volatility[i] = volatility.get(key, 0.0)
+                    books.liquidity[i] = liquidity.get(key, 0.0)
+                    books.forecast_drift[i] = drift.get(key, 0.0)
+                    if key in bands:
+                        books.price_low[i], books.price_high[i] = bands[key]
+
+            self._books = books
+        return self._books
+
+    async def _load_quotes(
+        self, only_items: Optional[Iterable[int]] = None, pruner: Optional[PairPruner] = None
+    ) -> QuoteColumns:
+        """Load route quotes from order books, or mock quotes when no snapshots exist."""
+        books = await self._load_books()
+        if len(books) > 0:
+            return quotes_from_books(books, only_items, pruner)
+
+        quotes = self._mock_quotes()
+        if only_items is not None:
+            wanted = set(only_items)
+            quotes = quotes.take(i for i in range(len(quotes)) if quotes.item_id[i] in wanted)
+
+        volatility = await load_volatility(self.session, hub_ids=settings.market_hub_ids)
+        for i in range(len(quotes)):
+            quotes.volatility[i] = max(
+                volatility.get((quotes.item_id[i], quotes.from_hub_id[i]), 0.0),
+                volatility.get((quotes.item_id[i], quotes.to_hub_id[i]), 0.0),
+            )
 
-    async def _generate_mock_candidates(self) -> List[ArbitrageCandidate]:
-        """Generate mock arbitrage candidates for MVP."""
+        return quotes
+
+    def _mock_quotes(self) -> QuoteColumns:
+        """Mock market quotes for MVP."""
         # Mock data for demonstration
         mock_items = [
             {
@@ -122,73 +735,288 @@ class ArbitrageEngine:
             },
         ]
 
-        candidates = []
+        quotes = QuoteColumns()
         for item in mock_items:
-            buy_price = item["buy_price"]
-            sell_price = item["sell_price"]
-
-            spread_pct = calculate_spread_pct(buy_price, sell_price)
-            fees_total = calculate_total_fees(buy_price, sell_price)
-            net_margin_pct = calculate_net_margin_pct(buy_price, sell_price)
-
-            # Mock liquidity (24h volume in ISK)
-            liquidity_24h = 1_500_000_000.0
-
-            # Estimate EV based on liquidity and margin
-            # Assume we can capture 10% of daily liquidity
-            tradeable_volume_isk = liquidity_24h * 0.1
-            ev_isk = tradeable_volume_isk * (net_margin_pct / 100.0)
-
-            # Calculate decay score
-            decay_score = calculate_decay_score(net_margin_pct, liquidity_24h)
-
-            # Capital required (assume 1 day of trading at 10% capture)
-            capital_required = tradeable_volume_isk
-
-            candidates.append(
-                ArbitrageCandidate(
-                    item_id=item["item_id"],
-                    from_hub_id=item["from_hub"],
-                    to_hub_id=item["to_hub"],
-                    buy_price=buy_price,
-                    sell_price=sell_price,
-                    spread_pct=spread_pct,
-                    fees_total=fees_total,
-                    liquidity_24h=liquidity_24h,
-                    ev_isk=ev_isk,
-                    net_margin_pct=net_margin_pct,
-                    decay_score=decay_score,
-                    capital_required=capital_required,
-                )
+            quotes.append(
+                item["item_id"],
+                item["from_hub"],
+                item["to_hub"],
+                item["buy_price"],
+                item["sell_price"],
+                MOCK_LIQUIDITY_ISK_24H,
+            )
+        return quotes
+
+    async def _generate_mock_candidates(self) -> List[ArbitrageCandidate]:
+        """Generate mock arbitrage candidates for MVP."""
+        candidates = self._score_quotes(self._mock_quotes(), default_fee_profile())
+        return [candidates.row(i) for i in range(len(candidates))]
+
+    def _make_params_key(
+        self,
+        profile: FeeProfile,
+        min_ev_isk: Optional[float],
+        min_margin_pct: Optional[float],
+        min_liquidity: Optional[float],
+        top_k: Optional[int] = None,
+    ) -> str:
+        """Identify the parameters results depend on, so carried-forward rows stay valid."""
+        return ":".join(
+            str(v)
+            for v in (
+                min_ev_isk or settings.min_ev_isk,
+                min_margin_pct or settings.min_net_margin_pct,
+                min_liquidity or settings.min_liquidity_isk_24h,
+                profile.broker_fee_pct,
+                profile.sales_tax_pct,
+                top_k,
             )
+        )
 
+    async def _plan_incremental(self, params_key: str) -> Optional[Tuple[Set[int], int]]:
+        """
+        Work out which items need recomputation against the last saved run.
+
+        Returns the changed item IDs and the run to carry the rest from, or
+        None when a full recomputation is required.
+        """
+        books = await self._load_books()
+        if len(books) == 0:
+            return None
+
+        base_run = await self.run_repo.get_latest_completed_run()
+        if base_run is None:
+            return None
+
+        created_at = base_run.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=UTC)
+        if datetime.now(UTC) - created_at > timedelta(
+            minutes=settings.incremental_full_refresh_minutes
+        ):
+            logger.info("arbitrage_full_refresh_due", base_run_id=base_run.run_id)
+            return None
+
+        previous = {
+            (m.item_id, m.hub_id): m.book_hash
+            for m in await self.marker_repo.get_for_run(base_run.run_id, params_key)
+        }
+        if not previous:
+            return None
+
+        current = books.markers()
+        changed = {key[0] for key, marker in current.items() if previous.get(key) != marker}
+        changed |= {key[0] for key in previous if key not in current}
+
+        logger.info(
+            "arbitrage_books_changed",
+            base_run_id=base_run.run_id,
+            books=len(current),
+            changed_items=len(changed),
+        )
+
+        return changed, base_run.run_id
+
+    async def _stored_results(
+        self, run_id: int, exclude_item_ids: Optional[List[int]] = None
+    ) -> List[StoredResult]:
+        """
+        Result rows of a saved run: its per-run items when those are stored,
+        otherwise the signals it was the last run to find.
+
+        Signals are the whole result of the latest completed run only; older
+        runs have lost every route a later run found again, so they raise
+        ``RunItemsNotStoredError`` rather than return a partial result.
+        """
+        if settings.store_run_items:
+            if exclude_item_ids is None:
+                return await self.item_repo.get_by_run(run_id, limit=None)
+            return await self.item_repo.get_by_run_excluding_items(run_id, exclude_item_ids)
+
+        latest = await self.run_repo.get_latest_completed_run()
+        if latest is None or latest.run_id != run_id:
+            msg = f"Results of run {run_id} are not stored, only the latest run's are"
+            raise RunItemsNotStoredError(msg)
+        return await self.signal_repo.get_by_last_run(run_id, exclude_item_ids)
+
+    async def load_run(self, run_id: int) -> List[ArbitrageCandidate]:
+        """Load a saved run's candidates, ranked by EV, with jump counts when routes are known."""
+        candidates = [self._from_stored(row) for row in await self._stored_results(run_id)]
+        await self._annotate_routes(candidates)
         return candidates
 
-    async def save_run_results(self, candidates: List[ArbitrageCandidate]) -> int:
-        """Save arbitrage run results to database."""
-        run_id = await self.run_repo.create_run()
+    async def load_run_page(
+        self,
+        run_id: int,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        **filters: Any,
+    ) -> Tuple[List[ArbitrageCandidate], Optional[Tuple[float, int]]]:
+        """
+        Load one keyset page of a saved run, filtered in the database.
+
+        Returns the page and the (``ev_isk``, ``id``) key to continue after,
+        or None on the last page. ``filters`` are those of
+        ``ArbitrageItemRepository.get_page``. Raises ``RunItemsNotStoredError``
+        when per-run items are not stored.
+        """
+        if not settings.store_run_items:
+            msg = f"Results of run {run_id} are not stored, only the latest run's signals are"
+            raise RunItemsNotStoredError(msg)
+        rows = await self.item_repo.get_page(run_id, limit + 1, after, **filters)
+        next_key = (rows[limit - 1].ev_isk, rows[limit - 1].id) if len(rows) > limit else None
+        candidates = [self._from_stored(row) for row in rows[:limit]]
+        await self._annotate_routes(candidates)
+        return candidates, next_key
+
+    @staticmethod
+    def _from_stored(row: StoredResult) -> ArbitrageCandidate:
+        """
+        Rebuild a candidate from a stored run result or signal.
+
+        Only stored columns come back: lifetime and forecast fields are None.
+        """
+        return ArbitrageCandidate(
+            item_id=row.item_id,
+            from_hub_id=row.from_hub_id,
+            to_hub_id=row.to_hub_id,
+            buy_price=row.buy_price,
+            sell_price=row.sell_price,
+            spread_pct=row.spread_pct,
+            fees_total=row.fees_total,
+            liquidity_24h=row.liquidity_24h or 0.0,
+            ev_isk=row.ev_isk,
+            net_margin_pct=row.net_margin_pct,
+            decay_score=row.decay_score or 0.0,
+            capital_required=row.capital_required,
+        )
 
-        items_data = [
-            {
-                "run_id": run_id,
-                "item_id": c.item_id,
-                "from_hub_id": c.from_hub_id,
-                "to_hub_id": c.to_hub_id,
-                "buy_price": c.buy_price,
-                "sell_price": c.sell_price,
-                "spread_pct": c.spread_pct,
-                "fees_total": c.fees_total,
-                "liquidity_24h": c.liquidity_24h,
-                "ev_isk": c.ev_isk,
-                "net_margin_pct": c.net_margin_pct,
-                "decay_score": c.decay_score,
-                "capital_required": c.capital_required,
-            }
-            for c in candidates
-        ]
+    async def save_run_results(
+        self, candidates: List[ArbitrageCandidate], publish: bool = True
+    ) -> int:
+        """
+        Save arbitrage run results to database.
+
+        The routes added, removed or moved by more than ``diff_change_pct``
+        against the previous completed run are stored alongside, as is a
+        summary row with the run's aggregates and stage timings. Once the
+        transaction commits, the run becomes the one read endpoints serve and
+        its diff against the previous run is pushed to stream clients. With
+        ``publish=False`` (runs saved for another process) the diff message
+        is left in ``unpublished_diff`` instead, for the caller to publish
+        once it has committed.
+        """
+        # Imported here, the diff, latest and summary modules build on this one
+        from eve_intel.analytics.diff import STORED_FIELDS, diff_candidates
+        from eve_intel.analytics.latest import (
+            LatestRun,
+            latest_run_cache,
+            publish_run,
+            route_volatility,
+            run_diff,
+            station_from_meta,
+        )
+        from eve_intel.analytics.summary import summarize_run
+
+        with self._stage("save"):
+            # Not the cached run, which can lag behind one another process just saved
+            base = await latest_run_cache.latest(self.session)
+            run_id = await self.run_repo.create_run()
+
+            items_data = [
+                {
+                    "run_id": run_id,
+                    "item_id": c.item_id,
+                    "from_hub_id": c.from_hub_id,
+                    "to_hub_id": c.to_hub_id,
+                    "buy_price": c.buy_price,
+                    "sell_price": c.sell_price,
+                    "spread_pct": c.spread_pct,
+                    "fees_total": c.fees_total,
+                    "liquidity_24h": c.liquidity_24h,
+                    "ev_isk": c.ev_isk,
+                    "net_margin_pct": c.net_margin_pct,
+                    "decay_score": c.decay_score,
+                    "capital_required": c.capital_required,
+                }
+                for c in candidates
+            ]
+
+            # Per-run rows are optional; the signal table keeps one row per route
+            if settings.store_run_items:
+                await self.item_repo.insert_batch(items_data)
+            await self.signal_repo.upsert_run(run_id, datetime.now(UTC), items_data)
+
+            # Record the books these results were computed from for the next incremental run
+            if self._books is not None and self._params_key is not None:
+                await self.marker_repo.upsert_batch(
+                    [
+                        {
+                            "item_id": item_id,
+                            "hub_id": hub_id,
+                            "book_hash": marker,
+                            "run_id": run_id,
+                            "params_key": self._params_key,
+                        }
+                        for (item_id, hub_id), marker in self._books.markers().items()
+                    ]
+                )
 
-        await self.item_repo.insert_batch(items_data)
-        await self.run_repo.complete_run(run_id, len(candidates))
+            if base is not None:
+                diff = diff_candidates(
+                    base.candidates,
+                    candidates,
+                    run_id,
+                    base.run_id,
+                    rel_tol=settings.diff_change_pct / 100.0,
+                    fields=STORED_FIELDS,
+                )
+                await self.diff_repo.insert_batch(diff.as_rows())
+                self.run_meta["diff"] = {
+                    "base_run_id": base.run_id,
+                    "change_pct": settings.diff_change_pct,
+                    "added": len(diff.added),
+                    "removed": len(diff.removed),
+                    "changed": len(diff.changed),
+                }
+
+            # Dashboards read this row instead of aggregating the run's items; it shares
+            # the run row's timestamp
+            created_at = await self.run_repo.get_created_at(run_id)
+            await self.summary_repo.insert(
+                summarize_run(run_id, created_at, candidates, settings.summary_top_n)
+            )
+            # Scenario reads rescore the run with the inputs it was scored with
+            volatility = await route_volatility(self.session, candidates)
+
+        # Stage timings are final once the save stage, summary insert included, has ended
+        await self.summary_repo.set_stage_seconds(run_id, self.run_meta.get("stage_seconds"))
+        await self.run_repo.complete_run(run_id, len(candidates), self.run_meta or None)
+
+        run = LatestRun(
+            run_id,
+            created_at,
+            list(candidates),
+            station_from_meta(self.run_meta),
+            volatility,
+            self._decay or None,
+        )
+        if publish:
+            # Publish once the run commits; a rollback drops the pending publish so a
+            # later commit on this session cannot announce a run that never landed
+            sync_session = self.session.sync_session
+
+            def committed(_: Session) -> None:
+                event.remove(sync_session, "after_rollback", rolled_back)
+                publish_run(run, base)
+
+            def rolled_back(_: Session) -> None:
+                event.remove(sync_session, "after_commit", committed)
+
+            event.listen(sync_session, "after_commit", committed, once=True)
+            event.listen(sync_session, "after_rollback", rolled_back, once=True)
+        else:
+            self.unpublished_diff = run_diff(run, base)
 
         logger.info("saved_arbitrage_run", run_id=run_id, num_candidates=len(candidates))
 
@@ -0,0 +1,327 @@
+"""Historical backtests replaying stored snapshots through the arbitrage engine."""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.books import MarketBooks
+from eve_intel.analytics.decay import DecayFitter, DecayTable
+from eve_intel.analytics.fees import FeeProfile, default_fee_profile
+from eve_intel.analytics.quality import load_clean_books
+from eve_intel.db.repositories import OrderSnapshotRepository
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BacktestResult:
+    """Predicted versus realised outcome of one historical candidate."""
+
+    snapshot_ts: datetime
+    item_id: int
+    from_hub_id: int
+    to_hub_id: int
+    buy_price: float
+    predicted_sell_price: float
+    realised_sell_price: Optional[float]
+    predicted_margin_pct: float
+    realised_margin_pct: Optional[float]
+    predicted_ev_isk: float
+    realised_ev_isk: Optional[float]
+    decay_score: float
+
+    @property
+    def filled(self) -> bool:
+        """Whether the sell side could be executed in a later snapshot."""
+        return self.realised_ev_isk is not None
+
+
+@dataclass
+class BacktestSummary:
+    """Aggregate accuracy of predicted EV over a backtest, mergeable across windows."""
+
+    snapshots: int = 0
+    candidates: int = 0
+    filled: int = 0
+    profitable: int = 0
+    predicted_ev_isk: float = 0.0
+    realised_ev_isk: float = 0.0
+    abs_error_isk: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    def add(self, result: BacktestResult) -> None:
+        """Fold one candidate outcome into the totals."""
+        self.candidates += 1
+        if not result.filled:
+            return
+        self.filled += 1
+        self.profitable += result.realised_ev_isk > 0
+        self.predicted_ev_isk += result.predicted_ev_isk
+        self.realised_ev_isk += result.realised_ev_isk
+        self.abs_error_isk += abs(result.realised_ev_isk - result.predicted_ev_isk)
+
+    def merge(self, other: "BacktestSummary") -> None:
+        """Add another window's totals."""
+        for name, value in vars(other).items():
+            if name != "elapsed_seconds":
+                setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def realisation_pct(self) -> float:
+        """Realised EV as a share of predicted EV over filled candidates."""
+        if not self.predicted_ev_isk:
+            return 0.0
+        return self.realised_ev_isk / self.predicted_ev_isk * 100.0
+
+    @property
+    def hit_rate_pct(self) -> float:
+        """Share of filled candidates that made money."""
+        return self.profitable / self.filled * 100.0 if self.filled else 0.0
+
+    @property
+    def mean_abs_error_isk(self) -> float:
+        """Mean absolute EV error per filled candidate."""
+        return self.abs_error_isk / self.filled if self.filled else 0.0
+
+
+async def _settlement_books(session: AsyncSession, due: datetime) -> MarketBooks:
+    """Top-of-book arrays from each hub's first snapshot at or after ``due``, junk filtered."""
+    books, _ = await load_clean_books(session, settings.market_hub_ids, as_of=due, first_after=True)
+    return books
+
+
+async def replay_window(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    horizon: timedelta,
+    profile: Optional[FeeProfile] = None,
+    thresholds: Tuple[Optional[float], Optional[float], Optional[float]] = (None, None, None),
+    fitter: Optional[DecayFitter] = None,
+) -> AsyncIterator[BacktestResult]:
+    """
+    Replay every snapshot time in [start, end) and yield candidate outcomes.
+
+    At each snapshot the engine runs on the market as it was then, scoring
+    decay with the table the nightly fit would have produced that day, from
+    earlier snapshots only. Tables come from ``fitter``, which consecutive
+    windows share so the fit history is read once rather than per window. Each
+    candidate is bought at its predicted price and sold at the destination's
+    best ask (best bid if no asks remain) in the destination's first snapshot
+    at or after ``horizon`` later. Candidates whose destination has no such
+    snapshot are yielded unfilled. Only two snapshots are held at a time.
+    """
+    profile = profile or default_fee_profile()
+    broker = profile.broker_fee_pct / 100.0
+    sell_rate = broker + profile.sales_tax_pct / 100.0
+    min_ev, min_margin, min_liq = thresholds
+
+    times = await OrderSnapshotRepository(session).get_snapshot_times(
+        settings.market_hub_ids, start, end
+    )
+    if fitter is None and times:
+        fitter = DecayFitter(session, start - timedelta(days=settings.decay_fit_days), profile)
+
+    day: Optional[datetime] = None
+    decay: Optional[DecayTable] = None
+    for ts in times:
+        # Refit at each day boundary from the spreads the fitter has already walked
+        midnight = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+        if midnight != day:
+            day = midnight
+            decay = await fitter.table(day)
+
+        engine = ArbitrageEngine(session, workers=1, as_of=ts, decay=decay)
+        candidates = await engine.find_arbitrage_opportunities(
+            min_ev_isk=min_ev,
+            min_margin_pct=min_margin,
+            min_liquidity=min_liq,
+            fee_profile=profile,
+        )
+        if not candidates:
+            continue
+
+        later = await _settlement_books(session, ts + horizon)
+        index = later.index()
+
+        for c in candidates:
+            realised_sell = None
+            row = index.get((c.item_id, c.to_hub_id))
+            if row is not None and not math.isinf(later.best_ask[row]):
+                realised_sell = later.best_ask[row]
+            elif row is not None and later.best_bid[row] > 0:
+                realised_sell = later.best_bid[row]
+
+            realised_margin = realised_ev = None
+            if realised_sell is not None:
+                fees = c.buy_price * broker + realised_sell * sell_rate
+                realised_margin = (realised_sell - c.buy_price - fees) / c.buy_price * 100.0
+                realised_ev = c.capital_required * realised_margin / 100.0
+
+            yield BacktestResult(
+                snapshot_ts=ts,
+                item_id=c.item_id,
+                from_hub_id=c.from_hub_id,
+                to_hub_id=c.to_hub_id,
+                buy_price=c.buy_price,
+                predicted_sell_price=c.sell_price,
+                realised_sell_price=realised_sell,
+                predicted_margin_pct=c.net_margin_pct,
+                realised_margin_pct=realised_margin,
+                predicted_ev_isk=c.ev_isk,
+                realised_ev_isk=realised_ev,
+                decay_score=c.decay_score,
+            )
+
+
+async def backtest_window(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    horizon: timedelta,
+    profile: Optional[FeeProfile] = None,
+    thresholds: Tuple[Optional[float], Optional[float], Optional[float]] = (None, None, None),
+    output_path: Optional[Path] = None,
+    fitter: Optional[DecayFitter] = None,
+) -> BacktestSummary:
+    """Backtest one time window, streaming per-candidate outcomes to NDJSON if given."""
+    started = time.perf_counter()
+    summary = BacktestSummary()
+    seen = set()
+
+    sink = output_path.open("w") if output_path is not None else None
+    try:
+        async for result in replay_window(
+            session, start, end, horizon, profile, thresholds, fitter
+        ):
+            seen.add(result.snapshot_ts)
+            summary.add(result)
+            if sink is not None:
+                sink.write(json.dumps(asdict(result), default=str) + "\n")
+    finally:
+        if sink is not None:
+            sink.close()
+
+    summary.snapshots = len(seen)
+    summary.elapsed_seconds = time.perf_counter() - started
+
+    logger.info(
+        "backtest_window_done",
+        start=start.isoformat(),
+        end=end.isoformat(),
+        candidates=summary.candidates,
+        filled=summary.filled,
+        elapsed_seconds=round(summary.elapsed_seconds, 2),
+    )
+
+    return summary
+
+
+def _run_span_process(
+    windows: List[Tuple[datetime, datetime, Optional[Path]]],
+    horizon: timedelta,
+    profile: Optional[FeeProfile],
+    thresholds: Tuple[Optional[float], Optional[float], Optional[float]],
+) -> List[BacktestSummary]:
+    """Backtest consecutive windows in a worker process sharing one session and decay fitter."""
+    # Imported here so the parent does not need a database engine to fork workers
+    from eve_intel.db.base import get_db_session
+
+    async def _run() -> List[BacktestSummary]:
+        summaries = []
+        async with get_db_session() as session:
+            first = windows[0][0] - timedelta(days=settings.decay_fit_days)
+            fitter = DecayFitter(session, first, profile)
+            for start, end, output_path in windows:
+                summaries.append(
+                    await backtest_window(
+                        session, start, end, horizon, profile, thresholds, output_path, fitter
+                    )
+                )
+        return summaries
+
+    return asyncio.run(_run())
+
+
+def split_windows(
+    start: datetime, end: datetime, window: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into consecutive windows of at most ``window``."""
+    windows = []
+    cursor = start
+    while cursor < end:
+        windows.append((cursor, min(cursor + window, end)))
+        cursor += window
+    return windows
+
+
+async def run_backtest(
+    start: datetime,
+    end: datetime,
+    workers: int = 1,
+    horizon: Optional[timedelta] = None,
+    profile: Optional[FeeProfile] = None,
+    thresholds: Tuple[Optional[float], Optional[float], Optional[float]] = (None, None, None),
+    output_dir: Optional[Path] = None,
+) -> BacktestSummary:
+    """
+    Backtest [start, end) split into time windows across a process pool.
+
+    Each worker process takes a contiguous span of windows, replayed in
+    order with one session and one decay fitter so the fit history is read
+    once per worker, and writes each window's outcomes to
+    ``output_dir/backtest-<n>.ndjson``; only window summaries return to the
+    parent, so memory stays bounded regardless of the range.
+    """
+    started = time.perf_counter()
+    horizon = horizon or timedelta(hours=settings.backtest_horizon_hours)
+    windows = split_windows(start, end, timedelta(days=settings.backtest_window_days))
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def part(n: int) -> Optional[Path]:
+        return output_dir / f"backtest-{n:04d}.ndjson" if output_dir is not None else None
+
+    parts = [(*window, part(n)) for n, window in enumerate(windows)]
+    per_worker = math.ceil(len(parts) / max(workers, 1)) or 1
+    spans = [parts[i : i + per_worker] for i in range(0, len(parts), per_worker)]
+
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=context) as pool:
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _run_span_process, span, horizon, profile, thresholds)
+                for span in spans
+            )
+        )
+
+    total = BacktestSummary()
+    for summaries in results:
+        for summary in summaries:
+            total.merge(summary)
+    total.elapsed_seconds = time.perf_counter() - started
+
+    logger.info(
+        "backtest_complete",
+        windows=len(windows),
+        workers=workers,
+        candidates=total.candidates,
+        filled=total.filled,
+        realisation_pct=round(total.realisation_pct, 2),
+        elapsed_seconds=round(total.elapsed_seconds, 2),
+    )
+
+    return total
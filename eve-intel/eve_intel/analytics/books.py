@@ -0,0 +1,115 @@
+"""Top-of-book arrays built from order snapshots."""
+
+import hashlib
+import math
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from eve_intel.logging import get_logger
+
+logger = get_logger(__name__)
+
+BookKey = Tuple[int, int]
+
+
+@dataclass
+class MarketBooks:
+    """
+    Best bid/ask per (item, hub) in columnar form.
+
+    Row ``i`` describes the book of ``item_id[i]`` at ``hub_id[i]``. Missing
+    sides are encoded as ``best_bid = 0.0`` and ``best_ask = inf``.
+    ``marker`` is a hash of the full book and changes whenever any order
+    in it is added, removed, repriced or partially filled. ``volatility`` is
+    the series' rolling price CV %, ``liquidity`` its 24h traded ISK,
+    ``price_low``/``price_high`` its historical traded price band (``0.0``
+    and ``inf`` when unknown) and ``forecast_drift`` the forecast relative
+    price change over the haul horizon, all filled in by the engine after
+    loading.
+    """
+
+    item_id: array = field(default_factory=lambda: array("q"))
+    hub_id: array = field(default_factory=lambda: array("q"))
+    best_bid: array = field(default_factory=lambda: array("d"))
+    bid_qty: array = field(default_factory=lambda: array("q"))
+    best_ask: array = field(default_factory=lambda: array("d"))
+    ask_qty: array = field(default_factory=lambda: array("q"))
+    volatility: array = field(default_factory=lambda: array("d"))
+    liquidity: array = field(default_factory=lambda: array("d"))
+    price_low: array = field(default_factory=lambda: array("d"))
+    price_high: array = field(default_factory=lambda: array("d"))
+    forecast_drift: array = field(default_factory=lambda: array("d"))
+    marker: List[str] = field(default_factory=list)
+    snapshot_ts: Dict[int, datetime] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.item_id)
+
+    def index(self) -> Dict[BookKey, int]:
+        """Map (item_id, hub_id) to row number."""
+        return {(self.item_id[i], self.hub_id[i]): i for i in range(len(self))}
+
+    def markers(self) -> Dict[BookKey, str]:
+        """Map (item_id, hub_id) to book change marker."""
+        return {(self.item_id[i], self.hub_id[i]): self.marker[i] for i in range(len(self))}
+
+    def rows_by_item(self, only_items: Optional[Iterable[int]] = None) -> Dict[int, List[int]]:
+        """Group row numbers by item, optionally restricted to some items."""
+        wanted = set(only_items) if only_items is not None else None
+        grouped: Dict[int, List[int]] = defaultdict(list)
+        for i, item_id in enumerate(self.item_id):
+            if wanted is None or item_id in wanted:
+                grouped[item_id].append(i)
+        return grouped
+
+
+def build_books(orders: Sequence[Tuple]) -> MarketBooks:
+    """
+    Reduce raw order rows to top-of-book arrays in one pass.
+
+    Each row is ``(item_id, hub_id, order_id, side, price, qty, ts_snapshot)``.
+    """
+    grouped: Dict[BookKey, List[Tuple]] = defaultdict(list)
+    snapshot_ts: Dict[int, datetime] = {}
+    for item_id, hub_id, order_id, side, price, qty, ts in orders:
+        grouped[(item_id, hub_id)].append((order_id, side, price, qty))
+        if hub_id not in snapshot_ts or ts > snapshot_ts[hub_id]:
+            snapshot_ts[hub_id] = ts
+
+    books = MarketBooks(snapshot_ts=snapshot_ts)
+    for (item_id, hub_id), book in sorted(grouped.items()):
+        best_bid, bid_qty = 0.0, 0
+        best_ask, ask_qty = math.inf, 0
+        for _, side, price, qty in book:
+            if side == "buy":
+                if price > best_bid:
+                    best_bid, bid_qty = price, qty
+                elif price == best_bid:
+                    bid_qty += qty
+            elif price < best_ask:
+                best_ask, ask_qty = price, qty
+            elif price == best_ask:
+                ask_qty += qty
+
+        book.sort()
+        digest = hashlib.blake2b(repr(book).encode(), digest_size=16).hexdigest()
+
+        books.item_id.append(item_id)
+        books.hub_id.append(hub_id)
+        books.best_bid.append(best_bid)
+        books.bid_qty.append(bid_qty)
+        books.best_ask.append(best_ask)
+        books.ask_qty.append(ask_qty)
+        books.volatility.append(0.0)
+        books.liquidity.append(0.0)
+        books.price_low.append(0.0)
+        books.price_high.append(math.inf)
+        books.forecast_drift.append(0.0)
+        books.marker.append(digest)
+
+    logger.debug("books_built", orders=len(orders), books=len(books))
+
+    return books
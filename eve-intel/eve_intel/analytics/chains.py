@@ -0,0 +1,171 @@
+"""Multi-hop arbitrage chains (A -> B -> C) over ranked candidates."""
+
+import heapq
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import count
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ArbitrageChain:
+    """Consecutive trades where each leg starts at the hub the previous one ended."""
+
+    legs: List[ArbitrageCandidate]
+    ev_isk: float
+    capital_required: float
+    jumps: Optional[int] = None
+    ev_per_jump: Optional[float] = None
+
+    @property
+    def hubs(self) -> List[int]:
+        """Hubs visited in order."""
+        return [self.legs[0].from_hub_id] + [leg.to_hub_id for leg in self.legs]
+
+
+@dataclass
+class ChainSearchStats:
+    """Work done by one chain search."""
+
+    explored: int = 0
+    pruned: int = 0
+    elapsed_ms: float = 0.0
+    legs: int = 0
+
+
+def _make_chain(legs: List[ArbitrageCandidate], ev: float) -> ArbitrageChain:
+    """Build a chain, summing jumps only when every leg's distance is known."""
+    jumps = None
+    if all(leg.jumps is not None for leg in legs):
+        jumps = sum(leg.jumps for leg in legs)
+    return ArbitrageChain(
+        legs=list(legs),
+        ev_isk=ev,
+        # Capital is recycled leg by leg, the largest leg bounds what is tied up
+        capital_required=max(leg.capital_required for leg in legs),
+        jumps=jumps,
+        ev_per_jump=ev / max(jumps, 1) if jumps is not None else None,
+    )
+
+
+def _outgoing_legs(
+    candidates: Sequence[ArbitrageCandidate], legs_per_hop: int
+) -> Dict[int, List[ArbitrageCandidate]]:
+    """The ``legs_per_hop`` best profitable legs per hub pair, grouped by source hub in EV order."""
+    per_pair: Dict[Tuple[int, int], List[ArbitrageCandidate]] = defaultdict(list)
+    for c in candidates:
+        if c.ev_isk > 0:
+            per_pair[(c.from_hub_id, c.to_hub_id)].append(c)
+
+    outgoing: Dict[int, List[ArbitrageCandidate]] = defaultdict(list)
+    for (from_hub, _), legs in per_pair.items():
+        legs.sort(key=lambda x: x.ev_isk, reverse=True)
+        outgoing[from_hub].extend(legs[:legs_per_hop])
+    for legs in outgoing.values():
+        legs.sort(key=lambda x: x.ev_isk, reverse=True)
+    return outgoing
+
+
+def find_chains(
+    candidates: Sequence[ArbitrageCandidate],
+    max_hops: int = 3,
+    top_k: int = 20,
+    legs_per_hop: int = 3,
+) -> Tuple[List[ArbitrageChain], ChainSearchStats]:
+    """
+    Find the top chains of 2 to ``max_hops`` legs by combined EV.
+
+    Depth-first branch and bound over the hub graph: a chain never revisits a
+    hub or trades the same item twice, and only the ``legs_per_hop`` best
+    items per hub pair are branched on. A branch is cut when its EV plus the
+    best outgoing leg EV for every remaining hop cannot beat the current
+    K-th best chain. Outgoing legs are visited in EV order, so once one leg
+    fails the bound all remaining legs from that hub do too.
+    """
+    started = time.perf_counter()
+    stats = ChainSearchStats()
+    if max_hops < 2 or top_k <= 0:
+        return [], stats
+
+    outgoing = _outgoing_legs(candidates, legs_per_hop)
+    stats.legs = sum(len(legs) for legs in outgoing.values())
+
+    best_out = {hub: legs[0].ev_isk for hub, legs in outgoing.items()}
+    global_best = max(best_out.values(), default=0.0)
+
+    # Min-heap of the best chains so far; the counter breaks EV ties
+    top: List[Tuple[float, int, List[ArbitrageCandidate]]] = []
+    tiebreak = count()
+
+    def threshold() -> float:
+        return top[0][0] if len(top) >= top_k else 0.0
+
+    def extend(path: List[ArbitrageCandidate], ev: float, hubs: set, items: set) -> None:
+        stats.explored += 1
+        if len(path) >= 2 and ev > threshold():
+            entry = (ev, next(tiebreak), list(path))
+            if len(top) < top_k:
+                heapq.heappush(top, entry)
+            else:
+                heapq.heapreplace(top, entry)
+
+        remaining = max_hops - len(path)
+        if remaining <= 0:
+            return
+
+        hub = path[-1].to_hub_id
+        legs = outgoing.get(hub)
+        if not legs:
+            return
+
+        for leg in legs:
+            # Optimistic: this leg, then the best leg anywhere for each later hop
+            if ev + leg.ev_isk + (remaining - 1) * global_best <= threshold():
+                stats.pruned += 1
+                break
+            if leg.to_hub_id in hubs or leg.item_id in items:
+                continue
+            path.append(leg)
+            hubs.add(leg.to_hub_id)
+            items.add(leg.item_id)
+            extend(path, ev + leg.ev_isk, hubs, items)
+            items.discard(leg.item_id)
+            hubs.discard(leg.to_hub_id)
+            path.pop()
+
+    # Seed from the strongest first legs so the K-th best bound tightens early
+    first_legs = sorted(
+        (leg for legs in outgoing.values() for leg in legs),
+        key=lambda x: x.ev_isk,
+        reverse=True,
+    )
+    for leg in first_legs:
+        if leg.ev_isk + (max_hops - 1) * global_best <= threshold():
+            stats.pruned += 1
+            break
+        # Tighter per-hub bound for the second hop, not monotone in leg order
+        second = best_out.get(leg.to_hub_id, 0.0)
+        if leg.ev_isk + second + (max_hops - 2) * global_best <= threshold():
+            stats.pruned += 1
+            continue
+        extend([leg], leg.ev_isk, {leg.from_hub_id, leg.to_hub_id}, {leg.item_id})
+
+    chains = [_make_chain(path, ev) for ev, _, path in sorted(top, reverse=True)]
+    stats.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    logger.info(
+        "arbitrage_chains_found",
+        chains=len(chains),
+        legs=stats.legs,
+        explored=stats.explored,
+        pruned=stats.pruned,
+        elapsed_ms=stats.elapsed_ms,
+    )
+
+    return chains, stats
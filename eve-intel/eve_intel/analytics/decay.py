@@ -0,0 +1,317 @@
+"""Empirical spread decay: survival curves fitted from snapshot history."""
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.fees import FeeProfile, default_fee_profile
+from eve_intel.analytics.quality import load_clean_books
+from eve_intel.analytics.stats import _as_utc, liquidity_as_of, volatility_as_of
+from eve_intel.db.models import DecayBucket
+from eve_intel.db.repositories import DecayBucketRepository, OrderSnapshotRepository
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+# Bucket edges; a value falls in the bucket after the last edge it reaches
+MARGIN_EDGES_PCT = (5.0, 10.0, 20.0, 50.0)
+LIQUIDITY_EDGES_ISK = (1e8, 1e9, 1e10)
+VOLATILITY_EDGES_PCT = (2.0, 5.0, 10.0, 20.0)
+
+# Hours at which survival is stored
+DECAY_GRID_HOURS = (1, 2, 4, 8, 12, 24, 48, 72)
+
+BucketKey = Tuple[int, int, int]
+
+
+def bucket_of(net_margin_pct: float, liquidity_24h: float, volatility: float) -> BucketKey:
+    """Bucket a spread by margin, liquidity and volatility."""
+    return (
+        bisect_right(MARGIN_EDGES_PCT, net_margin_pct),
+        bisect_right(LIQUIDITY_EDGES_ISK, liquidity_24h),
+        bisect_right(VOLATILITY_EDGES_PCT, volatility),
+    )
+
+
+def kaplan_meier(
+    observations: Counter, grid: Iterable[float] = DECAY_GRID_HOURS
+) -> Tuple[List[float], Optional[float]]:
+    """
+    Kaplan-Meier survival from ``(hours, observed_end)`` counts.
+
+    Spreads still open when history ends count as censored. Returns the
+    survival probability at each grid point and the median lifetime in
+    hours (None while survival stays above one half).
+    """
+    at_risk = sum(observations.values())
+    ended: Dict[float, int] = defaultdict(int)
+    removed: Dict[float, int] = defaultdict(int)
+    for (hours, observed_end), n in observations.items():
+        removed[hours] += n
+        if observed_end:
+            ended[hours] += n
+
+    steps = []
+    survival = 1.0
+    median = None
+    for hours in sorted(removed):
+        if ended[hours] and at_risk > 0:
+            survival *= 1.0 - ended[hours] / at_risk
+            if median is None and survival <= 0.5:
+                median = hours
+        steps.append((hours, survival))
+        at_risk -= removed[hours]
+
+    curve = []
+    k = 0
+    current = 1.0
+    for point in grid:
+        while k < len(steps) and steps[k][0] <= point:
+            current = steps[k][1]
+            k += 1
+        curve.append(round(current, 4))
+
+    return curve, median
+
+
+@dataclass
+class DecayTable:
+    """
+    Fitted survival per bucket, read in O(1) per candidate.
+
+    ``estimates`` maps a bucket to its decay score (survival at the horizon,
+    0-100) and median lifetime in hours. Buckets with too few samples are
+    left out so callers fall back to the heuristic score.
+    """
+
+    estimates: Dict[BucketKey, Tuple[float, Optional[float]]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.estimates)
+
+    def lookup(
+        self, net_margin_pct: float, liquidity_24h: float, volatility: float
+    ) -> Optional[Tuple[float, Optional[float]]]:
+        """Decay score and median lifetime for a spread, or None if its bucket is unfitted."""
+        return self.estimates.get(bucket_of(net_margin_pct, liquidity_24h, volatility))
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable, horizon_hours: float, min_samples: int
+    ) -> "DecayTable":
+        """Build the lookup from stored buckets, reading survival at the horizon."""
+        # Last grid point not past the horizon (the first one for short horizons)
+        point = max(bisect_right(DECAY_GRID_HOURS, horizon_hours) - 1, 0)
+        return cls(
+            {
+                (r.margin_bucket, r.liquidity_bucket, r.volatility_bucket): (
+                    r.survival[point] * 100.0,
+                    r.median_hours,
+                )
+                for r in rows
+                if r.samples >= min_samples
+            }
+        )
+
+
+async def load_decay_table(session: AsyncSession) -> DecayTable:
+    """Load the fitted decay table."""
+    return DecayTable.from_rows(
+        await DecayBucketRepository(session).get_all(),
+        settings.decay_horizon_hours,
+        settings.decay_min_samples,
+    )
+
+
+@dataclass
+class SpreadEpisode:
+    """One spread from the snapshot its margin reached the threshold to the one it ended."""
+
+    opened: datetime
+    bucket: BucketKey
+    closed: Optional[datetime] = None
+
+
+class DecayFitter:
+    """
+    Spread episodes tracked snapshot by snapshot, for decay fits over any window seen.
+
+    Advancing walks consecutive snapshot times once: a spread (item,
+    from_hub, to_hub) opens when its net margin reaches the threshold and
+    ends when the margin falls below it or the quote disappears. Episodes
+    are bucketed by the spread's margin, liquidity and volatility when it
+    opened, the latter two recomputed from the price history window ending at
+    that snapshot. Backtests advance one fitter through their range and fit
+    each day's table from the episodes in memory, instead of replaying the
+    fit window's snapshots again for every table.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        since: datetime,
+        profile: Optional[FeeProfile] = None,
+        min_margin_pct: Optional[float] = None,
+    ) -> None:
+        self.session = session
+        self.profile = profile or default_fee_profile()
+        self.threshold = min_margin_pct or settings.min_net_margin_pct
+        # Snapshot times observed so far, oldest first, and where the next walk starts
+        self.times: List[datetime] = []
+        self.episodes: List[SpreadEpisode] = []
+        self._next = _as_utc(since)
+        self._open: Dict[Tuple[int, int, int], SpreadEpisode] = {}
+
+    async def advance(self, until: datetime) -> None:
+        """Observe the snapshots not seen yet from before ``until``."""
+        until = _as_utc(until)
+        if until <= self._next:
+            return
+        times = await OrderSnapshotRepository(self.session).get_snapshot_times(
+            settings.market_hub_ids, self._next, until
+        )
+        for ts in times:
+            await self._observe(_as_utc(ts))
+        self._next = until
+
+    async def _observe(self, ts: datetime) -> None:
+        # Imported here, the arbitrage module builds on this one
+        from eve_intel.analytics.arbitrage import ArbitrageEngine, quotes_from_books, score_quotes
+
+        self.times.append(ts)
+        books, _ = await load_clean_books(self.session, settings.market_hub_ids, as_of=ts)
+        if len(books) == 0:
+            return
+        # Each spread is bucketed by the market as it was at the snapshot, not today's
+        hub_ids = sorted(set(books.hub_id))
+        volatility = await volatility_as_of(self.session, sorted(set(books.item_id)), hub_ids, ts)
+        liquidity = await liquidity_as_of(self.session, hub_ids, ts)
+        for i in range(len(books)):
+            key = (books.item_id[i], books.hub_id[i])
+            books.volatility[i] = volatility.get(key, 0.0)
+            books.liquidity[i] = liquidity.get(key, 0.0)
+
+        quotes = quotes_from_books(books)
+        scored = score_quotes(quotes, self.profile, ArbitrageEngine.capture_ratio)
+
+        alive = set()
+        for i in range(len(quotes)):
+            margin = scored.net_margin_pct[i]
+            if margin < self.threshold:
+                continue
+            key = (quotes.item_id[i], quotes.from_hub_id[i], quotes.to_hub_id[i])
+            alive.add(key)
+            if key not in self._open:
+                bucket = bucket_of(margin, quotes.liquidity_24h[i], quotes.volatility[i])
+                episode = SpreadEpisode(ts, bucket)
+                self._open[key] = episode
+                self.episodes.append(episode)
+
+        for key in [k for k in self._open if k not in alive]:
+            self._open.pop(key).closed = ts
+
+    def bucket_rows(self, start: datetime, end: datetime) -> List[dict]:
+        """
+        Survival rows of the spreads that opened in [start, end), as seen at ``end``.
+
+        Spreads not ended by ``end`` are censored at the last snapshot before it.
+        """
+        start, end = _as_utc(start), _as_utc(end)
+        last = self.times[bisect_left(self.times, end) - 1] if self.times else end
+        observations: Dict[BucketKey, Counter] = defaultdict(Counter)
+        for episode in self.episodes:
+            if not start <= episode.opened < end:
+                continue
+            ended = episode.closed is not None and episode.closed < end
+            closed = episode.closed if ended else last
+            hours = round((closed - episode.opened).total_seconds() / 3600.0, 2)
+            observations[episode.bucket][(hours, ended)] += 1
+
+        rows = []
+        for (margin_b, liquidity_b, volatility_b), counts in observations.items():
+            curve, median = kaplan_meier(counts)
+            rows.append(
+                {
+                    "margin_bucket": margin_b,
+                    "liquidity_bucket": liquidity_b,
+                    "volatility_bucket": volatility_b,
+                    "samples": sum(counts.values()),
+                    "events": sum(n for (_, ended), n in counts.items() if ended),
+                    "median_hours": median,
+                    "survival": curve,
+                }
+            )
+        return rows
+
+    async def table(self, as_of: datetime) -> DecayTable:
+        """
+        Decay table as the nightly fit would have produced it at ``as_of``.
+
+        Fitted from the spreads opened in the ``decay_fit_days`` before that
+        time, so historical evaluations never score with later spreads.
+        Episodes older than that window are dropped, so ``as_of`` may only
+        move forward between calls.
+        """
+        as_of = _as_utc(as_of)
+        start = as_of - timedelta(days=settings.decay_fit_days)
+        await self.advance(as_of)
+        self.episodes = [e for e in self.episodes if e.opened >= start]
+        self.times = self.times[max(bisect_left(self.times, start) - 1, 0) :]
+        return DecayTable.from_rows(
+            [DecayBucket(**row) for row in self.bucket_rows(start, as_of)],
+            settings.decay_horizon_hours,
+            settings.decay_min_samples,
+        )
+
+
+async def fit_decay_buckets(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    profile: Optional[FeeProfile] = None,
+    min_margin_pct: Optional[float] = None,
+) -> List[dict]:
+    """
+    Fit spread survival curves from the snapshots in [start, end).
+
+    Spreads already open at the first snapshot count as opening there; the
+    ones still open at the end are censored at the last snapshot. Only one
+    snapshot and the spread episodes are held in memory. Returns one
+    ``analytics_decay_bucket`` row per fitted bucket.
+    """
+    fitter = DecayFitter(session, start, profile, min_margin_pct)
+    await fitter.advance(end)
+    return fitter.bucket_rows(start, end)
+
+
+async def fit_decay_table(
+    session: AsyncSession,
+    start: datetime,
+    end: datetime,
+    profile: Optional[FeeProfile] = None,
+    min_margin_pct: Optional[float] = None,
+) -> int:
+    """
+    Fit spread survival curves from the snapshots in [start, end).
+
+    The fitted buckets replace the stored decay table. Returns the number of
+    buckets written.
+    """
+    started = time.perf_counter()
+    rows = await fit_decay_buckets(session, start, end, profile, min_margin_pct)
+    await DecayBucketRepository(session).replace_all(rows)
+
+    logger.info(
+        "decay_table_fitted",
+        buckets=len(rows),
+        spreads=sum(r["samples"] for r in rows),
+        elapsed_seconds=round(time.perf_counter() - started, 2),
+    )
+
+    return len(rows)
@@ -0,0 +1,124 @@
+"""Differences between the candidate sets of two arbitrage runs."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+
+RouteKey = Tuple[int, int, int]
+
+# Fields whose change makes a route count as changed, for clients mirroring a run
+COMPARED_FIELDS = ("buy_price", "sell_price", "net_margin_pct", "ev_isk")
+
+# Fields compared for stored diffs, which only keep meaningful moves
+STORED_FIELDS = ("ev_isk", "net_margin_pct")
+
+
+def route_key(c: ArbitrageCandidate) -> RouteKey:
+    """Identify a candidate across runs by item and hub pair."""
+    return (c.item_id, c.from_hub_id, c.to_hub_id)
+
+
+@dataclass
+class RunDiff:
+    """Routes added, removed and changed from one run to the next."""
+
+    run_id: int
+    base_run_id: Optional[int]
+    added: List[ArbitrageCandidate] = field(default_factory=list)
+    removed: List[RouteKey] = field(default_factory=list)
+    changed: List[ArbitrageCandidate] = field(default_factory=list)
+    # Base run candidates of the removed and changed routes, in the same order
+    removed_from: List[ArbitrageCandidate] = field(default_factory=list)
+    changed_from: List[ArbitrageCandidate] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def as_message(self) -> dict:
+        """Compact JSON-ready form; removed routes are ``[item_id, from_hub, to_hub]``."""
+        return {
+            "type": "diff",
+            "run_id": self.run_id,
+            "base_run_id": self.base_run_id,
+            "added": [compact_candidate(c) for c in self.added],
+            "removed": [list(key) for key in self.removed],
+            "changed": [compact_candidate(c) for c in self.changed],
+        }
+
+    def as_rows(self) -> List[dict]:
+        """Rows for ``analytics_run_diff``, with this run's and the base run's EV and margin."""
+        rows = []
+        for change, new, old in (
+            *(("added", c, None) for c in self.added),
+            *(("changed", c, o) for c, o in zip(self.changed, self.changed_from, strict=True)),
+            *(("removed", None, o) for o in self.removed_from),
+        ):
+            source = new or old
+            rows.append(
+                {
+                    "run_id": self.run_id,
+                    "base_run_id": self.base_run_id,
+                    "change": change,
+                    "item_id": source.item_id,
+                    "from_hub_id": source.from_hub_id,
+                    "to_hub_id": source.to_hub_id,
+                    "ev_isk": new.ev_isk if new else None,
+                    "net_margin_pct": new.net_margin_pct if new else None,
+                    "prev_ev_isk": old.ev_isk if old else None,
+                    "prev_net_margin_pct": old.net_margin_pct if old else None,
+                }
+            )
+        return rows
+
+
+def compact_candidate(c: ArbitrageCandidate) -> dict:
+    """The fields clients need to update a row in place."""
+    return {
+        "item_id": c.item_id,
+        "from_hub": c.from_hub_id,
+        "to_hub": c.to_hub_id,
+        "buy_price": c.buy_price,
+        "sell_price": c.sell_price,
+        "net_margin_pct": c.net_margin_pct,
+        "ev_isk": c.ev_isk,
+    }
+
+
+def diff_candidates(
+    base: Sequence[ArbitrageCandidate],
+    new: Sequence[ArbitrageCandidate],
+    run_id: int,
+    base_run_id: Optional[int] = None,
+    rel_tol: float = 1e-9,
+    fields: Sequence[str] = COMPARED_FIELDS,
+) -> RunDiff:
+    """
+    Diff two runs by route in one pass over each.
+
+    A route is changed when any of ``fields`` moved by more than ``rel_tol``
+    relative to its previous value. Added and changed routes keep the new
+    run's EV order.
+    """
+    previous = {route_key(c): c for c in base}
+    diff = RunDiff(run_id=run_id, base_run_id=base_run_id)
+
+    seen = set()
+    for c in new:
+        key = route_key(c)
+        seen.add(key)
+        old = previous.get(key)
+        if old is None:
+            diff.added.append(c)
+        elif any(
+            abs(getattr(c, name) - getattr(old, name)) > rel_tol * abs(getattr(old, name))
+            for name in fields
+        ):
+            diff.changed.append(c)
+            diff.changed_from.append(old)
+
+    for key, old in previous.items():
+        if key not in seen:
+            diff.removed.append(key)
+            diff.removed_from.append(old)
+    return diff
@@ -1,8 +1,60 @@
 """Trading fees and cost calculations."""
 
+from dataclasses import dataclass
+from typing import List
+
 from eve_intel.settings import settings
 
 
+@dataclass(frozen=True)
+class FeeProfile:
+    """Broker fee and sales tax rates for one character (skills and standings)."""
+
+    name: str
+    broker_fee_pct: float
+    sales_tax_pct: float
+
+
+def default_fee_profile() -> FeeProfile:
+    """Fee profile built from the global settings."""
+    return FeeProfile(
+        name="default",
+        broker_fee_pct=settings.broker_fee_pct,
+        sales_tax_pct=settings.sales_tax_pct,
+    )
+
+
+def parse_fee_profile(spec: str) -> FeeProfile:
+    """Parse a ``name:broker_fee_pct:sales_tax_pct`` fee profile spec."""
+    parts = [p.strip() for p in spec.split(":")]
+    if len(parts) != 3 or not parts[0]:
+        msg = f"Invalid fee profile '{spec}', expected name:broker_pct:tax_pct"
+        raise ValueError(msg)
+
+    try:
+        broker_fee_pct = float(parts[1])
+        sales_tax_pct = float(parts[2])
+    except ValueError as e:
+        msg = f"Invalid fee rates in profile '{spec}'"
+        raise ValueError(msg) from e
+
+    if broker_fee_pct < 0 or sales_tax_pct < 0:
+        msg = f"Fee rates must be non-negative in profile '{spec}'"
+        raise ValueError(msg)
+
+    return FeeProfile(name=parts[0], broker_fee_pct=broker_fee_pct, sales_tax_pct=sales_tax_pct)
+
+
+def parse_fee_profiles(specs: List[str]) -> List[FeeProfile]:
+    """Parse fee profile specs, rejecting duplicate names."""
+    profiles = [parse_fee_profile(spec) for spec in specs]
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        msg = "Fee profile names must be unique"
+        raise ValueError(msg)
+    return profiles
+
+
 def calculate_broker_fee(price: float, broker_fee_pct: float | None = None) -> float:
     """Calculate broker fee for a transaction."""
     fee_pct = broker_fee_pct if broker_fee_pct is not None else settings.broker_fee_pct
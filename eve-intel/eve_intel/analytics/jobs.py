@@ -0,0 +1,280 @@
+"""Asynchronous analysis jobs on a bounded process pool, de-duplicated by parameters."""
+
+import asyncio
+import json
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.fees import parse_fee_profiles
+from eve_intel.analytics.latest import latest_run_cache, publish_diff
+from eve_intel.datasources.cache import CacheAdapter, RedisCache
+from eve_intel.db.base import get_db_session
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JobRunner = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when no executor slot or queue place is left for a new job."""
+
+
+@dataclass
+class Job:
+    """One analysis job and, once finished, its result or error."""
+
+    job_id: str
+    params: Dict[str, Any]
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def as_record(self) -> Dict[str, Any]:
+        """JSON-ready form, as stored and served."""
+        return {
+            "job_id": self.job_id,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Canonical form of a parameter set; identical keys share one in-flight job."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+async def run_analysis(params: Dict[str, Any], publish: bool = True) -> Dict[str, Any]:
+    """
+    Run one analysis in its own session, saving the run when asked to.
+
+    With ``fee_profiles`` the same books are also evaluated under each
+    profile, thresholds applied per profile, and returned as scenarios.
+    With ``publish=False`` a saved run is not published from here; its
+    committed diff message is returned under ``diff`` instead.
+    """
+    profiles = parse_fee_profiles(params.get("fee_profiles") or [])
+    async with get_db_session() as session:
+        engine = ArbitrageEngine(session)
+        candidates = await engine.find_arbitrage_opportunities(
+            min_ev_isk=params.get("min_ev"),
+            min_margin_pct=params.get("min_margin"),
+        )
+        scenarios = {}
+        if profiles:
+            scenarios = await engine.find_arbitrage_scenarios(
+                profiles,
+                min_ev_isk=params.get("min_ev"),
+                min_margin_pct=params.get("min_margin"),
+            )
+        run_id = None
+        if params.get("save_results") and candidates:
+            # Saved runs carry station trades for the read endpoints; the books are loaded
+            await engine.find_station_trades()
+            run_id = await engine.save_run_results(candidates, publish=publish)
+
+    result: Dict[str, Any] = {"run_id": run_id, "candidates": [asdict(c) for c in candidates]}
+    if not publish:
+        # The session has committed, the run is there for other processes to read
+        result["diff"] = engine.unpublished_diff
+    if profiles:
+        result["scenarios"] = [
+            {
+                "profile": p.name,
+                "broker_fee_pct": p.broker_fee_pct,
+                "sales_tax_pct": p.sales_tax_pct,
+                "candidates": [asdict(c) for c in scenarios[p.name]],
+            }
+            for p in profiles
+        ]
+    return result
+
+
+def run_analysis_process(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one analysis in a worker process, off the API's event loop.
+
+    The saved run is published by the calling process, whose broker has the
+    stream clients subscribed.
+    """
+    return asyncio.run(run_analysis(params, publish=False))
+
+
+class JobManager:
+    """
+    Runs analysis jobs in the background of the API process.
+
+    Jobs run in a pool of worker processes, so CPU-bound scoring never
+    blocks the API's event loop; the pool uses a fresh process per job, as
+    each builds its own database engine and broker connection. At most
+    ``max_workers`` jobs run at once and ``max_queued`` more wait for a
+    slot; beyond that submissions are rejected. Submitting parameters
+    identical to a queued or running job returns that job instead of
+    starting another. Finished jobs are kept for ``ttl_seconds``, locally
+    and, when a ``store`` is given, in a shared store so any replica can
+    answer for them.
+    """
+
+    def __init__(
+        self,
+        runner: Optional[JobRunner] = None,
+        store: Optional[CacheAdapter] = None,
+        max_workers: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ) -> None:
+        # An injected runner is awaited on the event loop in place of the process pool
+        self.runner = runner or self._run_in_process
+        self.store = store
+        self.max_workers = max_workers or settings.job_max_workers
+        self.max_queued = settings.job_max_queued if max_queued is None else max_queued
+        self.ttl_seconds = ttl_seconds or settings.job_result_ttl_seconds
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._inflight: Dict[str, Job] = {}
+        self._jobs: Dict[str, Tuple[Job, float]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def submit(self, params: Dict[str, Any]) -> Tuple[Job, bool]:
+        """Enqueue a job, or join the in-flight one; returns the job and whether it is new."""
+        key = params_key(params)
+        existing = self._inflight.get(key)
+        if existing is not None:
+            logger.info("job_deduplicated", job_id=existing.job_id)
+            return existing, False
+
+        if len(self._inflight) >= self.max_workers + self.max_queued:
+            msg = f"{len(self._inflight)} analysis jobs already queued or running"
+            raise JobQueueFullError(msg)
+
+        self._prune()
+        job = Job(job_id=uuid.uuid4().hex, params=params)
+        self._inflight[key] = job
+        self._jobs[job.job_id] = (job, time.monotonic())
+        await self._save(job)
+
+        task = asyncio.create_task(self._run(key, job))
+        # Keep a reference until done, the loop only holds weak ones
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info("job_submitted", job_id=job.job_id, params=params)
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Record of a job of this process, else from the shared store."""
+        local = self._jobs.get(job_id)
+        if local is not None:
+            return local[0].as_record()
+        if self.store is None:
+            return None
+        return await self.store.get(self._store_key(job_id))
+
+    async def _run_in_process(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an analysis in the job process pool, started on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=1,
+            )
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, run_analysis_process, params)
+        diff = result.pop("diff", None)
+        if result["run_id"] is not None:
+            # Saved in another process, so this one's read endpoints look it up next
+            latest_run_cache.expire()
+            publish_diff(diff)
+        return result
+
+    async def _run(self, key: str, job: Job) -> None:
+        async with self._slots:
+            job.status = JOB_RUNNING
+            job.started_at = datetime.now(UTC)
+            await self._save(job)
+            try:
+                job.result = await self.runner(job.params)
+                job.status = JOB_SUCCEEDED
+            except Exception as e:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                logger.exception("job_failed", job_id=job.job_id, error=str(e))
+            finally:
+                job.finished_at = datetime.now(UTC)
+                self._inflight.pop(key, None)
+                self._jobs[job.job_id] = (job, time.monotonic())
+
+        await self._save(job)
+        # Forget the job once its TTL passes, even if nothing is submitted after it
+        asyncio.get_running_loop().call_later(self.ttl_seconds, self._prune)
+        logger.info(
+            "job_finished",
+            job_id=job.job_id,
+            status=job.status,
+            seconds=(job.finished_at - job.started_at).total_seconds(),
+        )
+
+    async def _save(self, job: Job) -> None:
+        if self.store is not None:
+            await self.store.set(self._store_key(job.job_id), job.as_record(), self.ttl_seconds)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the TTL."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired: List[str] = [
+            job_id
+            for job_id, (job, touched) in self._jobs.items()
+            if job.done and touched <= cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _store_key(job_id: str) -> str:
+        return f"eve_intel:job:{job_id}"
+
+    async def join(self) -> None:
+        """Wait for every submitted job to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel running jobs and release the process pool and the store."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self.store is not None:
+            await self.store.close()
+
+
+@lru_cache(maxsize=1)
+def get_job_manager() -> JobManager:
+    """Process-wide job manager, sharing job records through Redis per ``job_store``."""
+    return JobManager(store=RedisCache() if settings.job_store == "redis" else None)
@@ -0,0 +1,357 @@
+"""In-process cache of the latest completed arbitrage run, for read endpoints."""
+
+import asyncio
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import (
+    ArbitrageCandidate,
+    ArbitrageEngine,
+    CandidateColumns,
+    QuoteColumns,
+    rank_candidates,
+    score_quotes,
+)
+from eve_intel.analytics.decay import DecayTable, load_decay_table
+from eve_intel.analytics.diff import diff_candidates
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.station import StationTradeCandidate
+from eve_intel.analytics.stats import load_volatility
+from eve_intel.datasources.broker import get_broker
+from eve_intel.db.models import AnalyticsArbitrageRun
+from eve_intel.db.repositories import ArbitrageRunRepository
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+Column = Union[array, List[Optional[float]]]
+
+# Fee profiles whose rescored columns are kept per run, oldest dropped first
+RESCORED_PROFILES_MAX = 16
+
+# Candidate fields in bulk form, with the array typecode of each non-nullable column
+CANDIDATE_COLUMNS = (
+    ("item_id", "q"),
+    ("from_hub_id", "q"),
+    ("to_hub_id", "q"),
+    ("buy_price", "d"),
+    ("sell_price", "d"),
+    ("net_margin_pct", "d"),
+    ("ev_isk", "d"),
+    ("liquidity_24h", "d"),
+    ("capital_required", "d"),
+    ("decay_score", "d"),
+    ("fees_total", "d"),
+    ("spread_pct", "d"),
+    ("jumps", None),
+    ("ev_per_jump", None),
+    ("lifetime_hours", None),
+)
+
+
+def candidate_columns(candidates: Sequence[ArbitrageCandidate]) -> Dict[str, Column]:
+    """Transpose candidates into typed arrays, or lists where a field may be None."""
+    columns: Dict[str, Column] = {}
+    for name, typecode in CANDIDATE_COLUMNS:
+        values = [getattr(c, name) for c in candidates]
+        columns[name] = array(typecode, values) if typecode else values
+    return columns
+
+
+@dataclass
+class LatestRun:
+    """Candidates of one completed run, ranked by EV descending."""
+
+    run_id: int
+    created_at: Optional[datetime]
+    candidates: List[ArbitrageCandidate]
+    # Station trades found alongside, ranked by EV descending
+    station_trades: List[StationTradeCandidate] = field(default_factory=list)
+    # Volatility per (item, hub) series and the decay table the run was scored with
+    volatility: Dict[Tuple[int, int], float] = field(default_factory=dict, repr=False)
+    decay: Optional[DecayTable] = field(default=None, repr=False)
+    # Negated EVs, ascending, so an EV threshold is a bisect away
+    _neg_ev: List[float] = field(init=False, repr=False)
+    _columns: Optional[Dict[str, Column]] = field(init=False, default=None, repr=False)
+    # Candidates scored under other fee profiles, keyed by (broker fee, sales tax)
+    _rescored: Dict[Tuple[float, float], CandidateColumns] = field(
+        init=False, default_factory=dict, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self.candidates = sorted(self.candidates, key=lambda c: c.ev_isk, reverse=True)
+        self._neg_ev = [-c.ev_isk for c in self.candidates]
+
+    @property
+    def columns(self) -> Dict[str, Column]:
+        """Candidates in columnar form, built on first use and kept for the run's lifetime."""
+        if self._columns is None:
+            self._columns = candidate_columns(self.candidates)
+        return self._columns
+
+    def select_columns(
+        self,
+        min_ev: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Column]:
+        """
+        Same filter as ``select``, over the columns.
+
+        Without a margin filter the result is a prefix of every column, sliced
+        without touching rows; a margin filter gathers the matching rows.
+        """
+        columns = self.columns
+        end = bisect_right(self._neg_ev, -min_ev) if min_ev is not None else len(self.candidates)
+        if min_margin is None:
+            end = end if limit is None else min(end, limit)
+            return {name: column[:end] for name, column in columns.items()}
+
+        margins = columns["net_margin_pct"]
+        rows = [i for i in range(end) if margins[i] >= min_margin][:limit]
+        selected: Dict[str, Column] = {}
+        for name, typecode in CANDIDATE_COLUMNS:
+            column = columns[name]
+            values = [column[i] for i in rows]
+            selected[name] = array(typecode, values) if typecode else values
+        return selected
+
+    def select(
+        self,
+        min_ev: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArbitrageCandidate]:
+        """Filter in memory; the EV threshold cuts a prefix, the margin scan stops at ``limit``."""
+        end = bisect_right(self._neg_ev, -min_ev) if min_ev is not None else len(self.candidates)
+        selected = []
+        for c in self.candidates[:end]:
+            if min_margin is not None and c.net_margin_pct < min_margin:
+                continue
+            selected.append(c)
+            if limit is not None and len(selected) >= limit:
+                break
+        return selected
+
+    def select_station(
+        self,
+        min_ev: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[StationTradeCandidate]:
+        """Filter the run's station trades in memory."""
+        selected = [
+            t
+            for t in self.station_trades
+            if (min_ev is None or t.ev_isk >= min_ev)
+            and (min_margin is None or t.net_margin_pct >= min_margin)
+        ]
+        return selected[:limit]
+
+    def rescore(
+        self,
+        profile: FeeProfile,
+        min_ev: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArbitrageCandidate]:
+        """
+        Re-price the run's candidates under another fee profile, in memory.
+
+        Rows are scored as the engine scores them, with the run's volatility
+        and decay table, once per profile for the run's lifetime. Only routes
+        that passed the run's own thresholds are considered, so cheaper
+        profiles cannot surface routes the run filtered out; finding those
+        takes a new run (``POST /arbitrage/analyze`` with fee profiles).
+        """
+        scored = self._scored(profile)
+        ranked = rank_candidates(
+            scored,
+            min_ev if min_ev is not None else float("-inf"),
+            min_margin if min_margin is not None else float("-inf"),
+            limit,
+        )
+
+        # Scored rows follow the candidates' order
+        rows = {(c.item_id, c.from_hub_id, c.to_hub_id): c for c in self.candidates}
+        for c in ranked:
+            source = rows[(c.item_id, c.from_hub_id, c.to_hub_id)]
+            c.jumps = source.jumps
+            if source.jumps is not None:
+                c.ev_per_jump = c.ev_isk / max(source.jumps, 1)
+        return ranked
+
+    def _scored(self, profile: FeeProfile) -> CandidateColumns:
+        """Candidates scored under a fee profile, computed on first use."""
+        key = (profile.broker_fee_pct, profile.sales_tax_pct)
+        scored = self._rescored.get(key)
+        if scored is not None:
+            return scored
+
+        quotes = QuoteColumns()
+        for c in self.candidates:
+            quotes.append(
+                c.item_id,
+                c.from_hub_id,
+                c.to_hub_id,
+                c.buy_price,
+                c.sell_price,
+                c.liquidity_24h,
+                max(
+                    self.volatility.get((c.item_id, c.from_hub_id), 0.0),
+                    self.volatility.get((c.item_id, c.to_hub_id), 0.0),
+                ),
+                c.forecast_sell_price,
+            )
+        scored = score_quotes(quotes, profile, ArbitrageEngine.capture_ratio, self.decay)
+
+        if len(self._rescored) >= RESCORED_PROFILES_MAX:
+            del self._rescored[next(iter(self._rescored))]
+        self._rescored[key] = scored
+        return scored
+
+
+class LatestRunCache:
+    """
+    Latest completed run held in memory.
+
+    Runs saved in this process are published when their transaction commits.
+    Runs saved elsewhere (the worker, other replicas) are picked up by a
+    lightweight latest-run check at most every ``check_seconds``; only a new
+    run ID triggers loading its items. Between checks reads touch no database.
+    """
+
+    def __init__(self, check_seconds: Optional[float] = None) -> None:
+        self.check_seconds = (
+            settings.latest_run_check_seconds if check_seconds is None else check_seconds
+        )
+        self._run: Optional[LatestRun] = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def current(self) -> Optional[LatestRun]:
+        """Cached run as is, without revalidating."""
+        return self._run
+
+    def publish(self, run: LatestRun) -> None:
+        """Replace the cached run unless a newer one is already held."""
+        if self._run is None or run.run_id >= self._run.run_id:
+            self._run = run
+            self._checked_at = time.monotonic()
+            logger.info("latest_run_cached", run_id=run.run_id, candidates=len(run.candidates))
+
+    def expire(self) -> None:
+        """Revalidate on the next read, e.g. after another process saved a run."""
+        self._checked_at = float("-inf")
+
+    def clear(self) -> None:
+        """Forget the cached run."""
+        self._run = None
+        self._checked_at = float("-inf")
+
+    async def get(self, session: AsyncSession) -> Optional[LatestRun]:
+        """Latest completed run, revalidated against the database when the check is due."""
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return self._run
+
+        # One request revalidates, concurrent ones keep serving the cached run
+        if self._lock.locked():
+            return self._run
+
+        async with self._lock:
+            latest = await ArbitrageRunRepository(session).get_latest_completed_run()
+            if latest is not None and (self._run is None or latest.run_id > self._run.run_id):
+                self.publish(await _load_latest(session, latest))
+            self._checked_at = time.monotonic()
+
+        return self._run
+
+    async def latest(self, session: AsyncSession) -> Optional[LatestRun]:
+        """
+        Latest completed run as the database has it now, without the check interval.
+
+        The cached run is reused when it is that run; the cache is left as is.
+        """
+        latest = await ArbitrageRunRepository(session).get_latest_completed_run()
+        if latest is None:
+            return None
+        if self._run is not None and self._run.run_id == latest.run_id:
+            return self._run
+        return await _load_latest(session, latest)
+
+
+latest_run_cache = LatestRunCache()
+
+
+async def _load_latest(session: AsyncSession, latest: AnalyticsArbitrageRun) -> LatestRun:
+    """Load a completed run's candidates, station trades and the inputs to rescore them."""
+    candidates = await ArbitrageEngine(session).load_run(latest.run_id)
+    return LatestRun(
+        latest.run_id,
+        latest.created_at,
+        candidates,
+        station_from_meta(latest.meta),
+        await route_volatility(session, candidates),
+        await load_decay_table(session) or None,
+    )
+
+
+async def route_volatility(
+    session: AsyncSession, candidates: Sequence[ArbitrageCandidate]
+) -> Dict[Tuple[int, int], float]:
+    """Volatility of the (item, hub) series at either end of the candidates' routes."""
+    series: Set[Tuple[int, int]] = set()
+    for c in candidates:
+        series.add((c.item_id, c.from_hub_id))
+        series.add((c.item_id, c.to_hub_id))
+    if not series:
+        return {}
+    volatility = await load_volatility(session, hub_ids=sorted({hub for _, hub in series}))
+    return {key: volatility[key] for key in series if key in volatility}
+
+
+def station_from_meta(meta: Optional[dict]) -> List[StationTradeCandidate]:
+    """Station trades kept in a run's metadata by ``find_station_trades``."""
+    return [StationTradeCandidate(**row) for row in (meta or {}).get("station", [])]
+
+
+def publish_run(run: LatestRun, base: Optional[LatestRun]) -> None:
+    """
+    Make a committed run current and push its diff against ``base`` to stream clients.
+
+    Runs from synchronous commit hooks; the broker publish is scheduled on
+    the running event loop.
+    """
+    latest_run_cache.publish(run)
+    publish_diff(run_diff(run, base))
+
+
+def run_diff(run: LatestRun, base: Optional[LatestRun]) -> dict:
+    """Stream message with a run's diff against ``base``, or against nothing."""
+    return diff_candidates(
+        base.candidates if base is not None else [],
+        run.candidates,
+        run.run_id,
+        base.run_id if base is not None else None,
+    ).as_message()
+
+
+def publish_diff(message: dict) -> None:
+    """Push a committed run's diff message to stream clients, on the running event loop."""
+    get_broker().publish_soon(message)
+    logger.info(
+        "run_diff_published",
+        run_id=message["run_id"],
+        base_run_id=message["base_run_id"],
+        added=len(message["added"]),
+        removed=len(message["removed"]),
+        changed=len(message["changed"]),
+    )
@@ -0,0 +1,258 @@
+"""Process-pool sharded arbitrage scoring over shared-memory book arrays."""
+
+import asyncio
+import atexit
+import heapq
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+from eve_intel.analytics.arbitrage import (
+    ArbitrageCandidate,
+    quotes_from_books,
+    rank_candidates,
+    rank_key,
+    score_quotes,
+)
+from eve_intel.analytics.books import MarketBooks
+from eve_intel.analytics.decay import DecayTable
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.pruning import PairPruner, PruneStats
+from eve_intel.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Numeric MarketBooks columns shipped to workers, all 8 bytes wide
+SHARED_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("item_id", "q"),
+    ("hub_id", "q"),
+    ("best_bid", "d"),
+    ("bid_qty", "q"),
+    ("best_ask", "d"),
+    ("ask_qty", "q"),
+    ("volatility", "d"),
+    ("liquidity", "d"),
+    ("price_low", "d"),
+    ("price_high", "d"),
+    ("forecast_drift", "d"),
+)
+ITEM_SIZE = 8
+
+
+@dataclass
+class ShardResult:
+    """Ranked candidates of one shard, per fee profile."""
+
+    shard: int
+    candidates: Dict[str, List[ArbitrageCandidate]]
+    num_quotes: int
+    elapsed_seconds: float
+    pruning: Optional[PruneStats] = None
+
+
+def share_books(books: MarketBooks) -> SharedMemory:
+    """Copy the numeric book columns into one shared memory block, column after column."""
+    rows = len(books)
+    shm = SharedMemory(create=True, size=max(rows * ITEM_SIZE * len(SHARED_COLUMNS), 1))
+    for k, (name, _) in enumerate(SHARED_COLUMNS):
+        offset = k * rows * ITEM_SIZE
+        shm.buf[offset : offset + rows * ITEM_SIZE] = getattr(books, name).tobytes()
+    return shm
+
+
+class SharedPool:
+    """Process pool spawned once and reused across runs, sized by the last caller."""
+
+    def __init__(self) -> None:
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.workers = 0
+
+    def get(self, workers: int) -> ProcessPoolExecutor:
+        """The pool, (re)created when the worker count changes."""
+        if self.executor is None or self.workers != workers:
+            self.shutdown()
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self.workers = workers
+        return self.executor
+
+    def shutdown(self) -> None:
+        """Stop the pool's worker processes."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor, self.workers = None, 0
+
+
+_shared_pool = SharedPool()
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared process pool, (re)created when the worker count changes."""
+    return _shared_pool.get(workers)
+
+
+def shutdown_pool() -> None:
+    """Stop the shared pool's worker processes."""
+    _shared_pool.shutdown()
+
+
+atexit.register(shutdown_pool)
+
+
+def attach_books(shm: SharedMemory, rows: int) -> MarketBooks:
+    """View shared memory columns as MarketBooks without copying."""
+    columns = {}
+    for k, (name, typecode) in enumerate(SHARED_COLUMNS):
+        offset = k * rows * ITEM_SIZE
+        columns[name] = shm.buf[offset : offset + rows * ITEM_SIZE].cast(typecode)
+    return MarketBooks(**columns)
+
+
+def score_shard(
+    shm_name: str,
+    rows: int,
+    shard: int,
+    num_shards: int,
+    profiles: List[FeeProfile],
+    capture_ratio: float,
+    thresholds: Tuple[float, float, float],
+    only_items: Optional[List[int]],
+    top_k: Optional[int],
+    decay: Optional[DecayTable] = None,
+    pruner: Optional[PairPruner] = None,
+    by_forecast: bool = False,
+) -> ShardResult:
+    """Score the items of one shard (``item_id % num_shards == shard``) in a worker process."""
+    started = time.perf_counter()
+    min_ev, min_margin, min_liq = thresholds
+
+    shm = SharedMemory(name=shm_name)
+    books = None
+    try:
+        books = attach_books(shm, rows)
+        wanted = set(only_items) if only_items is not None else None
+        shard_items = {
+            item_id
+            for item_id in books.item_id
+            if item_id % num_shards == shard and (wanted is None or item_id in wanted)
+        }
+        quotes = quotes_from_books(books, shard_items, pruner)
+        liquidity = quotes.liquidity_24h
+        quotes = quotes.take(i for i in range(len(quotes)) if liquidity[i] >= min_liq)
+
+        candidates = {}
+        for profile in profiles:
+            scored = score_quotes(quotes, profile, capture_ratio, decay)
+            candidates[profile.name] = rank_candidates(
+                scored, min_ev, min_margin, top_k, by_forecast
+            )
+    finally:
+        # Release views before closing, the buffer cannot be released while exported
+        if books is not None:
+            for name, _ in SHARED_COLUMNS:
+                getattr(books, name).release()
+        shm.close()
+
+    return ShardResult(
+        shard=shard,
+        candidates=candidates,
+        num_quotes=len(quotes),
+        elapsed_seconds=time.perf_counter() - started,
+        pruning=pruner.stats if pruner is not None else None,
+    )
+
+
+async def score_books_parallel(
+    books: MarketBooks,
+    profiles: List[FeeProfile],
+    workers: int,
+    capture_ratio: float,
+    thresholds: Tuple[float, float, float],
+    only_items: Optional[List[int]] = None,
+    top_k: Optional[int] = None,
+    decay: Optional[DecayTable] = None,
+    pruner: Optional[PairPruner] = None,
+    by_forecast: bool = False,
+) -> Tuple[Dict[str, List[ArbitrageCandidate]], dict]:
+    """
+    Shard the item universe across a process pool and merge shard results.
+
+    Book columns travel through shared memory; only shard parameters and the
+    shards' ranked candidates are pickled. Worker processes are spawned on
+    the first run and reused by later ones. Returns merged candidates per
+    profile (globally ranked, cut to ``top_k``) and run metadata with the
+    per-core scaling efficiency.
+    """
+    started = time.perf_counter()
+    shm = share_books(books)
+    try:
+        loop = asyncio.get_running_loop()
+        pool = get_pool(workers)
+        futures = [
+            loop.run_in_executor(
+                pool,
+                score_shard,
+                shm.name,
+                len(books),
+                shard,
+                workers,
+                profiles,
+                capture_ratio,
+                thresholds,
+                only_items,
+                top_k,
+                decay,
+                pruner,
+                by_forecast,
+            )
+            for shard in range(workers)
+        ]
+        try:
+            shard_results: List[ShardResult] = list(await asyncio.gather(*futures))
+        except BrokenProcessPool:
+            # A worker died; start from a fresh pool on the next run
+            shutdown_pool()
+            raise
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Shard lists are already ranked, a k-way merge gives the global top-K
+    results: Dict[str, List[ArbitrageCandidate]] = {}
+    for profile in profiles:
+        merged = heapq.merge(
+            *(r.candidates[profile.name] for r in shard_results),
+            key=rank_key(by_forecast),
+            reverse=True,
+        )
+        results[profile.name] = list(islice(merged, top_k))
+
+    wall = time.perf_counter() - started
+    busy = sum(r.elapsed_seconds for r in shard_results)
+    meta = {
+        "workers": workers,
+        "wall_seconds": round(wall, 4),
+        "shard_seconds": [round(r.elapsed_seconds, 4) for r in shard_results],
+        "shard_quotes": [r.num_quotes for r in shard_results],
+        # Serial-equivalent work over wall time, divided by the cores used
+        "speedup": round(busy / wall, 3) if wall > 0 else 0.0,
+        "efficiency_per_core": round(busy / (wall * workers), 3) if wall > 0 else 0.0,
+    }
+    if pruner is not None:
+        # Each worker pruned its own shard with a copy of the pruner
+        pruning = PruneStats()
+        for r in shard_results:
+            if r.pruning is not None:
+                pruning.merge(r.pruning)
+        pruner.stats = pruning
+        meta["pair_pruning"] = pruning.as_meta()
+
+    logger.info("arbitrage_parallel_scored", **meta)
+
+    return results, meta
@@ -0,0 +1,112 @@
+"""Bounds-based pruning of item x hub pairs that can never reach the margin threshold."""
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+from eve_intel.analytics.books import MarketBooks
+from eve_intel.analytics.fees import FeeProfile
+
+
+@dataclass
+class PruneStats:
+    """Hub pairs considered and skipped by the pruner, mergeable across shards."""
+
+    pairs: int = 0
+    pruned: int = 0
+    items_pruned: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """Share of considered pairs that were skipped."""
+        return self.pruned / self.pairs if self.pairs else 0.0
+
+    def merge(self, other: "PruneStats") -> None:
+        """Add another shard's counts."""
+        self.pairs += other.pairs
+        self.pruned += other.pruned
+        self.items_pruned += other.items_pruned
+
+    def as_meta(self) -> dict:
+        """Summary for run metadata."""
+        return {
+            "pairs": self.pairs,
+            "pruned": self.pruned,
+            "items_pruned": self.items_pruned,
+            "ratio": round(self.ratio, 4),
+        }
+
+
+@dataclass
+class PairPruner:
+    """
+    Optimistic margin bound over each series' historical traded price band.
+
+    A route buys at the source hub and sells at the destination hub, so its
+    net margin can at best be reached by buying at the source's lowest traded
+    price and selling at the destination's highest, each widened by
+    ``slack_pct``. Current asks outside the band replace its edge, so a price
+    breaking out of its history still bounds the route from above and the
+    pruning stays exact. Pairs whose bound is below ``min_margin_pct`` are
+    skipped. Series without a band (``price_low = 0``) are never pruned.
+    """
+
+    broker: float
+    sell_rate: float
+    min_margin_pct: float
+    slack_pct: float = 0.0
+    stats: PruneStats = field(default_factory=PruneStats)
+
+    @classmethod
+    def from_profiles(
+        cls, profiles: Sequence[FeeProfile], min_margin_pct: float, slack_pct: float
+    ) -> "PairPruner":
+        """Pruner using the lowest fees of the given profiles, safe for all of them."""
+        broker = min(p.broker_fee_pct for p in profiles) / 100.0
+        sell_rate = broker + min(p.sales_tax_pct for p in profiles) / 100.0
+        return cls(broker, sell_rate, min_margin_pct, slack_pct)
+
+    def margin_bound(
+        self, low: float, high: float, buy_ask: float = math.inf, sell_ask: float = 0.0
+    ) -> float:
+        """
+        Best net margin % of buying at ``low`` and selling at ``high``, slack applied.
+
+        A current ``buy_ask`` below the widened floor or ``sell_ask`` above the
+        widened ceiling is used instead.
+        """
+        if low <= 0:
+            return float("inf")
+        buy = min(low * (1 - self.slack_pct / 100.0), buy_ask)
+        sell = max(high * (1 + self.slack_pct / 100.0), sell_ask)
+        return (sell * (1 - self.sell_rate) - buy * (1 + self.broker)) / buy * 100.0
+
+    def skip_item(self, books: MarketBooks, rows: List[int]) -> bool:
+        """
+        Count the item's hub pairs and skip it when no pair can pass.
+
+        The lowest band floor and highest band ceiling across hubs, and the
+        lowest and highest current asks, bound every pair of the item at once;
+        one hub without a band keeps the item.
+        """
+        pairs = len(rows) * (len(rows) - 1)
+        self.stats.pairs += pairs
+        low = min(books.price_low[i] for i in rows)
+        high = max(books.price_high[i] for i in rows)
+        asks = [books.best_ask[i] for i in rows if not math.isinf(books.best_ask[i])]
+        bound = self.margin_bound(low, high, min(asks, default=math.inf), max(asks, default=0.0))
+        if bound >= self.min_margin_pct:
+            return False
+        self.stats.pruned += pairs
+        self.stats.items_pruned += 1
+        return True
+
+    def skip_pair(self, books: MarketBooks, i: int, j: int) -> bool:
+        """Whether buying at row ``i`` and selling at row ``j`` can never pass."""
+        bound = self.margin_bound(
+            books.price_low[i], books.price_high[j], books.best_ask[i], books.best_ask[j]
+        )
+        if bound >= self.min_margin_pct:
+            return False
+        self.stats.pruned += 1
+        return True
@@ -0,0 +1,174 @@
+"""Order data-quality filter applied before top-of-book arrays are built."""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.books import BookKey, MarketBooks, build_books
+from eve_intel.db.repositories import OrderSnapshotRepository, PriceHistoryRepository
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+# Scales MAD to a standard deviation for normally distributed prices
+MAD_SCALE = 1.4826
+
+# Orders needed in a book before its own median is trusted as a reference
+MIN_BOOK_ORDERS = 3
+
+
+@dataclass
+class QualityReport:
+    """Orders kept and dropped by the quality filter, in total and per hub."""
+
+    kept: int = 0
+    outside_band: int = 0
+    below_notional: int = 0
+    by_hub: Dict[int, Dict[str, int]] = field(default_factory=dict)
+
+    def as_meta(self) -> dict:
+        """Summary for run metadata."""
+        return {
+            "kept": self.kept,
+            "outside_band": self.outside_band,
+            "below_notional": self.below_notional,
+            "by_hub": {str(hub): counts for hub, counts in self.by_hub.items()},
+        }
+
+
+def _median_mad(prices: List[float]) -> Tuple[float, float]:
+    """Median and median absolute deviation."""
+    mid = median(prices)
+    return mid, median(abs(p - mid) for p in prices)
+
+
+def reference_prices(rows: Iterable[Tuple]) -> Dict[BookKey, Tuple[float, float]]:
+    """Median and MAD per series from ``(item_id, hub_id, price)`` rows grouped by series."""
+    return {
+        key: _median_mad([r[2] for r in series])
+        for key, series in groupby(rows, key=lambda r: (r[0], r[1]))
+    }
+
+
+def filter_orders(
+    orders: Sequence[Tuple],
+    references: Dict[BookKey, Tuple[float, float]],
+    band_mad: float,
+    band_min_pct: float,
+    min_notional: float,
+) -> Tuple[List[Tuple], QualityReport]:
+    """
+    Drop bait and junk orders, one columnar pass per hub.
+
+    Rows are ``(item_id, hub_id, order_id, side, price, qty, ts_snapshot)``.
+    An order is dropped when ``price x qty`` is below ``min_notional`` or
+    its price lies outside ``median +/- max(band_mad x MAD, band_min_pct %
+    of median)`` of the series' history. Books without history use the
+    median of their own orders once they have enough of them; otherwise
+    only the notional check applies.
+    """
+    by_hub: Dict[int, List[int]] = defaultdict(list)
+    for i, row in enumerate(orders):
+        by_hub[row[1]].append(i)
+
+    report = QualityReport()
+    kept_rows: List[Tuple] = []
+    for hub_id, rows in sorted(by_hub.items()):
+        items = [orders[i][0] for i in rows]
+        price = [orders[i][4] for i in rows]
+        qty = [orders[i][5] for i in rows]
+
+        # Fall back to the book's own median where there is no history
+        book_prices: Dict[int, List[float]] = defaultdict(list)
+        for item_id, p in zip(items, price, strict=True):
+            if (item_id, hub_id) not in references:
+                book_prices[item_id].append(p)
+        book_refs = {
+            item_id: _median_mad(prices)
+            for item_id, prices in book_prices.items()
+            if len(prices) >= MIN_BOOK_ORDERS
+        }
+
+        low = []
+        high = []
+        for item_id in items:
+            ref = references.get((item_id, hub_id)) or book_refs.get(item_id)
+            if ref is None:
+                low.append(0.0)
+                high.append(float("inf"))
+                continue
+            mid, mad = ref
+            width = max(band_mad * MAD_SCALE * mad, band_min_pct / 100.0 * mid)
+            low.append(mid - width)
+            high.append(mid + width)
+
+        notional_ok = [p * q >= min_notional for p, q in zip(price, qty, strict=True)]
+        band_ok = [lo <= p <= hi for p, lo, hi in zip(price, low, high, strict=True)]
+
+        counts = {
+            "kept": 0,
+            "outside_band": band_ok.count(False),
+            "below_notional": sum(
+                1 for n, b in zip(notional_ok, band_ok, strict=True) if b and not n
+            ),
+        }
+        for k, i in enumerate(rows):
+            if notional_ok[k] and band_ok[k]:
+                kept_rows.append(orders[i])
+                counts["kept"] += 1
+
+        report.by_hub[hub_id] = counts
+        report.kept += counts["kept"]
+        report.outside_band += counts["outside_band"]
+        report.below_notional += counts["below_notional"]
+
+    return kept_rows, report
+
+
+async def load_clean_books(
+    session: AsyncSession,
+    hub_ids: List[int],
+    as_of: Optional[datetime] = None,
+    first_after: bool = False,
+) -> Tuple[MarketBooks, QualityReport]:
+    """
+    Load the latest snapshot of each hub, filter junk orders and build books.
+
+    With ``first_after`` each hub's first snapshot at or after ``as_of`` is
+    loaded instead (backtest settlement). Reference prices come from the
+    price history window ending at ``as_of`` (now when None), read in one
+    bulk query.
+    """
+    repo = OrderSnapshotRepository(session)
+    if first_after and as_of is not None:
+        rows = await repo.get_first_snapshot_rows(hub_ids, as_of)
+    else:
+        rows = await repo.get_latest_snapshot_rows(hub_ids, as_of=as_of)
+
+    end = as_of or datetime.now(UTC)
+    history = await PriceHistoryRepository(session).get_prices(
+        hub_ids, end - timedelta(days=settings.order_reference_days), end
+    )
+
+    kept, report = filter_orders(
+        rows,
+        reference_prices(history),
+        settings.order_band_mad,
+        settings.order_band_min_pct,
+        settings.order_min_notional_isk,
+    )
+
+    logger.info(
+        "orders_filtered",
+        kept=report.kept,
+        outside_band=report.outside_band,
+        below_notional=report.below_notional,
+    )
+
+    return build_books(kept), report
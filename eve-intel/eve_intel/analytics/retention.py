@@ -0,0 +1,166 @@
+"""Retention for stored runs: full detail while recent, top N later, nothing past the horizon."""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.db.repositories import (
+    ArbitrageItemRepository,
+    ArbitrageRunRepository,
+    RunDiffRepository,
+    RunSummaryRepository,
+)
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+# Tables whose statistics and free space are refreshed after deletions
+MAINTAINED_TABLES = (
+    "analytics_arbitrage_item",
+    "analytics_run_diff",
+    "analytics_run_summary",
+    "analytics_arbitrage_run",
+)
+
+# Runs handled per selection round
+RUNS_PER_ROUND = 50
+
+
+@dataclass
+class RetentionStats:
+    """Work done by one retention pass."""
+
+    runs_compacted: int = 0
+    runs_deleted: int = 0
+    items_deleted: int = 0
+    batches: int = 0
+
+    def as_meta(self) -> dict:
+        """Summary for logging."""
+        return {
+            "runs_compacted": self.runs_compacted,
+            "runs_deleted": self.runs_deleted,
+            "items_deleted": self.items_deleted,
+            "batches": self.batches,
+        }
+
+
+class RetentionJob:
+    """
+    Downsamples and deletes stored runs in bounded batches.
+
+    Runs older than ``full_days`` keep their ``top_n`` items by EV, with
+    aggregate statistics of the full run recorded in their metadata. Runs
+    older than ``max_days`` are deleted with their items and diffs. Every
+    batch of at most ``batch_size`` rows is committed on its own, so no
+    transaction holds row locks for long and concurrent runs keep saving.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        full_days: Optional[int] = None,
+        max_days: Optional[int] = None,
+        top_n: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self.session = session
+        self.full_days = settings.retention_full_days if full_days is None else full_days
+        self.max_days = settings.retention_max_days if max_days is None else max_days
+        self.top_n = settings.retention_top_n if top_n is None else top_n
+        self.batch_size = batch_size or settings.retention_batch_size
+        self.run_repo = ArbitrageRunRepository(session)
+        self.item_repo = ArbitrageItemRepository(session)
+        self.diff_repo = RunDiffRepository(session)
+        self.summary_repo = RunSummaryRepository(session)
+        self.stats = RetentionStats()
+        self._keep_from: Optional[int] = None
+
+    async def run(self, now: Optional[datetime] = None) -> RetentionStats:
+        """
+        Apply both horizons; expired runs go first so they are not compacted needlessly.
+
+        The latest completed run is always kept whole: it is the one read
+        endpoints serve and incremental runs carry results from.
+        """
+        now = now or datetime.now(UTC)
+        latest = await self.run_repo.get_latest_completed_run()
+        self._keep_from = latest.run_id if latest is not None else None
+        if self.max_days > 0:
+            await self.delete_expired(now - timedelta(days=self.max_days))
+        if self.full_days > 0:
+            await self.compact(now - timedelta(days=self.full_days))
+        return self.stats
+
+    async def delete_expired(self, cutoff: datetime) -> None:
+        """Delete runs created before the cutoff, items first, with their diffs and summaries."""
+        while True:
+            run_ids = await self.run_repo.get_expired_ids(cutoff, RUNS_PER_ROUND, self._keep_from)
+            if not run_ids:
+                return
+            await self._delete_items(run_ids)
+            await self.diff_repo.delete_by_runs(run_ids)
+            await self.summary_repo.delete_by_runs(run_ids)
+            await self.run_repo.delete_runs(run_ids)
+            await self.session.commit()
+            self.stats.runs_deleted += len(run_ids)
+
+    async def compact(self, cutoff: datetime) -> None:
+        """Downsample runs created before the cutoff to their top N items."""
+        while True:
+            runs = await self.run_repo.get_for_compaction(cutoff, RUNS_PER_ROUND, self._keep_from)
+            if not runs:
+                return
+            for run in runs:
+                aggregates = await self.item_repo.get_run_stats(run.run_id)
+                if self.top_n <= 0:
+                    await self._delete_items([run.run_id])
+                else:
+                    # Items ranked after the Nth go; runs with fewer items keep them all
+                    keep_after = await self.item_repo.get_key_at(run.run_id, self.top_n - 1)
+                    if keep_after is not None:
+                        await self._delete_items([run.run_id], keep_after)
+
+                meta = dict(run.meta or {})
+                meta["compaction"] = {
+                    **aggregates,
+                    "kept": max(min(self.top_n, aggregates["items"]), 0),
+                }
+                await self.run_repo.mark_compacted(run.run_id, meta)
+                await self.session.commit()
+                self.stats.runs_compacted += 1
+
+    async def _delete_items(
+        self, run_ids: List[int], after: Optional[Tuple[float, int]] = None
+    ) -> None:
+        while True:
+            deleted = await self.item_repo.delete_batch(run_ids, self.batch_size, after)
+            await self.session.commit()
+            self.stats.items_deleted += deleted
+            self.stats.batches += 1
+            if deleted < self.batch_size:
+                return
+            # Let other tasks on the loop (and their transactions) in between batches
+            await asyncio.sleep(0)
+
+
+async def vacuum_analyze(session: AsyncSession) -> None:
+    """
+    Reclaim space and refresh planner statistics after retention deletes.
+
+    VACUUM cannot run inside a transaction, so it goes through its own
+    autocommit connection; only PostgreSQL is maintained.
+    """
+    engine = session.bind
+    if engine is None or engine.dialect.name != "postgresql":
+        return
+    async with engine.connect() as conn:
+        autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in MAINTAINED_TABLES:
+            await autocommit.execute(text(f"VACUUM (ANALYZE) {table}"))
+    logger.info("retention_vacuum_complete", tables=list(MAINTAINED_TABLES))
@@ -0,0 +1,187 @@
+"""Hub route graph with precomputed jump distances."""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from eve_intel.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Column names accepted for the two ends of a stargate jump (plain and SDE export)
+FROM_COLUMNS = ("from_system_id", "fromSolarSystemID")
+TO_COLUMNS = ("to_system_id", "toSolarSystemID")
+
+UNREACHABLE = -1
+
+
+def _column(fieldnames: List[str], candidates: Iterable[str], path: Path) -> str:
+    """Pick the first known column present in a CSV header."""
+    for name in candidates:
+        if name in fieldnames:
+            return name
+    msg = f"{path}: expected one of {', '.join(candidates)} columns"
+    raise ValueError(msg)
+
+
+def load_adjacency(path: Path) -> Dict[int, Set[int]]:
+    """
+    Load solar-system adjacency from a CSV of stargate jumps.
+
+    Accepts ``from_system_id,to_system_id`` or the SDE ``mapSolarSystemJumps``
+    export. Jumps are treated as undirected.
+    """
+    adjacency: Dict[int, Set[int]] = defaultdict(set)
+    with path.open(newline="") as f:
+        reader = csv.DictReader(f)
+        from_col = _column(reader.fieldnames or [], FROM_COLUMNS, path)
+        to_col = _column(reader.fieldnames or [], TO_COLUMNS, path)
+        for row in reader:
+            a, b = int(row[from_col]), int(row[to_col])
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+    return adjacency
+
+
+def shortest_jumps(adjacency: Dict[int, Set[int]], systems: List[int]) -> List[array]:
+    """
+    All-pairs jump counts between the given systems.
+
+    One breadth-first search per system over the unweighted jump graph;
+    unreachable pairs are ``UNREACHABLE``.
+    """
+    position = {system: k for k, system in enumerate(systems)}
+    matrix = []
+    for source in systems:
+        row = array("i", [UNREACHABLE] * len(systems))
+        remaining = len(systems)
+        distance = {source: 0}
+        queue = deque([source])
+        while queue and remaining:
+            system = queue.popleft()
+            if system in position:
+                row[position[system]] = distance[system]
+                remaining -= 1
+            for neighbour in adjacency.get(system, ()):
+                if neighbour not in distance:
+                    distance[neighbour] = distance[system] + 1
+                    queue.append(neighbour)
+        matrix.append(row)
+    return matrix
+
+
+@dataclass
+class RouteGraph:
+    """Jump distances between market hubs, looked up in O(1) by hub pair."""
+
+    hub_systems: Dict[int, int]
+    systems: List[int]
+    matrix: List[array]
+
+    def __post_init__(self) -> None:
+        position = {system: k for k, system in enumerate(self.systems)}
+        self._hub_index = {
+            hub_id: position[system]
+            for hub_id, system in self.hub_systems.items()
+            if system in position
+        }
+
+    def jumps(self, from_hub_id: int, to_hub_id: int) -> Optional[int]:
+        """Jumps between two hubs, or None when unknown or unreachable."""
+        i = self._hub_index.get(from_hub_id)
+        j = self._hub_index.get(to_hub_id)
+        if i is None or j is None:
+            return None
+        value = self.matrix[i][j]
+        return None if value == UNREACHABLE else value
+
+    def annotate(self, candidates: Iterable) -> None:
+        """Set ``jumps`` and ``ev_per_jump`` on candidates in place."""
+        for c in candidates:
+            c.jumps = self.jumps(c.from_hub_id, c.to_hub_id)
+            # Same-system hubs take no jumps, count them as one trip
+            c.ev_per_jump = c.ev_isk / max(c.jumps, 1) if c.jumps is not None else None
+
+
+def _cache_key(path: Path, systems: List[int]) -> str:
+    """Identify a matrix by adjacency file version and the systems it covers."""
+    # The file's path, mtime and size stand in for its contents, so hits never read it
+    stat = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    digest.update(",".join(map(str, systems)).encode())
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: Path) -> Optional[Tuple[List[int], List[array]]]:
+    """Systems and jump matrix of a cache file, None when missing or unreadable."""
+    try:
+        cached = json.loads(cache_path.read_text())
+        return cached["systems"], [array("i", row) for row in cached["matrix"]]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("route_graph_cache_unreadable", cache=str(cache_path), error=str(e))
+        return None
+
+
+def _write_cache(cache_path: Path, payload: dict) -> None:
+    """Write a cache file through a temporary file, so readers never see a partial one."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        tmp_path.replace(cache_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def load_route_graph(
+    hub_systems: Dict[int, int], jumps_file: str, cache_dir: str
+) -> Optional[RouteGraph]:
+    """
+    Build the hub route graph, reusing a cached jump matrix when possible.
+
+    The matrix is cached on disk under a key derived from the adjacency file
+    and the hub systems, so it is only recomputed when either changes. Cache
+    files are replaced atomically and an unreadable one counts as a miss.
+    Returns None when no adjacency file is configured or it does not exist.
+    """
+    if not jumps_file:
+        return None
+    path = Path(jumps_file)
+    if not path.exists():
+        logger.warning("route_graph_unavailable", jumps_file=str(path))
+        return None
+
+    systems = sorted(set(hub_systems.values()))
+    cache_path = Path(cache_dir) / f"jumps-{_cache_key(path, systems)}.json"
+
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        logger.debug("route_graph_cache_hit", cache=str(cache_path))
+        return RouteGraph(hub_systems=hub_systems, systems=cached[0], matrix=cached[1])
+
+    adjacency = load_adjacency(path)
+    matrix = shortest_jumps(adjacency, systems)
+    _write_cache(cache_path, {"systems": systems, "matrix": [list(r) for r in matrix]})
+
+    logger.info(
+        "route_graph_built",
+        systems=len(adjacency),
+        hubs=len(hub_systems),
+        cache=str(cache_path),
+    )
+
+    return RouteGraph(hub_systems=hub_systems, systems=systems, matrix=matrix)
+
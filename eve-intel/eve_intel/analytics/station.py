@@ -0,0 +1,107 @@
+"""Same-hub station trading on the bid/ask spread of each book."""
+
+import heapq
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from eve_intel.analytics.books import MarketBooks
+from eve_intel.analytics.fees import FeeProfile, calculate_spread_pct
+
+
+@dataclass(slots=True)
+class StationTradeCandidate:
+    """Station trading opportunity: buy via buy order, resell via sell order at one hub."""
+
+    item_id: int
+    hub_id: int
+    buy_price: float
+    sell_price: float
+    spread_pct: float
+    fees_total: float
+    net_margin_pct: float
+    daily_volume: float
+    units_per_day: float
+    ev_isk: float
+    capital_required: float
+
+
+def scan_station_trades(
+    books: MarketBooks,
+    daily_volume: Dict[Tuple[int, int], float],
+    profile: FeeProfile,
+    market_share: float,
+    min_ev: float,
+    min_margin: float,
+    top_k: Optional[int] = None,
+) -> List[StationTradeCandidate]:
+    """
+    Score every book's bid/ask spread for station trading, ranked by EV.
+
+    Buying through a buy order at the best bid pays the broker fee; reselling
+    through a sell order at the best ask pays broker fee and sales tax. Daily
+    units are the series' average traded volume times ``market_share``.
+    Works directly on the book columns, one pass over all rows.
+    """
+    broker = profile.broker_fee_pct / 100.0
+    sell_rate = broker + profile.sales_tax_pct / 100.0
+
+    bid = books.best_bid
+    ask = books.best_ask
+    n = len(books)
+
+    volume = array(
+        "d", (daily_volume.get((books.item_id[i], books.hub_id[i]), 0.0) for i in range(n))
+    )
+    fees_total = array(
+        "d",
+        (
+            bid[i] * broker + ask[i] * sell_rate if bid[i] > 0 and not math.isinf(ask[i]) else 0.0
+            for i in range(n)
+        ),
+    )
+    unit_profit = array(
+        "d",
+        (
+            ask[i] - bid[i] - fees_total[i] if bid[i] > 0 and not math.isinf(ask[i]) else 0.0
+            for i in range(n)
+        ),
+    )
+    # Margin on the capital tied up in the buy order, broker fee included
+    net_margin_pct = array(
+        "d",
+        (
+            unit_profit[i] / (bid[i] * (1 + broker)) * 100.0 if bid[i] > 0 else 0.0
+            for i in range(n)
+        ),
+    )
+    units = array("d", (v * market_share for v in volume))
+    ev_isk = array("d", (units[i] * unit_profit[i] for i in range(n)))
+
+    passing = [
+        i
+        for i in range(n)
+        if unit_profit[i] > 0 and ev_isk[i] >= min_ev and net_margin_pct[i] >= min_margin
+    ]
+    if top_k is not None and top_k < len(passing):
+        selected = heapq.nlargest(top_k, passing, key=ev_isk.__getitem__)
+    else:
+        selected = sorted(passing, key=ev_isk.__getitem__, reverse=True)
+
+    return [
+        StationTradeCandidate(
+            item_id=books.item_id[i],
+            hub_id=books.hub_id[i],
+            buy_price=bid[i],
+            sell_price=ask[i],
+            spread_pct=calculate_spread_pct(bid[i], ask[i]),
+            fees_total=fees_total[i],
+            net_margin_pct=net_margin_pct[i],
+            daily_volume=volume[i],
+            units_per_day=units[i],
+            ev_isk=ev_isk[i],
+            capital_required=units[i] * bid[i] * (1 + broker),
+        )
+        for i in selected
+    ]
@@ -0,0 +1,596 @@
+"""Incremental rolling statistics per (item, hub) price series."""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.db.models import SeriesStats
+from eve_intel.db.repositories import (
+    PriceHistoryRepository,
+    SeriesForecastRepository,
+    SeriesStatsRepository,
+)
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+SeriesKey = Tuple[int, int]
+
+# Stored avg_price per (item_id, hub_id, date), None when the row had no price
+PriceKey = Tuple[int, int, datetime]
+
+
+@dataclass
+class RollingStats:
+    """Welford running mean and variance supporting O(1) add and remove."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value to the window."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value: float) -> None:
+        """Remove a value that is leaving the window."""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the window."""
+        return self.m2 / self.count if self.count > 0 else 0.0
+
+    @property
+    def cv_pct(self) -> float:
+        """Coefficient of variation in percent, as in calculate_price_volatility."""
+        if self.count < 2 or self.mean == 0:
+            return 0.0
+        return (math.sqrt(self.variance) / self.mean) * 100.0
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (e.g. from SQLite) as UTC."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+PriceChange = Tuple[datetime, Optional[float], Optional[float]]
+
+# (series, window, target date, stored state, its last date, corrections) to fold
+StatsPlan = Tuple[
+    SeriesKey, int, datetime, Optional[SeriesStats], Optional[datetime], List[PriceChange]
+]
+
+
+def _group_prices(
+    prices: List[dict], previous: Optional[Dict[PriceKey, Optional[float]]]
+) -> Tuple[Dict[SeriesKey, List[Tuple[datetime, float]]], Dict[SeriesKey, List[PriceChange]]]:
+    """Priced rows per series by date, and (date, old, new) price changes per series."""
+    new_by_key: Dict[SeriesKey, List[Tuple[datetime, float]]] = defaultdict(list)
+    changed: Dict[SeriesKey, List[PriceChange]] = defaultdict(list)
+    for p in prices:
+        key = (p["item_id"], p["hub_id"])
+        date = _as_utc(p["date"])
+        if previous is not None:
+            old = previous.get((key[0], key[1], date))
+            if old != p.get("avg_price"):
+                changed[key].append((date, old, p.get("avg_price")))
+        if p.get("avg_price") is not None:
+            new_by_key[key].append((date, p["avg_price"]))
+
+    for values in new_by_key.values():
+        values.sort()
+    return new_by_key, changed
+
+
+class SeriesStatsUpdater:
+    """Folds newly ingested daily prices into persisted rolling statistics."""
+
+    def __init__(self, session: AsyncSession, windows: Optional[List[int]] = None) -> None:
+        self.session = session
+        self.price_repo = PriceHistoryRepository(session)
+        self.stats_repo = SeriesStatsRepository(session)
+        self.windows = windows or settings.stats_window_list
+
+    async def apply(
+        self, prices: List[dict], previous: Optional[Dict[PriceKey, Optional[float]]] = None
+    ) -> int:
+        """
+        Update rolling statistics with new PriceHistory rows.
+
+        Rows must already be stored. Each series costs O(1) per new day: the new
+        price is added and the price leaving the window is looked up by date.
+        Series without state are seeded from their stored history once.
+
+        ``previous`` holds the prices the upsert overwrote (rows missing from
+        it were new). Rows on days already folded into a window are then
+        applied as corrections, removing the old price and adding the new one,
+        so the window still matches what eviction will later read. Without
+        it, days already folded are ignored. Returns the number of
+        (series, window) states written.
+        """
+        new_by_key, changed = _group_prices(prices, previous)
+        if not new_by_key and not changed:
+            return 0
+
+        keys = set(new_by_key) | set(changed)
+        item_ids = sorted({k[0] for k in keys})
+        hub_ids = sorted({k[1] for k in keys})
+
+        existing: Dict[Tuple[int, int, int], SeriesStats] = {
+            (s.item_id, s.hub_id, s.window_days): s
+            for s in await self.stats_repo.get_for_series(item_ids, hub_ids)
+        }
+        plans, evict_dates, seed_keys = self._plan(keys, new_by_key, changed, existing)
+
+        history: Dict[SeriesKey, List[Tuple[datetime, float]]] = defaultdict(list)
+        if evict_dates:
+            for row in await self.price_repo.get_on_dates(item_ids, hub_ids, sorted(evict_dates)):
+                if row.avg_price is not None:
+                    history[(row.item_id, row.hub_id)].append((_as_utc(row.date), row.avg_price))
+        seed_history = await self._seed_history(seed_keys, new_by_key)
+
+        rows = [self._fold(plan, seed_history, history, new_by_key) for plan in plans]
+
+        await self.stats_repo.upsert_batch(rows)
+
+        logger.info("series_stats_updated", series=len(keys), states=len(rows))
+
+        return len(rows)
+
+    def _plan(
+        self,
+        keys: Set[SeriesKey],
+        new_by_key: Dict[SeriesKey, List[Tuple[datetime, float]]],
+        changed: Dict[SeriesKey, List[PriceChange]],
+        existing: Dict[Tuple[int, int, int], SeriesStats],
+    ) -> Tuple[List[StatsPlan], Set[datetime], Set[SeriesKey]]:
+        """
+        Plan each (series, window): either seed from history or slide the window.
+
+        Returns the plans, the dates of the prices leaving slid windows and
+        the series to seed.
+        """
+        evict_dates: Set[datetime] = set()
+        seed_keys: Set[SeriesKey] = set()
+        plans: List[StatsPlan] = []
+        for key in keys:
+            new_values = new_by_key.get(key)
+            for window in self.windows:
+                span = timedelta(days=window)
+                state = existing.get((key[0], key[1], window))
+                last_date = _as_utc(state.last_date) if state and state.last_date else None
+                if last_date is None and not new_values:
+                    continue
+
+                # Days of the current window whose price changed since it was folded
+                corrections = [
+                    (date, old, new)
+                    for date, old, new in changed.get(key, [])
+                    if last_date is not None and last_date - span < date <= last_date
+                ]
+                target_date = new_values[-1][0] if new_values else last_date
+                if last_date is not None and target_date <= last_date:
+                    if corrections:
+                        plans.append((key, window, last_date, state, last_date, corrections))
+                    continue
+
+                if last_date is None or target_date - span >= last_date:
+                    seed_keys.add(key)
+                    plans.append((key, window, target_date, None, None, []))
+                    continue
+
+                # Daily series: the prices leaving the window sit on these dates
+                day = last_date - span + timedelta(days=1)
+                while day <= target_date - span:
+                    evict_dates.add(day)
+                    day += timedelta(days=1)
+                plans.append((key, window, target_date, state, last_date, corrections))
+
+        return plans, evict_dates, seed_keys
+
+    @staticmethod
+    def _fold(
+        plan: StatsPlan,
+        seed_history: Dict[SeriesKey, List[Tuple[datetime, float]]],
+        history: Dict[SeriesKey, List[Tuple[datetime, float]]],
+        new_by_key: Dict[SeriesKey, List[Tuple[datetime, float]]],
+    ) -> dict:
+        """Carry out one plan and return the ``analytics_series_stats`` row it writes."""
+        key, window, target_date, state, last_date, corrections = plan
+        span = timedelta(days=window)
+        if state is None:
+            stats = RollingStats()
+            for date, price in seed_history[key]:
+                if target_date - span < date <= target_date:
+                    stats.add(price)
+        else:
+            stats = RollingStats(state.count, state.mean, state.m2)
+            for _, old, new in corrections:
+                if old is not None:
+                    stats.remove(old)
+                if new is not None:
+                    stats.add(new)
+            for date, price in history[key]:
+                if last_date - span < date <= target_date - span:
+                    stats.remove(price)
+            for date, price in new_by_key.get(key, []):
+                if date > last_date:
+                    stats.add(price)
+
+        return {
+            "item_id": key[0],
+            "hub_id": key[1],
+            "window_days": window,
+            "count": stats.count,
+            "mean": stats.mean,
+            "m2": stats.m2,
+            "last_date": target_date,
+        }
+
+    async def _seed_history(
+        self,
+        seed_keys: Set[SeriesKey],
+        new_by_key: Dict[SeriesKey, List[Tuple[datetime, float]]],
+    ) -> Dict[SeriesKey, List[Tuple[datetime, float]]]:
+        """Stored prices of the series to seed, back to their widest window."""
+        seed_history: Dict[SeriesKey, List[Tuple[datetime, float]]] = defaultdict(list)
+        if not seed_keys:
+            return seed_history
+        seed_rows = await self.price_repo.get_range(
+            sorted({k[0] for k in seed_keys}),
+            sorted({k[1] for k in seed_keys}),
+            min(new_by_key[k][-1][0] for k in seed_keys) - timedelta(days=max(self.windows)),
+            max(new_by_key[k][-1][0] for k in seed_keys),
+        )
+        for row in seed_rows:
+            key = (row.item_id, row.hub_id)
+            if key in seed_keys and row.avg_price is not None:
+                seed_history[key].append((_as_utc(row.date), row.avg_price))
+        return seed_history
+
+
+@dataclass
+class HoltState:
+    """Holt linear trend smoother on a daily series, updated in O(1) per observation."""
+
+    level: float
+    trend: float = 0.0
+    observations: int = 1
+
+    def update(self, value: float, days: float, alpha: float, beta: float) -> None:
+        """
+        Fold in an observation ``days`` after the previous one.
+
+        Gaps project the level along the trend first, and the trend update is
+        scaled back to a per-day slope.
+        """
+        days = max(days, 1.0)
+        previous = self.level
+        self.level = alpha * value + (1 - alpha) * (previous + days * self.trend)
+        self.trend = beta * (self.level - previous) / days + (1 - beta) * self.trend
+        self.observations += 1
+
+    def forecast(self, days: float) -> float:
+        """Level expected ``days`` after the last observation, never negative."""
+        return max(self.level + days * self.trend, 0.0)
+
+
+class ForecastUpdater:
+    """Folds newly ingested daily prices into persisted Holt forecaster states."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.repo = SeriesForecastRepository(session)
+
+    async def apply(self, prices: List[dict]) -> int:
+        """
+        Update forecasters with new PriceHistory rows.
+
+        One read of the touched series' states and one upsert; days at or
+        before a series' last update are ignored, so re-ingesting is safe.
+        Work is linear in the number of new rows, without retraining. Returns
+        the number of series written.
+        """
+        new_by_key: Dict[SeriesKey, List[Tuple[datetime, float]]] = defaultdict(list)
+        for p in prices:
+            if p.get("avg_price") is None:
+                continue
+            new_by_key[(p["item_id"], p["hub_id"])].append((_as_utc(p["date"]), p["avg_price"]))
+
+        if not new_by_key:
+            return 0
+
+        existing = {
+            (s.item_id, s.hub_id): s
+            for s in await self.repo.get_for_series(
+                sorted({k[0] for k in new_by_key}), sorted({k[1] for k in new_by_key})
+            )
+        }
+
+        alpha = settings.forecast_alpha
+        beta = settings.forecast_beta
+        rows = []
+        for key, values in new_by_key.items():
+            values.sort()
+            stored = existing.get(key)
+            if stored is not None:
+                state = HoltState(stored.level, stored.trend, stored.observations)
+                last_date = _as_utc(stored.last_date)
+            else:
+                last_date, first = values[0]
+                state = HoltState(first)
+
+            updated = stored is None
+            for date, price in values:
+                if date <= last_date:
+                    continue
+                state.update(price, (date - last_date).total_seconds() / 86400.0, alpha, beta)
+                last_date = date
+                updated = True
+
+            if updated:
+                rows.append(
+                    {
+                        "item_id": key[0],
+                        "hub_id": key[1],
+                        "level": state.level,
+                        "trend": state.trend,
+                        "observations": state.observations,
+                        "last_date": last_date,
+                    }
+                )
+
+        await self.repo.upsert_batch(rows)
+
+        logger.info("series_forecasts_updated", series=len(rows))
+
+        return len(rows)
+
+
+async def load_forecast_drift(
+    session: AsyncSession,
+    hub_ids: Optional[List[int]] = None,
+    at: Optional[datetime] = None,
+    min_observations: Optional[int] = None,
+) -> Dict[SeriesKey, float]:
+    """
+    Forecast relative price change per (item_id, hub_id) between now and ``at``.
+
+    The drift is the forecast level at ``at`` over the current level, minus
+    one, so it can be applied to any quote of the series. Series still
+    warming up are left out.
+    """
+    now = datetime.now(UTC)
+    at = _as_utc(at or now)
+    warm = settings.forecast_min_observations if min_observations is None else min_observations
+
+    drift = {}
+    for s in await SeriesForecastRepository(session).get_all(hub_ids):
+        if s.observations < warm or s.level <= 0:
+            continue
+        state = HoltState(s.level, s.trend, s.observations)
+        elapsed = (now - _as_utc(s.last_date)).total_seconds() / 86400.0
+        ahead = (at - _as_utc(s.last_date)).total_seconds() / 86400.0
+        current = state.forecast(max(elapsed, 0.0))
+        if current > 0:
+            drift[(s.item_id, s.hub_id)] = state.forecast(max(ahead, 0.0)) / current - 1.0
+    return drift
+
+
+def trimmed_mean(values: List[float], trim_pct: float) -> float:
+    """Mean after dropping ``trim_pct`` percent of values from each end."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = int(len(ordered) * trim_pct / 100.0)
+    kept = ordered[k : len(ordered) - k] or ordered
+    return sum(kept) / len(kept)
+
+
+def liquidity_from_turnover(
+    rows: Iterable[Tuple], end: datetime, window_days: int, trim_pct: float
+) -> Dict[SeriesKey, float]:
+    """
+    Estimate 24h liquidity per series from daily turnover rows.
+
+    Rows are ``(item_id, hub_id, date, turnover)`` grouped by series. Days in
+    the window without history count as zero turnover, then the highest and
+    lowest days are trimmed so single spikes do not dominate.
+    """
+    start = _as_utc(end) - timedelta(days=window_days)
+    liquidity = {}
+    for key, series in groupby(rows, key=lambda r: (r[0], r[1])):
+        values = [r[3] for r in series if start < _as_utc(r[2]) <= _as_utc(end)]
+        values += [0.0] * (window_days - len(values))
+        liquidity[key] = trimmed_mean(values, trim_pct)
+    return liquidity
+
+
+async def refresh_liquidity(
+    session: AsyncSession, hub_ids: List[int], end: Optional[datetime] = None
+) -> int:
+    """
+    Recompute cached 24h liquidity for every series of the given hubs.
+
+    One bulk read of the window's turnover and one bulk upsert next to the
+    rolling statistics. Series without trades in the window drop to zero.
+    Returns the number of series written.
+    """
+    window = settings.liquidity_window_days
+    end = end or datetime.now(UTC)
+
+    rows = await PriceHistoryRepository(session).get_turnover(
+        hub_ids, end - timedelta(days=window), end
+    )
+    liquidity = liquidity_from_turnover(rows, end, window, settings.liquidity_trim_pct)
+
+    stats_repo = SeriesStatsRepository(session)
+    for s in await stats_repo.get_by_window(window, hub_ids):
+        if s.liquidity_isk and (s.item_id, s.hub_id) not in liquidity:
+            liquidity[(s.item_id, s.hub_id)] = 0.0
+
+    await stats_repo.upsert_liquidity(
+        [
+            {"item_id": item_id, "hub_id": hub_id, "window_days": window, "liquidity_isk": value}
+            for (item_id, hub_id), value in liquidity.items()
+        ]
+    )
+
+    logger.info("series_liquidity_refreshed", series=len(liquidity), window_days=window)
+
+    return len(liquidity)
+
+
+async def refresh_price_bands(
+    session: AsyncSession, hub_ids: List[int], end: Optional[datetime] = None
+) -> int:
+    """
+    Recompute cached traded price bands for every series of the given hubs.
+
+    The lowest and highest traded price over the window are aggregated in the
+    database and upserted next to the rolling statistics. Returns the number
+    of series written.
+    """
+    window = settings.prune_band_days
+    end = end or datetime.now(UTC)
+
+    bands = await PriceHistoryRepository(session).get_price_bands(
+        hub_ids, end - timedelta(days=window), end
+    )
+    await SeriesStatsRepository(session).upsert_bands(
+        [
+            {
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "window_days": window,
+                "price_low": low,
+                "price_high": high,
+            }
+            for item_id, hub_id, low, high in bands
+        ]
+    )
+
+    logger.info("series_price_bands_refreshed", series=len(bands), window_days=window)
+
+    return len(bands)
+
+
+async def record_price_history(session: AsyncSession, prices: List[dict]) -> None:
+    """Store daily price history and fold it into the rolling statistics, forecasts and caches."""
+    repo = PriceHistoryRepository(session)
+    # Prices about to be overwritten, so rolling windows can swap them for the new ones
+    previous = (
+        {
+            (row.item_id, row.hub_id, _as_utc(row.date)): row.avg_price
+            for row in await repo.get_on_dates(
+                sorted({p["item_id"] for p in prices}),
+                sorted({p["hub_id"] for p in prices}),
+                sorted({p["date"] for p in prices}),
+            )
+        }
+        if prices
+        else {}
+    )
+    await repo.upsert_batch(prices)
+    await SeriesStatsUpdater(session).apply(prices, previous)
+    await ForecastUpdater(session).apply(prices)
+    if prices:
+        hub_ids = sorted({p["hub_id"] for p in prices})
+        end = max(_as_utc(p["date"]) for p in prices)
+        await refresh_liquidity(session, hub_ids, end)
+        await refresh_price_bands(session, hub_ids, end)
+
+
+async def load_volatility(
+    session: AsyncSession,
+    window_days: Optional[int] = None,
+    hub_ids: Optional[List[int]] = None,
+) -> Dict[SeriesKey, float]:
+    """Bulk-load price volatility (CV %) per (item_id, hub_id) for one window."""
+    window = window_days or settings.volatility_window_days
+    stats = await SeriesStatsRepository(session).get_by_window(window, hub_ids)
+    return {
+        (s.item_id, s.hub_id): RollingStats(s.count, s.mean, s.m2).cv_pct for s in stats
+    }
+
+
+async def volatility_as_of(
+    session: AsyncSession,
+    item_ids: List[int],
+    hub_ids: List[int],
+    as_of: datetime,
+    window_days: Optional[int] = None,
+) -> Dict[SeriesKey, float]:
+    """Price volatility (CV %) per (item_id, hub_id) over the window ending at ``as_of``."""
+    window = window_days or settings.volatility_window_days
+    rows = await PriceHistoryRepository(session).get_range(
+        item_ids, hub_ids, as_of - timedelta(days=window), as_of
+    )
+
+    stats: Dict[SeriesKey, RollingStats] = defaultdict(RollingStats)
+    for row in rows:
+        if row.avg_price is not None and _as_utc(row.date) > _as_utc(as_of) - timedelta(
+            days=window
+        ):
+            stats[(row.item_id, row.hub_id)].add(row.avg_price)
+    return {key: s.cv_pct for key, s in stats.items()}
+
+
+async def load_liquidity(
+    session: AsyncSession, hub_ids: Optional[List[int]] = None
+) -> Dict[SeriesKey, float]:
+    """Bulk-load cached 24h liquidity (ISK) per (item_id, hub_id)."""
+    stats = await SeriesStatsRepository(session).get_by_window(
+        settings.liquidity_window_days, hub_ids
+    )
+    return {(s.item_id, s.hub_id): s.liquidity_isk for s in stats if s.liquidity_isk is not None}
+
+
+async def load_price_bands(
+    session: AsyncSession, hub_ids: Optional[List[int]] = None
+) -> Dict[SeriesKey, Tuple[float, float]]:
+    """Bulk-load cached (lowest, highest) traded price per (item_id, hub_id)."""
+    stats = await SeriesStatsRepository(session).get_by_window(settings.prune_band_days, hub_ids)
+    return {
+        (s.item_id, s.hub_id): (s.price_low, s.price_high)
+        for s in stats
+        if s.price_low is not None and s.price_high is not None
+    }
+
+
+async def liquidity_as_of(
+    session: AsyncSession, hub_ids: List[int], as_of: datetime
+) -> Dict[SeriesKey, float]:
+    """24h liquidity (ISK) per (item_id, hub_id) over the window ending at ``as_of``."""
+    window = settings.liquidity_window_days
+    rows = await PriceHistoryRepository(session).get_turnover(
+        hub_ids, as_of - timedelta(days=window), as_of
+    )
+    return liquidity_from_turnover(rows, as_of, window, settings.liquidity_trim_pct)
+
+
+async def price_bands_as_of(
+    session: AsyncSession, hub_ids: List[int], as_of: datetime
+) -> Dict[SeriesKey, Tuple[float, float]]:
+    """(lowest, highest) traded price per (item_id, hub_id) over the window ending at ``as_of``."""
+    rows = await PriceHistoryRepository(session).get_price_bands(
+        hub_ids, as_of - timedelta(days=settings.prune_band_days), as_of
+    )
+    return {(item_id, hub_id): (low, high) for item_id, hub_id, low, high in rows}
@@ -0,0 +1,83 @@
+"""Per-run summary rows, pre-aggregated so dashboards never scan run items."""
+
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+
+# EV percentiles stored per run, as (column, fraction)
+EV_PERCENTILES = (("ev_p50", 0.5), ("ev_p90", 0.9), ("ev_p99", 0.99))
+
+# Candidate fields kept for the top routes of a run
+TOP_FIELDS = (
+    "item_id",
+    "from_hub_id",
+    "to_hub_id",
+    "buy_price",
+    "sell_price",
+    "net_margin_pct",
+    "ev_isk",
+    "capital_required",
+)
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile of sorted values (as PostgreSQL's percentile_cont)."""
+    if not values:
+        return None
+    position = fraction * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def best_by_pair(candidates: Sequence[ArbitrageCandidate]) -> List[dict]:
+    """Route count, total EV and best route per hub pair, best pairs first."""
+    pairs: Dict[Tuple[int, int], dict] = {}
+    for c in candidates:
+        pair = pairs.get((c.from_hub_id, c.to_hub_id))
+        if pair is None:
+            pairs[(c.from_hub_id, c.to_hub_id)] = {
+                "from_hub_id": c.from_hub_id,
+                "to_hub_id": c.to_hub_id,
+                "candidates": 1,
+                "ev_total": c.ev_isk,
+                "item_id": c.item_id,
+                "ev_isk": c.ev_isk,
+                "net_margin_pct": c.net_margin_pct,
+            }
+            continue
+        pair["candidates"] += 1
+        pair["ev_total"] += c.ev_isk
+        if c.ev_isk > pair["ev_isk"]:
+            pair.update(item_id=c.item_id, ev_isk=c.ev_isk, net_margin_pct=c.net_margin_pct)
+    return sorted(pairs.values(), key=lambda p: p["ev_isk"], reverse=True)
+
+
+def summarize_run(
+    run_id: int,
+    created_at: datetime,
+    candidates: Sequence[ArbitrageCandidate],
+    top_n: int,
+    stage_seconds: Optional[Dict[str, float]] = None,
+) -> dict:
+    """Row for ``analytics_run_summary`` describing a run's candidates."""
+    ev = sorted(c.ev_isk for c in candidates)
+    count = len(candidates)
+    top = heapq.nlargest(top_n, candidates, key=lambda c: c.ev_isk) if top_n > 0 else []
+    return {
+        "run_id": run_id,
+        "created_at": created_at,
+        "candidates": count,
+        "items": len({c.item_id for c in candidates}),
+        "hub_pairs": len({(c.from_hub_id, c.to_hub_id) for c in candidates}),
+        "ev_total": sum(ev),
+        **{column: percentile(ev, fraction) for column, fraction in EV_PERCENTILES},
+        "ev_max": ev[-1] if ev else None,
+        "margin_avg": sum(c.net_margin_pct for c in candidates) / count if count else None,
+        "capital_total": sum(c.capital_required for c in candidates),
+        "best_by_pair": best_by_pair(candidates),
+        "top": [{name: getattr(c, name) for name in TOP_FIELDS} for c in top],
+        "stage_seconds": stage_seconds,
+    }
@@ -0,0 +1,62 @@
+"""Conditional GET support (ETag, If-None-Match, Cache-Control) for run-based endpoints."""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+def signal_etag(run_id: Optional[int], request: Request, variant: str = "") -> str:
+    """
+    Strong ETag over the run served, the request's path and query parameters
+    and the negotiated representation ``variant``.
+    """
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(
+        f"{run_id}|{request.url.path}|{params}|{variant}".encode(), digest_size=12
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """
+    Validator headers for a run-based response.
+
+    Runs land whenever they finish (scheduled runs take minutes, API jobs
+    save off schedule), so caches may store the response but revalidate it
+    with the ETag on every use; an unchanged run answers 304 from the cache.
+    """
+    return {
+        "ETag": etag,
+        "Cache-Control": "public, no-cache",
+        "Vary": "Accept",
+    }
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` lists the ETag (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        tag = candidate.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(
+    request: Request, response: Response, run_id: Optional[int], variant: str = ""
+) -> Optional[Response]:
+    """
+    Set cache headers on ``response`` and return a 304 when the client is current.
+
+    Call before building the body so unchanged polls skip loading and
+    serialization entirely.
+    """
+    etag = signal_etag(run_id, request, variant)
+    headers = cache_headers(etag)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
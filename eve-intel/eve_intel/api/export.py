@@ -0,0 +1,190 @@
+"""Bulk signal export in columnar formats (Arrow IPC stream, NDJSON, msgpack)."""
+
+import importlib
+import json
+from array import array
+from types import ModuleType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from eve_intel.analytics.latest import Column
+from eve_intel.settings import settings
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+
+# Bulk media types with the optional module each needs
+BULK_MEDIA_TYPES: Dict[str, Optional[str]] = {
+    ARROW_STREAM: "pyarrow",
+    NDJSON: None,
+    MSGPACK: "msgpack",
+}
+
+JSON_MEDIA_RANGES = ("application/json", "application/*", "*/*")
+
+# Candidate fields renamed to the API's signal field names
+EXPORT_NAMES = {
+    "from_hub_id": "from_hub",
+    "to_hub_id": "to_hub",
+    "liquidity_24h": "daily_liquidity",
+}
+
+# Nullable list columns holding integers; the others hold floats
+NULLABLE_INT_COLUMNS = ("jumps",)
+
+# IPC end-of-stream marker: continuation token and a zero-length message
+ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+def negotiate_bulk(request: Request) -> Optional[str]:
+    """
+    Bulk media type the ``Accept`` header prefers, or None to serve JSON.
+
+    A bulk type wins when its quality is at least that of any JSON range, so
+    listing it explicitly beats a ``*/*`` fallback.
+    """
+    bulk, bulk_q, json_q = None, 0.0, 0.0
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type in BULK_MEDIA_TYPES and q > bulk_q:
+            bulk, bulk_q = media_type, q
+        elif media_type in JSON_MEDIA_RANGES:
+            json_q = max(json_q, q)
+    if bulk is None or bulk_q <= 0 or bulk_q < json_q:
+        return None
+    return bulk
+
+
+def require_encoder(media_type: str) -> Optional[ModuleType]:
+    """Import the optional module a bulk format needs, 406 when it is not installed."""
+    module = BULK_MEDIA_TYPES[media_type]
+    if module is None:
+        return None
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=406,
+            detail=f"{media_type} needs the optional '{module}' package on the server",
+        ) from e
+
+
+def export_columns(columns: Mapping[str, Column]) -> Dict[str, Column]:
+    """Candidate columns under their API field names."""
+    return {EXPORT_NAMES.get(name, name): column for name, column in columns.items()}
+
+
+def concat_columns(parts: Sequence[Tuple[str, Mapping[str, Column]]]) -> Dict[str, Column]:
+    """Stack per fee profile columns into one table with a leading ``profile`` column."""
+    profile: List[str] = []
+    merged: Dict[str, Column] = {}
+    for name, columns in parts:
+        profile.extend([name] * len(columns["item_id"]))
+        for key, column in columns.items():
+            if key not in merged:
+                merged[key] = array(column.typecode) if isinstance(column, array) else []
+            merged[key].extend(column)
+    return {"profile": profile, **merged}
+
+
+def _row_count(columns: Mapping[str, Column]) -> int:
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _arrow_array(pa: ModuleType, name: str, column: Column) -> Any:
+    """Typed arrays are wrapped without copying, nullable lists are converted."""
+    if isinstance(column, array):
+        arrow_type = pa.int64() if column.typecode == "q" else pa.float64()
+        return pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+    if name == "profile":
+        return pa.array(column, type=pa.string())
+    if name in NULLABLE_INT_COLUMNS:
+        return pa.array(column, type=pa.int64())
+    return pa.array(column, type=pa.float64())
+
+
+def arrow_stream(
+    pa: ModuleType, columns: Mapping[str, Column], metadata: Mapping[str, str], batch_rows: int
+) -> Iterator[bytes]:
+    """Arrow IPC stream: the schema, one message per record batch, then end of stream."""
+    table = pa.table(
+        {name: _arrow_array(pa, name, column) for name, column in columns.items()},
+        metadata=dict(metadata),
+    )
+    yield table.schema.serialize().to_pybytes()
+    for batch in table.to_batches(max_chunksize=batch_rows):
+        yield batch.serialize().to_pybytes()
+    yield ARROW_EOS
+
+
+def ndjson_lines(columns: Mapping[str, Column], batch_rows: int) -> Iterator[bytes]:
+    """One JSON object per row, yielded in chunks of ``batch_rows`` lines."""
+    names = list(columns)
+    total = _row_count(columns)
+    for start in range(0, total, batch_rows):
+        end = start + batch_rows
+        rows = zip(*(columns[name][start:end] for name in names), strict=True)
+        yield "".join(
+            json.dumps(dict(zip(names, row, strict=True)), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+
+def msgpack_body(
+    msgpack: ModuleType, columns: Mapping[str, Column], metadata: Mapping[str, Any]
+) -> bytes:
+    """One map of run metadata and column lists, loadable straight into a data frame."""
+    return msgpack.packb(
+        {
+            **metadata,
+            "count": _row_count(columns),
+            "columns": {
+                name: column.tolist() if isinstance(column, array) else column
+                for name, column in columns.items()
+            },
+        }
+    )
+
+
+def bulk_response(
+    media_type: str,
+    encoder: Optional[ModuleType],
+    columns: Mapping[str, Column],
+    run_id: Optional[int],
+    timestamp: Optional[str],
+    headers: Mapping[str, str],
+) -> Response:
+    """
+    Serve signal columns in a bulk format.
+
+    Arrow and NDJSON are streamed in batches of ``export_batch_rows`` rows;
+    msgpack is a single body. The run ID travels in ``X-Run-Id`` for every
+    format and in the Arrow schema metadata.
+    """
+    columns = export_columns(columns)
+    headers = {**headers, "X-Run-Id": "" if run_id is None else str(run_id)}
+    batch_rows = settings.export_batch_rows
+
+    if media_type == ARROW_STREAM:
+        metadata = {"run_id": str(run_id or ""), "timestamp": timestamp or ""}
+        return StreamingResponse(
+            arrow_stream(encoder, columns, metadata, batch_rows),
+            media_type=media_type,
+            headers=headers,
+        )
+    if media_type == NDJSON:
+        return StreamingResponse(
+            ndjson_lines(columns, batch_rows), media_type=media_type, headers=headers
+        )
+    body = msgpack_body(encoder, columns, {"run_id": run_id, "timestamp": timestamp})
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -5,9 +5,12 @@ from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from eve_intel import __version__
-from eve_intel.api.routers import arbitrage
+from eve_intel.analytics.jobs import get_job_manager
+from eve_intel.api.routers import arbitrage, jobs, stream
+from eve_intel.datasources.broker import get_broker
 from eve_intel.logging import configure_logging
 
 
@@ -15,7 +18,11 @@ from eve_intel.logging import configure_logging
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan manager."""
     configure_logging()
+    broker = get_broker()
+    await broker.start()
     yield
+    await get_job_manager().close()
+    await broker.close()
 
 
 app = FastAPI(
@@ -34,8 +41,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large bodies (bulk exports, long signal lists); SSE streams are left alone
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=6)
+
 # Routers
 app.include_router(arbitrage.router, prefix="/signals", tags=["signals"])
+app.include_router(stream.router, prefix="/signals", tags=["stream"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 
 
 @app.get("/health")
@@ -0,0 +1,27 @@
+"""Opaque keyset pagination cursors."""
+
+import base64
+import json
+from typing import Optional, Tuple
+
+
+def encode_cursor(key: Optional[Tuple[float, int]]) -> Optional[str]:
+    """Cursor for the (``ev_isk``, ``id``) key of a page's last row."""
+    if key is None:
+        return None
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Key a cursor continues after; ValueError when the cursor is malformed."""
+    msg = "Malformed cursor"
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ev_isk, row_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        # Bad base64, bad JSON and wrong arity all land here
+        raise ValueError(msg) from e
+    if type(ev_isk) not in (int, float) or type(row_id) is not int:
+        raise ValueError(msg)
+    return float(ev_isk), row_id
@@ -1,17 +1,38 @@
 """Arbitrage signals API router."""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.arbitrage import (
+    ArbitrageCandidate,
+    ArbitrageEngine,
+    RunItemsNotStoredError,
+)
+from eve_intel.analytics.chains import find_chains
+from eve_intel.analytics.fees import FeeProfile, default_fee_profile, parse_fee_profiles
+from eve_intel.analytics.jobs import JobQueueFullError, get_job_manager
+from eve_intel.analytics.latest import candidate_columns, latest_run_cache
+from eve_intel.analytics.planner import optimize_trade_plans
+from eve_intel.api.conditional import not_modified
+from eve_intel.api.export import bulk_response, concat_columns, negotiate_bulk, require_encoder
+from eve_intel.api.pagination import decode_cursor, encode_cursor
 from eve_intel.db.base import get_session
-from eve_intel.db.repositories import ArbitrageItemRepository, ArbitrageRunRepository
+from eve_intel.db.repositories import (
+    ArbitrageRunRepository,
+    ItemRepository,
+    RunDiffRepository,
+)
+from eve_intel.settings import settings
 
 router = APIRouter()
 
+# Row cap of JSON responses; bulk formats are not capped
+JSON_MAX_LIMIT = 1000
+JSON_DEFAULT_LIMIT = 100
+
 
 class ArbitrageSignal(BaseModel):
     """Arbitrage signal response model."""
@@ -28,6 +49,21 @@ class ArbitrageSignal(BaseModel):
     decay_score: float = Field(..., description="Opportunity decay score (0-100)")
     fees_total: float = Field(..., description="Total fees per unit")
     spread_pct: float = Field(..., description="Raw spread %")
+    jumps: Optional[int] = Field(None, description="Jumps between hubs, if known")
+    ev_per_jump: Optional[float] = Field(None, description="Expected value per jump in ISK")
+    lifetime_hours: Optional[float] = Field(
+        None, description="Median spread lifetime from the decay table, if fitted"
+    )
+
+
+class FeeScenario(BaseModel):
+    """Signals evaluated under one fee profile."""
+
+    profile: str = Field(..., description="Fee profile name")
+    broker_fee_pct: float = Field(..., description="Broker fee %")
+    sales_tax_pct: float = Field(..., description="Sales tax %")
+    count: int = Field(..., description="Number of signals")
+    signals: List[ArbitrageSignal] = Field(..., description="Arbitrage signals")
 
 
 class ArbitrageResponse(BaseModel):
@@ -37,109 +73,521 @@ class ArbitrageResponse(BaseModel):
     timestamp: Optional[str] = Field(None, description="Run timestamp")
     count: int = Field(..., description="Number of signals")
     signals: List[ArbitrageSignal] = Field(..., description="Arbitrage signals")
+    scenarios: Optional[List[FeeScenario]] = Field(
+        None, description="Per fee profile results (scenario mode only)"
+    )
+
+
+class JobHandle(BaseModel):
+    """Handle of a queued analysis job."""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="Job status at submission")
+    created: bool = Field(..., description="False when an identical in-flight job was joined")
+    location: str = Field(..., description="Path to poll for the job's status and result")
+
+
+class RunItemsResponse(BaseModel):
+    """One page of a stored run's signals."""
+
+    run_id: int = Field(..., description="Analytics run ID")
+    count: int = Field(..., description="Number of signals on this page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, None on the last page"
+    )
+    signals: List[ArbitrageSignal] = Field(..., description="Arbitrage signals")
+
+
+class RouteChange(BaseModel):
+    """One route's change between two runs."""
+
+    item_id: int = Field(..., description="Item type ID")
+    from_hub: int = Field(..., description="Buy hub station ID")
+    to_hub: int = Field(..., description="Sell hub station ID")
+    ev_isk: Optional[float] = Field(None, description="Expected value in this run")
+    net_margin_pct: Optional[float] = Field(None, description="Net margin % in this run")
+    prev_ev_isk: Optional[float] = Field(None, description="Expected value in the base run")
+    prev_net_margin_pct: Optional[float] = Field(
+        None, description="Net margin % in the base run"
+    )
+
+
+class RunDiffResponse(BaseModel):
+    """Routes added, removed and moved in a run against the run before it."""
+
+    run_id: int = Field(..., description="Analytics run ID")
+    base_run_id: Optional[int] = Field(None, description="Run compared against, None if first")
+    change_pct: Optional[float] = Field(
+        None, description="EV or margin move (%) that counts as changed"
+    )
+    added: List[RouteChange] = Field(..., description="Routes new in this run")
+    removed: List[RouteChange] = Field(..., description="Routes gone since the base run")
+    changed: List[RouteChange] = Field(..., description="Routes whose EV or margin moved")
+
+
+class StationTradeSignal(BaseModel):
+    """Station trading signal response model."""
+
+    item_id: int = Field(..., description="Item type ID")
+    hub: int = Field(..., description="Hub station ID")
+    buy_price: float = Field(..., description="Best buy order price (our bid)")
+    sell_price: float = Field(..., description="Best sell order price (our ask)")
+    spread_pct: float = Field(..., description="Raw bid/ask spread %")
+    fees_total: float = Field(..., description="Broker fees and sales tax per unit")
+    net_margin_pct: float = Field(..., description="Net profit margin %")
+    daily_volume: float = Field(..., description="Average daily traded units")
+    units_per_day: float = Field(..., description="Units we expect to trade per day")
+    ev_isk: float = Field(..., description="Expected daily value in ISK")
+    capital_required: float = Field(..., description="Capital required in ISK")
+
+
+class StationTradeResponse(BaseModel):
+    """Station trading API response."""
+
+    run_id: Optional[int] = Field(None, description="Run the trades were found in")
+    count: int = Field(..., description="Number of signals")
+    signals: List[StationTradeSignal] = Field(..., description="Station trading signals")
+
+
+class ChainModel(BaseModel):
+    """Multi-hop arbitrage chain."""
+
+    hubs: List[int] = Field(..., description="Hubs visited in order")
+    ev_isk: float = Field(..., description="Combined expected value in ISK")
+    capital_required: float = Field(..., description="Largest leg capital in ISK")
+    jumps: Optional[int] = Field(None, description="Total jumps, if known")
+    ev_per_jump: Optional[float] = Field(None, description="Expected value per jump in ISK")
+    legs: List[ArbitrageSignal] = Field(..., description="Trades in order")
+
+
+class ChainResponse(BaseModel):
+    """Multi-hop chain API response."""
+
+    run_id: Optional[int] = Field(None, description="Run the chains were built from")
+    count: int = Field(..., description="Number of chains")
+    explored: int = Field(..., description="Search nodes explored")
+    pruned: int = Field(..., description="Branches cut by the EV bound")
+    chains: List[ChainModel] = Field(..., description="Chains, best first")
+
+
+class PlanLineModel(BaseModel):
+    """One item in a trade plan."""
+
+    item_id: int = Field(..., description="Item type ID")
+    quantity: int = Field(..., description="Units to buy and haul")
+    buy_price: float = Field(..., description="Buy price")
+    sell_price: float = Field(..., description="Sell price")
+    volume_m3: float = Field(..., description="Cargo used (m3)")
+    capital_isk: float = Field(..., description="Capital used in ISK")
+    expected_profit_isk: float = Field(..., description="Expected profit after fees in ISK")
+
+
+class TradePlanModel(BaseModel):
+    """Quantity mix for one route."""
+
+    from_hub: int = Field(..., description="Buy hub station ID")
+    to_hub: int = Field(..., description="Sell hub station ID")
+    total_volume_m3: float = Field(..., description="Total cargo used (m3)")
+    total_capital_isk: float = Field(..., description="Total capital used in ISK")
+    expected_profit_isk: float = Field(..., description="Total expected profit in ISK")
+    lines: List[PlanLineModel] = Field(..., description="Items to haul")
+
+
+class TradePlanResponse(BaseModel):
+    """Trade plan API response."""
+
+    run_id: Optional[int] = Field(None, description="Run the plans were made from")
+    cargo_m3: float = Field(..., description="Cargo capacity used for planning (m3)")
+    capital_isk: float = Field(..., description="Wallet used for planning in ISK")
+    count: int = Field(..., description="Number of route plans")
+    plans: List[TradePlanModel] = Field(..., description="Route plans, best first")
+
+
+def _to_signal(c: ArbitrageCandidate) -> ArbitrageSignal:
+    """Convert an engine candidate to its API representation."""
+    return ArbitrageSignal(
+        item_id=c.item_id,
+        from_hub=c.from_hub_id,
+        to_hub=c.to_hub_id,
+        buy_price=c.buy_price,
+        sell_price=c.sell_price,
+        net_margin_pct=c.net_margin_pct,
+        ev_isk=c.ev_isk,
+        daily_liquidity=c.liquidity_24h,
+        capital_required=c.capital_required,
+        decay_score=c.decay_score,
+        fees_total=c.fees_total,
+        spread_pct=c.spread_pct,
+        jumps=c.jumps,
+        ev_per_jump=c.ev_per_jump,
+        lifetime_hours=c.lifetime_hours,
+    )
+
+
+def _scenario_profiles(specs: Optional[List[str]]) -> List[FeeProfile]:
+    """Parse ``fee_profile`` query values, rejecting bad specs and the reserved name."""
+    try:
+        profiles = parse_fee_profiles(specs or [])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    if any(p.name == default_fee_profile().name for p in profiles):
+        raise HTTPException(status_code=422, detail="Fee profile name 'default' is reserved")
+    return profiles
 
 
 @router.get("/arbitrage", response_model=ArbitrageResponse)
 async def get_arbitrage_signals(
+    request: Request,
+    response: Response,
     min_ev: Optional[float] = Query(None, description="Minimum expected value (ISK)"),
     min_margin: Optional[float] = Query(None, description="Minimum net margin %"),
-    limit: int = Query(100, ge=1, le=1000, description="Max results"),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Max results (JSON: default 100, at most 1000; bulk formats: all rows)",
+    ),
+    fee_profile: Optional[List[str]] = Query(
+        None,
+        description="Fee profile as name:broker_fee_pct:sales_tax_pct (repeatable)",
+    ),
     session: AsyncSession = Depends(get_session),
-) -> ArbitrageResponse:
+) -> Union[ArbitrageResponse, Response]:
     """
     Get ranked arbitrage opportunities.
 
-    Returns the latest arbitrage signals, filtered and ranked by expected value.
+    Serves the latest completed analytics run from memory, filtered and
+    ranked by expected value; fresh analysis runs through ``POST /analyze``.
+    Passing one or more ``fee_profile`` values enables scenario mode, which
+    re-prices the run's candidates under every profile; routes the run
+    filtered out are not reconsidered, for that pass the profiles to
+    ``POST /analyze``. Responses carry an
+    ETag for the run, query and format; a matching ``If-None-Match`` gets a 304.
+
+    An ``Accept`` of ``application/vnd.apache.arrow.stream``,
+    ``application/x-ndjson`` or ``application/msgpack`` serves the run's
+    columns in bulk, without a row cap; scenario rows then carry a
+    ``profile`` column.
     """
-    engine = ArbitrageEngine(session)
+    media_type = negotiate_bulk(request)
+    encoder = require_encoder(media_type) if media_type is not None else None
+    if media_type is None:
+        if limit is None:
+            limit = JSON_DEFAULT_LIMIT
+        elif limit > JSON_MAX_LIMIT:
+            raise HTTPException(
+                status_code=422,
+                detail=f"limit is capped at {JSON_MAX_LIMIT} for JSON, use a bulk format",
+            )
 
-    # Find opportunities
-    candidates = await engine.find_arbitrage_opportunities(
-        min_ev_isk=min_ev,
-        min_margin_pct=min_margin,
-    )
+    profiles = _scenario_profiles(fee_profile)
+    default_profile = default_fee_profile()
 
-    # Limit results
-    candidates = candidates[:limit]
-
-    # Convert to response models
-    signals = [
-        ArbitrageSignal(
-            item_id=c.item_id,
-            from_hub=c.from_hub_id,
-            to_hub=c.to_hub_id,
-            buy_price=c.buy_price,
-            sell_price=c.sell_price,
-            net_margin_pct=c.net_margin_pct,
-            ev_isk=c.ev_isk,
-            daily_liquidity=c.liquidity_24h,
-            capital_required=c.capital_required,
-            decay_score=c.decay_score,
-            fees_total=c.fees_total,
-            spread_pct=c.spread_pct,
+    run = await latest_run_cache.get(session)
+    unchanged = not_modified(request, response, run.run_id if run else None, media_type or "")
+    if unchanged is not None:
+        return unchanged
+
+    if media_type is not None:
+        if run is None:
+            columns = candidate_columns([])
+            parts = [(p.name, columns) for p in profiles]
+        else:
+            columns = run.select_columns(min_ev, min_margin, limit)
+            parts = [
+                (p.name, candidate_columns(run.rescore(p, min_ev, min_margin, limit)))
+                for p in profiles
+            ]
+        if parts:
+            columns = concat_columns([(default_profile.name, columns), *parts])
+        return bulk_response(
+            media_type,
+            encoder,
+            columns,
+            run.run_id if run else None,
+            run.created_at.isoformat() if run and run.created_at else None,
+            response.headers,
         )
-        for c in candidates
-    ]
+    if run is None:
+        return ArbitrageResponse(count=0, signals=[], scenarios=[] if profiles else None)
+
+    signals = [_to_signal(c) for c in run.select(min_ev, min_margin, limit)]
 
-    # Try to get latest run info
-    run_repo = ArbitrageRunRepository(session)
-    latest_run = await run_repo.get_latest_run()
+    scenarios = None
+    if profiles:
+        scenarios = []
+        for p in profiles:
+            scenario_signals = [_to_signal(c) for c in run.rescore(p, min_ev, min_margin, limit)]
+            scenarios.append(
+                FeeScenario(
+                    profile=p.name,
+                    broker_fee_pct=p.broker_fee_pct,
+                    sales_tax_pct=p.sales_tax_pct,
+                    count=len(scenario_signals),
+                    signals=scenario_signals,
+                )
+            )
 
     return ArbitrageResponse(
-        run_id=latest_run.run_id if latest_run else None,
-        timestamp=latest_run.created_at.isoformat() if latest_run else None,
+        run_id=run.run_id,
+        timestamp=run.created_at.isoformat() if run.created_at else None,
         count=len(signals),
         signals=signals,
+        scenarios=scenarios,
     )
 
 
-@router.post("/arbitrage/analyze", response_model=ArbitrageResponse)
+@router.post("/arbitrage/analyze", response_model=JobHandle, status_code=202)
 async def analyze_arbitrage(
+    response: Response,
     min_ev: Optional[float] = Query(None, description="Minimum expected value (ISK)"),
     min_margin: Optional[float] = Query(None, description="Minimum net margin %"),
     save_results: bool = Query(True, description="Save results to database"),
+    fee_profile: Optional[List[str]] = Query(
+        None,
+        description="Fee profile as name:broker_fee_pct:sales_tax_pct (repeatable)",
+    ),
+) -> JobHandle:
+    """
+    Queue a fresh arbitrage analysis.
+
+    Returns a job handle right away; the analysis runs in the background
+    and its signals are served by ``GET /jobs/{job_id}`` once done. An
+    identical analysis already queued or running is joined rather than
+    repeated. Each ``fee_profile`` is also evaluated against the full
+    market, its results returned as a scenario (the saved run keeps the
+    default profile's).
+    """
+    _scenario_profiles(fee_profile)
+    params: Dict[str, Any] = {
+        "min_ev": min_ev,
+        "min_margin": min_margin,
+        "save_results": save_results,
+    }
+    if fee_profile:
+        params["fee_profiles"] = fee_profile
+    try:
+        job, created = await get_job_manager().submit(params)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "30"}
+        ) from e
+
+    location = f"/jobs/{job.job_id}"
+    response.headers["Location"] = location
+    return JobHandle(job_id=job.job_id, status=job.status, created=created, location=location)
+
+
+@router.get("/runs/{run_id}/items", response_model=RunItemsResponse)
+async def get_run_items(
+    run_id: int,
+    item_id: Optional[int] = Query(None, description="Only this item type ID"),
+    from_hub: Optional[int] = Query(None, description="Only routes buying at this hub"),
+    to_hub: Optional[int] = Query(None, description="Only routes selling at this hub"),
+    min_ev: Optional[float] = Query(None, description="Minimum expected value (ISK)"),
+    min_margin: Optional[float] = Query(None, description="Minimum net margin %"),
+    min_decay: Optional[float] = Query(None, description="Minimum decay score"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
     session: AsyncSession = Depends(get_session),
-) -> ArbitrageResponse:
+) -> RunItemsResponse:
     """
-    Run fresh arbitrage analysis.
+    Page through a stored run's signals, ranked by expected value.
 
-    Analyzes current market data and optionally saves results to database.
+    Filters run in the database and pages continue from the cursor's
+    (EV, row ID) key, so deep pages cost the same as the first one. Pass
+    the same filters with each cursor. Without STORE_RUN_ITEMS runs keep no
+    items of their own and this answers 410; GET /signals/arbitrage serves
+    the latest run.
     """
-    engine = ArbitrageEngine(session)
+    try:
+        after = decode_cursor(cursor) if cursor is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
 
-    # Find opportunities
-    candidates = await engine.find_arbitrage_opportunities(
-        min_ev_isk=min_ev,
-        min_margin_pct=min_margin,
-    )
+    if await ArbitrageRunRepository(session).get_by_id(run_id) is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
 
-    # Save if requested
-    run_id = None
-    if save_results and candidates:
-        run_id = await engine.save_run_results(candidates)
-
-    # Convert to response
-    signals = [
-        ArbitrageSignal(
-            item_id=c.item_id,
-            from_hub=c.from_hub_id,
-            to_hub=c.to_hub_id,
-            buy_price=c.buy_price,
-            sell_price=c.sell_price,
-            net_margin_pct=c.net_margin_pct,
-            ev_isk=c.ev_isk,
-            daily_liquidity=c.liquidity_24h,
-            capital_required=c.capital_required,
-            decay_score=c.decay_score,
-            fees_total=c.fees_total,
-            spread_pct=c.spread_pct,
+    try:
+        candidates, next_key = await ArbitrageEngine(session).load_run_page(
+            run_id,
+            limit,
+            after,
+            item_id=item_id,
+            from_hub_id=from_hub,
+            to_hub_id=to_hub,
+            min_ev=min_ev,
+            min_margin=min_margin,
+            min_decay=min_decay,
         )
-        for c in candidates
-    ]
+    except RunItemsNotStoredError as e:
+        raise HTTPException(status_code=410, detail=str(e)) from e
+    return RunItemsResponse(
+        run_id=run_id,
+        count=len(candidates),
+        next_cursor=encode_cursor(next_key),
+        signals=[_to_signal(c) for c in candidates],
+    )
 
-    return ArbitrageResponse(
+
+@router.get("/runs/{run_id}/diff", response_model=RunDiffResponse)
+async def get_run_diff(
+    run_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> RunDiffResponse:
+    """
+    Get what changed in a run against the previous completed run.
+
+    Diffs are computed and stored when a run is saved, so this reads only
+    the changed routes. Runs saved without a base (the first run, or runs
+    from before diffs were stored) have a null ``base_run_id`` and no changes.
+    """
+    run = await ArbitrageRunRepository(session).get_by_id(run_id)
+    if run is None or run.status != "completed":
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+
+    meta = (run.meta or {}).get("diff")
+    changes: Dict[str, List[RouteChange]] = {"added": [], "removed": [], "changed": []}
+    if meta is not None:
+        for row in await RunDiffRepository(session).get_by_run(run_id):
+            changes[row.change].append(
+                RouteChange(
+                    item_id=row.item_id,
+                    from_hub=row.from_hub_id,
+                    to_hub=row.to_hub_id,
+                    ev_isk=row.ev_isk,
+                    net_margin_pct=row.net_margin_pct,
+                    prev_ev_isk=row.prev_ev_isk,
+                    prev_net_margin_pct=row.prev_net_margin_pct,
+                )
+            )
+
+    return RunDiffResponse(
         run_id=run_id,
-        timestamp=None,
-        count=len(signals),
-        signals=signals,
+        base_run_id=meta["base_run_id"] if meta else None,
+        change_pct=meta["change_pct"] if meta else None,
+        **changes,
+    )
+
+
+@router.get("/station", response_model=StationTradeResponse)
+async def get_station_trades(
+    min_ev: Optional[float] = Query(None, description="Minimum expected daily value (ISK)"),
+    min_margin: Optional[float] = Query(None, description="Minimum net margin %"),
+    limit: int = Query(100, ge=1, le=1000, description="Max results"),
+    session: AsyncSession = Depends(get_session),
+) -> StationTradeResponse:
+    """
+    Get same-hub station trading opportunities.
+
+    Serves the station trades found with the latest completed run, ranked by
+    the profit of buying at the best buy order and reselling at the best sell
+    order within one hub, after broker fees and sales tax.
+    """
+    run = await latest_run_cache.get(session)
+    trades = run.select_station(min_ev, min_margin, limit) if run is not None else []
+
+    return StationTradeResponse(
+        run_id=run.run_id if run is not None else None,
+        count=len(trades),
+        signals=[
+            StationTradeSignal(
+                item_id=t.item_id,
+                hub=t.hub_id,
+                buy_price=t.buy_price,
+                sell_price=t.sell_price,
+                spread_pct=t.spread_pct,
+                fees_total=t.fees_total,
+                net_margin_pct=t.net_margin_pct,
+                daily_volume=t.daily_volume,
+                units_per_day=t.units_per_day,
+                ev_isk=t.ev_isk,
+                capital_required=t.capital_required,
+            )
+            for t in trades
+        ],
+    )
+
+
+@router.get("/arbitrage/chains", response_model=ChainResponse)
+async def get_arbitrage_chains(
+    max_hops: int = Query(3, ge=2, le=6, description="Max legs per chain"),
+    min_ev: Optional[float] = Query(None, description="Minimum expected value per leg (ISK)"),
+    min_margin: Optional[float] = Query(None, description="Minimum net margin % per leg"),
+    limit: int = Query(20, ge=1, le=200, description="Max chains to return"),
+    session: AsyncSession = Depends(get_session),
+) -> ChainResponse:
+    """
+    Find multi-hop arbitrage chains (A -> B -> C).
+
+    Chains are built in memory over the latest completed run's candidates:
+    each leg starts at the hub the previous leg sold into, and chains are
+    ranked by combined EV.
+    """
+    run = await latest_run_cache.get(session)
+    candidates = run.select(min_ev, min_margin) if run is not None else []
+    chains, stats = find_chains(candidates, max_hops=max_hops, top_k=limit)
+
+    return ChainResponse(
+        run_id=run.run_id if run is not None else None,
+        count=len(chains),
+        explored=stats.explored,
+        pruned=stats.pruned,
+        chains=[
+            ChainModel(
+                hubs=chain.hubs,
+                ev_isk=chain.ev_isk,
+                capital_required=chain.capital_required,
+                jumps=chain.jumps,
+                ev_per_jump=chain.ev_per_jump,
+                legs=[_to_signal(leg) for leg in chain.legs],
+            )
+            for chain in chains
+        ],
+    )
+
+
+@router.get("/arbitrage/plan", response_model=TradePlanResponse)
+async def get_trade_plan(
+    cargo_m3: Optional[float] = Query(None, gt=0, description="Cargo capacity (m3)"),
+    capital_isk: Optional[float] = Query(None, gt=0, description="Wallet per trip (ISK)"),
+    from_hub: Optional[int] = Query(None, description="Restrict to this buy hub"),
+    to_hub: Optional[int] = Query(None, description="Restrict to this sell hub"),
+    min_ev: Optional[float] = Query(None, description="Minimum expected value (ISK)"),
+    min_margin: Optional[float] = Query(None, description="Minimum net margin %"),
+    max_routes: int = Query(5, ge=1, le=50, description="Max route plans"),
+    session: AsyncSession = Depends(get_session),
+) -> TradePlanResponse:
+    """
+    Plan the most profitable cargo for a trip.
+
+    Picks quantities per route of the latest completed run to maximise
+    expected profit within the cargo capacity and wallet, using item volumes
+    from the items table.
+    """
+    cargo = cargo_m3 or settings.planner_cargo_m3
+    capital = capital_isk or settings.planner_capital_isk
+
+    run = await latest_run_cache.get(session)
+    candidates = run.select(min_ev, min_margin) if run is not None else []
+
+    volumes = await ItemRepository(session).get_volumes(sorted({c.item_id for c in candidates}))
+    plans = optimize_trade_plans(candidates, volumes, cargo, capital, from_hub, to_hub)
+
+    return TradePlanResponse(
+        run_id=run.run_id if run is not None else None,
+        cargo_m3=cargo,
+        capital_isk=capital,
+        count=len(plans[:max_routes]),
+        plans=[
+            TradePlanModel(
+                from_hub=p.from_hub_id,
+                to_hub=p.to_hub_id,
+                total_volume_m3=p.total_volume_m3,
+                total_capital_isk=p.total_capital_isk,
+                expected_profit_isk=p.expected_profit_isk,
+                lines=[PlanLineModel(**vars(line)) for line in p.lines],
+            )
+            for p in plans[:max_routes]
+        ],
     )
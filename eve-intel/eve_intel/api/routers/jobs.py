@@ -0,0 +1,81 @@
+"""Analysis job status API router."""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.jobs import get_job_manager
+from eve_intel.api.routers.arbitrage import ArbitrageSignal, FeeScenario, _to_signal
+
+router = APIRouter()
+
+
+class JobResponse(BaseModel):
+    """Analysis job status, with its signals once succeeded."""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    params: Dict[str, Any] = Field(..., description="Analysis parameters")
+    created_at: str = Field(..., description="Submission timestamp")
+    started_at: Optional[str] = Field(None, description="Start timestamp")
+    finished_at: Optional[str] = Field(None, description="Completion timestamp")
+    run_id: Optional[int] = Field(None, description="Saved analytics run ID, if saved")
+    count: Optional[int] = Field(None, description="Number of signals, once succeeded")
+    signals: Optional[List[ArbitrageSignal]] = Field(
+        None, description="Arbitrage signals, once succeeded"
+    )
+    scenarios: Optional[List[FeeScenario]] = Field(
+        None, description="Per fee profile results, when fee profiles were given"
+    )
+    error: Optional[str] = Field(None, description="Failure reason, if failed")
+
+
+def job_response(record: Dict[str, Any]) -> JobResponse:
+    """Convert a stored job record to its API representation."""
+    result = record.get("result")
+    signals = None
+    scenarios = None
+    if result is not None:
+        signals = [_to_signal(ArbitrageCandidate(**c)) for c in result["candidates"]]
+        if result.get("scenarios") is not None:
+            scenarios = []
+            for s in result["scenarios"]:
+                scenario_signals = [_to_signal(ArbitrageCandidate(**c)) for c in s["candidates"]]
+                scenarios.append(
+                    FeeScenario(
+                        profile=s["profile"],
+                        broker_fee_pct=s["broker_fee_pct"],
+                        sales_tax_pct=s["sales_tax_pct"],
+                        count=len(scenario_signals),
+                        signals=scenario_signals,
+                    )
+                )
+    return JobResponse(
+        job_id=record["job_id"],
+        status=record["status"],
+        params=record["params"],
+        created_at=record["created_at"],
+        started_at=record.get("started_at"),
+        finished_at=record.get("finished_at"),
+        run_id=result["run_id"] if result is not None else None,
+        count=len(signals) if signals is not None else None,
+        signals=signals,
+        scenarios=scenarios,
+        error=record.get("error"),
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    """
+    Get an analysis job.
+
+    Poll until ``status`` is ``succeeded`` or ``failed``; finished jobs stay
+    available for ``JOB_RESULT_TTL_SECONDS``.
+    """
+    record = await get_job_manager().get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job_response(record)
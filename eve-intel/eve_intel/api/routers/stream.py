@@ -0,0 +1,89 @@
+"""Push-based signal streaming over Server-Sent Events and WebSocket."""
+
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from eve_intel.analytics.latest import latest_run_cache
+from eve_intel.datasources.broker import get_broker
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+def _hello() -> dict:
+    """First message of a stream: the run diffs will build on."""
+    run = latest_run_cache.current
+    return {"type": "hello", "run_id": run.run_id if run is not None else None}
+
+
+def _sse_event(message: dict) -> str:
+    """Format a message as one SSE event; diffs carry their run ID as event ID."""
+    lines = [f"event: {message['type']}"]
+    if message.get("run_id") is not None:
+        lines.append(f"id: {message['run_id']}")
+    lines.append(f"data: {json.dumps(message, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/stream")
+async def stream_signals(request: Request) -> StreamingResponse:
+    """
+    Stream run diffs as Server-Sent Events.
+
+    Each completed analytics run pushes one ``diff`` event with the added,
+    removed and changed routes against ``base_run_id``. A ``resync`` event
+    means the client fell behind and should reload ``GET /signals/arbitrage``.
+    Idle streams get a keep-alive comment every heartbeat interval.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe()
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield _sse_event(_hello())
+            while not await request.is_disconnected():
+                message = await subscription.get(timeout=settings.stream_heartbeat_seconds)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_event(message)
+        finally:
+            broker.unsubscribe(subscription)
+            if subscription.dropped:
+                logger.info("stream_client_lagged", dropped=subscription.dropped)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream/ws")
+async def stream_signals_ws(websocket: WebSocket) -> None:
+    """
+    Stream run diffs over a WebSocket.
+
+    Sends the same messages as the SSE stream as JSON frames, with a
+    ``ping`` frame on idle heartbeat intervals.
+    """
+    await websocket.accept()
+    broker = get_broker()
+    subscription = broker.subscribe()
+    try:
+        await websocket.send_json(_hello())
+        while True:
+            message = await subscription.get(timeout=settings.stream_heartbeat_seconds)
+            await websocket.send_json(message if message is not None else {"type": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+        if subscription.dropped:
+            logger.info("stream_client_lagged", dropped=subscription.dropped)
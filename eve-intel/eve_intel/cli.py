@@ -2,23 +2,82 @@
 
 import asyncio
 import json
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
-from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.arbitrage import ArbitrageCandidate, ArbitrageEngine
+from eve_intel.analytics.fees import default_fee_profile, parse_fee_profiles
+from eve_intel.analytics.planner import optimize_trade_plans
+from eve_intel.datasources.broker import get_broker
 from eve_intel.db.base import get_db_session
+from eve_intel.db.repositories import ItemRepository
 from eve_intel.logging import configure_logging, get_logger
+from eve_intel.settings import settings
 
 app = typer.Typer(help="EVE Market Intelligence CLI")
 console = Console()
 logger = get_logger(__name__)
 
 
+def _candidates_table(title: str, candidates: List[ArbitrageCandidate]) -> Table:
+    """Build a rich table of arbitrage candidates."""
+    table = Table(title=title, show_lines=True)
+    table.add_column("Item ID", style="cyan")
+    table.add_column("From Hub", style="green")
+    table.add_column("To Hub", style="green")
+    table.add_column("Buy Price", style="yellow", justify="right")
+    table.add_column("Sell Price", style="yellow", justify="right")
+    table.add_column("Margin %", style="magenta", justify="right")
+    table.add_column("EV (M ISK)", style="red", justify="right")
+    table.add_column("Fcst EV (M ISK)", style="red", justify="right")
+    table.add_column("Decay Score", style="blue", justify="right")
+    table.add_column("Jumps", justify="right")
+    table.add_column("EV/Jump (M ISK)", style="red", justify="right")
+
+    for c in candidates:
+        table.add_row(
+            str(c.item_id),
+            str(c.from_hub_id),
+            str(c.to_hub_id),
+            f"{c.buy_price:,.2f}",
+            f"{c.sell_price:,.2f}",
+            f"{c.net_margin_pct:.2f}",
+            f"{c.ev_isk / 1_000_000:.1f}",
+            f"{c.forecast_ev_isk / 1_000_000:.1f}" if c.forecast_ev_isk is not None else "-",
+            f"{c.decay_score:.1f}",
+            str(c.jumps) if c.jumps is not None else "-",
+            f"{c.ev_per_jump / 1_000_000:.1f}" if c.ev_per_jump is not None else "-",
+        )
+
+    return table
+
+
+def _candidate_to_dict(c: ArbitrageCandidate) -> dict:
+    """Serialize a candidate for JSON output."""
+    return {
+        "item_id": c.item_id,
+        "from_hub": c.from_hub_id,
+        "to_hub": c.to_hub_id,
+        "buy_price": c.buy_price,
+        "sell_price": c.sell_price,
+        "net_margin_pct": c.net_margin_pct,
+        "ev_isk": c.ev_isk,
+        "daily_liquidity": c.liquidity_24h,
+        "capital_required": c.capital_required,
+        "decay_score": c.decay_score,
+        "jumps": c.jumps,
+        "ev_per_jump": c.ev_per_jump,
+        "lifetime_hours": c.lifetime_hours,
+        "forecast_sell_price": c.forecast_sell_price,
+        "forecast_ev_isk": c.forecast_ev_isk,
+    }
+
+
 @app.command()
 def find_arb(
     min_ev: float = typer.Option(200_000_000, help="Minimum expected value (ISK)"),
@@ -26,6 +85,19 @@ def find_arb(
     limit: int = typer.Option(50, help="Max results to display"),
     output_file: Optional[str] = typer.Option(None, help="Output JSON file path"),
     save_db: bool = typer.Option(False, "--save-db", help="Save results to database"),
+    fee_profile: Optional[List[str]] = typer.Option(
+        None,
+        "--fee-profile",
+        help="Fee profile as name:broker_fee_pct:sales_tax_pct (repeatable, enables scenario mode)",
+    ),
+    workers: Optional[int] = typer.Option(
+        None, help="Worker processes for sharded analysis (default: ANALYTICS_WORKERS)"
+    ),
+    by_forecast: Optional[bool] = typer.Option(
+        None,
+        "--by-forecast/--by-ev",
+        help="Rank by forecast EV at the haul horizon (default: RANK_BY_FORECAST)",
+    ),
 ) -> None:
     """
     Find arbitrage opportunities.
@@ -34,47 +106,47 @@ def find_arb(
     """
     configure_logging()
 
+    try:
+        profiles = parse_fee_profiles(fee_profile or [])
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--fee-profile") from e
+
+    if save_db and profiles:
+        msg = "--save-db is not supported in scenario mode"
+        raise typer.BadParameter(msg)
+
     async def _run() -> None:
         async with get_db_session() as session:
-            engine = ArbitrageEngine(session)
+            engine = ArbitrageEngine(session, workers=workers)
 
             console.print(f"[bold cyan]Searching for arbitrage opportunities...[/bold cyan]")
             console.print(f"Min EV: {min_ev:,.0f} ISK")
             console.print(f"Min Margin: {min_margin:.1f}%")
             console.print()
 
-            candidates = await engine.find_arbitrage_opportunities(
+            scenario_profiles = profiles or [default_fee_profile()]
+            results = await engine.find_arbitrage_scenarios(
+                scenario_profiles,
                 min_ev_isk=min_ev,
                 min_margin_pct=min_margin,
+                top_k=limit,
+                rank_by_forecast=by_forecast,
             )
 
-            candidates = candidates[:limit]
-
-            # Display as table
-            table = Table(title="Arbitrage Opportunities", show_lines=True)
-            table.add_column("Item ID", style="cyan")
-            table.add_column("From Hub", style="green")
-            table.add_column("To Hub", style="green")
-            table.add_column("Buy Price", style="yellow", justify="right")
-            table.add_column("Sell Price", style="yellow", justify="right")
-            table.add_column("Margin %", style="magenta", justify="right")
-            table.add_column("EV (M ISK)", style="red", justify="right")
-            table.add_column("Decay Score", style="blue", justify="right")
-
-            for c in candidates:
-                table.add_row(
-                    str(c.item_id),
-                    str(c.from_hub_id),
-                    str(c.to_hub_id),
-                    f"{c.buy_price:,.2f}",
-                    f"{c.sell_price:,.2f}",
-                    f"{c.net_margin_pct:.2f}",
-                    f"{c.ev_isk / 1_000_000:.1f}",
-                    f"{c.decay_score:.1f}",
+            for p in scenario_profiles:
+                # Display as table
+                title = "Arbitrage Opportunities"
+                if profiles:
+                    title += (
+                        f" [{p.name}: broker {p.broker_fee_pct:.2f}%,"
+                        f" tax {p.sales_tax_pct:.2f}%]"
+                    )
+                console.print(_candidates_table(title, results[p.name]))
+                console.print(
+                    f"\n[bold green]Found {len(results[p.name])} opportunities[/bold green]"
                 )
 
-            console.print(table)
-            console.print(f"\n[bold green]Found {len(candidates)} opportunities[/bold green]")
+            candidates = results[scenario_profiles[0].name]
 
             # Save to file if requested
             if output_file or not output_file:
@@ -90,22 +162,20 @@ def find_arb(
                         "min_margin_pct": min_margin,
                     },
                     "count": len(candidates),
-                    "opportunities": [
+                    "opportunities": [_candidate_to_dict(c) for c in candidates],
+                }
+
+                if profiles:
+                    data["scenarios"] = [
                         {
-                            "item_id": c.item_id,
-                            "from_hub": c.from_hub_id,
-                            "to_hub": c.to_hub_id,
-                            "buy_price": c.buy_price,
-                            "sell_price": c.sell_price,
-                            "net_margin_pct": c.net_margin_pct,
-                            "ev_isk": c.ev_isk,
-                            "daily_liquidity": c.liquidity_24h,
-                            "capital_required": c.capital_required,
-                            "decay_score": c.decay_score,
+                            "profile": p.name,
+                            "broker_fee_pct": p.broker_fee_pct,
+                            "sales_tax_pct": p.sales_tax_pct,
+                            "count": len(results[p.name]),
+                            "opportunities": [_candidate_to_dict(c) for c in results[p.name]],
                         }
-                        for c in candidates
-                    ],
-                }
+                        for p in profiles
+                    ]
 
                 with open(output_path, "w") as f:
                     json.dump(data, f, indent=2)
@@ -117,6 +187,231 @@ def find_arb(
                 run_id = await engine.save_run_results(candidates)
                 console.print(f"\n[bold]Saved to database (run_id={run_id})[/bold]")
 
+        # The run's diff is pushed to stream clients after the commit above
+        await get_broker().drain()
+
+    asyncio.run(_run())
+
+
+@app.command()
+def fit_decay(
+    days: Optional[int] = typer.Option(None, help="Days of snapshot history to fit on"),
+) -> None:
+    """
+    Fit the empirical decay table from snapshot history.
+
+    Measures how long spreads stay above the margin threshold per bucket.
+    """
+    # Imported here, only this command fits the decay model
+    from eve_intel.analytics.decay import fit_decay_table
+
+    configure_logging()
+
+    async def _run() -> int:
+        end = datetime.now(UTC)
+        async with get_db_session() as session:
+            return await fit_decay_table(
+                session, end - timedelta(days=days or settings.decay_fit_days), end
+            )
+
+    buckets = asyncio.run(_run())
+    console.print(f"[bold green]Fitted {buckets} decay buckets[/bold green]")
+
+
+@app.command()
+def backtest(
+    start: datetime = typer.Option(..., formats=["%Y-%m-%d"], help="First day (UTC)"),
+    end: datetime = typer.Option(..., formats=["%Y-%m-%d"], help="Day after the last (UTC)"),
+    workers: int = typer.Option(1, help="Worker processes, one time window each at a time"),
+    horizon_hours: Optional[float] = typer.Option(None, help="Hours until the sell executes"),
+    min_ev: Optional[float] = typer.Option(None, help="Minimum expected value (ISK)"),
+    min_margin: Optional[float] = typer.Option(None, help="Minimum net margin %"),
+    output_dir: Optional[str] = typer.Option(None, help="Directory for per-candidate NDJSON"),
+) -> None:
+    """
+    Backtest predicted EV against later snapshots.
+
+    Replays stored order snapshots through the engine and compares predicted
+    with realised profit per candidate.
+    """
+    # Imported here, backtests pull in the process pool machinery
+    from eve_intel.analytics.backtest import run_backtest
+
+    configure_logging()
+
+    summary = asyncio.run(
+        run_backtest(
+            start.replace(tzinfo=UTC),
+            end.replace(tzinfo=UTC),
+            workers=workers,
+            horizon=timedelta(hours=horizon_hours) if horizon_hours else None,
+            thresholds=(min_ev, min_margin, None),
+            output_dir=Path(output_dir) if output_dir else None,
+        )
+    )
+
+    table = Table(title=f"Backtest {start:%Y-%m-%d} .. {end:%Y-%m-%d}", show_lines=True)
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("Snapshots", f"{summary.snapshots:,}")
+    table.add_row("Candidates", f"{summary.candidates:,}")
+    table.add_row("Filled", f"{summary.filled:,}")
+    table.add_row("Predicted EV (M ISK)", f"{summary.predicted_ev_isk / 1_000_000:,.1f}")
+    table.add_row("Realised EV (M ISK)", f"{summary.realised_ev_isk / 1_000_000:,.1f}")
+    table.add_row("Realisation %", f"{summary.realisation_pct:.1f}")
+    table.add_row("Hit rate %", f"{summary.hit_rate_pct:.1f}")
+    table.add_row("Mean abs error (M ISK)", f"{summary.mean_abs_error_isk / 1_000_000:,.2f}")
+    table.add_row("Elapsed (s)", f"{summary.elapsed_seconds:,.1f}")
+    console.print(table)
+
+
+@app.command()
+def find_station(
+    min_ev: float = typer.Option(10_000_000, help="Minimum expected daily value (ISK)"),
+    min_margin: float = typer.Option(5.0, help="Minimum net margin %"),
+    limit: int = typer.Option(50, help="Max results to display"),
+) -> None:
+    """
+    Find same-hub station trading opportunities.
+
+    Ranks bid/ask spreads within each hub after fees and sales tax.
+    """
+    configure_logging()
+
+    async def _run() -> None:
+        async with get_db_session() as session:
+            engine = ArbitrageEngine(session)
+            trades = await engine.find_station_trades(
+                min_ev_isk=min_ev,
+                min_margin_pct=min_margin,
+                top_k=limit,
+            )
+
+        table = Table(title="Station Trading Opportunities", show_lines=True)
+        table.add_column("Item ID", style="cyan")
+        table.add_column("Hub", style="green")
+        table.add_column("Bid", style="yellow", justify="right")
+        table.add_column("Ask", style="yellow", justify="right")
+        table.add_column("Margin %", style="magenta", justify="right")
+        table.add_column("Units/Day", justify="right")
+        table.add_column("EV/Day (M ISK)", style="red", justify="right")
+        for t in trades:
+            table.add_row(
+                str(t.item_id),
+                str(t.hub_id),
+                f"{t.buy_price:,.2f}",
+                f"{t.sell_price:,.2f}",
+                f"{t.net_margin_pct:.2f}",
+                f"{t.units_per_day:,.0f}",
+                f"{t.ev_isk / 1_000_000:.1f}",
+            )
+
+        console.print(table)
+        console.print(f"\n[bold green]Found {len(trades)} opportunities[/bold green]")
+
+    asyncio.run(_run())
+
+
+@app.command()
+def find_chains(
+    max_hops: int = typer.Option(3, help="Max legs per chain"),
+    min_ev: float = typer.Option(200_000_000, help="Minimum expected value per leg (ISK)"),
+    min_margin: float = typer.Option(5.0, help="Minimum net margin % per leg"),
+    limit: int = typer.Option(20, help="Max chains to display"),
+) -> None:
+    """
+    Find multi-hop arbitrage chains (A -> B -> C).
+
+    Ranks chains of consecutive trades by combined EV.
+    """
+    configure_logging()
+
+    async def _run() -> None:
+        async with get_db_session() as session:
+            engine = ArbitrageEngine(session)
+            candidates = await engine.find_arbitrage_opportunities(
+                min_ev_isk=min_ev,
+                min_margin_pct=min_margin,
+            )
+            chains = engine.find_chains(candidates, max_hops=max_hops, top_k=limit)
+
+        table = Table(title="Arbitrage Chains", show_lines=True)
+        table.add_column("Route", style="green")
+        table.add_column("Items", style="cyan")
+        table.add_column("EV (M ISK)", style="red", justify="right")
+        table.add_column("Jumps", justify="right")
+        for chain in chains:
+            table.add_row(
+                " -> ".join(map(str, chain.hubs)),
+                ", ".join(str(leg.item_id) for leg in chain.legs),
+                f"{chain.ev_isk / 1_000_000:.1f}",
+                str(chain.jumps) if chain.jumps is not None else "-",
+            )
+
+        console.print(table)
+        console.print(f"\n[bold green]Found {len(chains)} chains[/bold green]")
+
+    asyncio.run(_run())
+
+
+@app.command()
+def plan_trip(
+    cargo_m3: Optional[float] = typer.Option(None, help="Cargo capacity in m3"),
+    capital: Optional[float] = typer.Option(None, help="Wallet per trip in ISK"),
+    from_hub: Optional[int] = typer.Option(None, help="Restrict to this buy hub"),
+    to_hub: Optional[int] = typer.Option(None, help="Restrict to this sell hub"),
+    min_ev: float = typer.Option(200_000_000, help="Minimum expected value (ISK)"),
+    min_margin: float = typer.Option(5.0, help="Minimum net margin %"),
+    max_routes: int = typer.Option(3, help="Max route plans to display"),
+) -> None:
+    """
+    Plan the most profitable cargo for a trip.
+
+    Picks quantities per route within cargo capacity and wallet.
+    """
+    configure_logging()
+
+    cargo = cargo_m3 or settings.planner_cargo_m3
+    wallet = capital or settings.planner_capital_isk
+
+    async def _run() -> None:
+        async with get_db_session() as session:
+            engine = ArbitrageEngine(session)
+            candidates = await engine.find_arbitrage_opportunities(
+                min_ev_isk=min_ev,
+                min_margin_pct=min_margin,
+            )
+            volumes = await ItemRepository(session).get_volumes(
+                sorted({c.item_id for c in candidates})
+            )
+
+        plans = optimize_trade_plans(candidates, volumes, cargo, wallet, from_hub, to_hub)
+
+        console.print(f"[bold cyan]Cargo: {cargo:,.0f} m3, wallet: {wallet:,.0f} ISK[/bold cyan]")
+        for p in plans[:max_routes]:
+            table = Table(
+                title=f"{p.from_hub_id} -> {p.to_hub_id}: "
+                f"{p.expected_profit_isk / 1_000_000:,.1f}M ISK profit",
+                show_lines=True,
+            )
+            table.add_column("Item ID", style="cyan")
+            table.add_column("Quantity", justify="right")
+            table.add_column("Volume (m3)", justify="right")
+            table.add_column("Capital (M ISK)", style="yellow", justify="right")
+            table.add_column("Profit (M ISK)", style="red", justify="right")
+            for line in p.lines:
+                table.add_row(
+                    str(line.item_id),
+                    f"{line.quantity:,}",
+                    f"{line.volume_m3:,.1f}",
+                    f"{line.capital_isk / 1_000_000:,.1f}",
+                    f"{line.expected_profit_isk / 1_000_000:,.2f}",
+                )
+            console.print(table)
+
+        if not plans:
+            console.print("[bold yellow]No plan fits the given constraints[/bold yellow]")
+
     asyncio.run(_run())
 
 
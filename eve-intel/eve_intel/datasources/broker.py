@@ -0,0 +1,181 @@
+"""Fan-out brokers pushing signal updates to streaming clients."""
+
+import asyncio
+import contextlib
+import json
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Optional, Set
+
+import redis.asyncio as aioredis
+
+from eve_intel.logging import get_logger
+from eve_intel.settings import settings
+
+logger = get_logger(__name__)
+
+# Sent in place of buffered messages a slow client could not keep up with
+RESYNC_MESSAGE = {"type": "resync", "reason": "buffer_overflow"}
+
+
+class Subscription:
+    """
+    Bounded message buffer of one streaming client.
+
+    When the buffer is full the pending messages are dropped and replaced by
+    a single resync message, so a slow client never holds more than
+    ``maxsize`` messages and knows to reload the full signal list.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(maxsize, 1))
+        self.dropped = 0
+
+    def offer(self, message: dict) -> None:
+        """Buffer a message without blocking the publisher."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The reload the resync asks for covers this message and the dropped ones
+            self.dropped += 1
+            while not self.queue.empty():
+                if self.queue.get_nowait() is not RESYNC_MESSAGE:
+                    self.dropped += 1
+            self.queue.put_nowait(RESYNC_MESSAGE)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next message, or None when ``timeout`` passes first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class SignalBroker(ABC):
+    """Abstract signal broker."""
+
+    def __init__(self, buffer_size: Optional[int] = None) -> None:
+        self.buffer_size = buffer_size or settings.stream_client_buffer
+        self._subscriptions: Set[Subscription] = set()
+        self._pending: Set[asyncio.Task] = set()
+
+    def subscribe(self) -> Subscription:
+        """Register a client on this process."""
+        subscription = Subscription(self.buffer_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a client."""
+        self._subscriptions.discard(subscription)
+
+    def deliver(self, message: dict) -> None:
+        """Fan a message out to every client of this process."""
+        for subscription in list(self._subscriptions):
+            subscription.offer(message)
+
+    def publish_soon(self, message: dict) -> None:
+        """Schedule a publish from synchronous code running on the event loop."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish(message))
+        except RuntimeError:
+            logger.warning("broker_publish_no_loop")
+            return
+        # Keep a reference until done, the loop only holds weak ones
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def drain(self) -> None:
+        """Wait for scheduled publishes, before a short-lived process exits."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    @abstractmethod
+    async def publish(self, message: dict) -> None:
+        """Publish a message to every client, on every replica the broker reaches."""
+
+    # Optional hooks, a no-op for brokers that neither listen nor hold connections
+    async def start(self) -> None:  # noqa: B027
+        """Start receiving messages published elsewhere."""
+
+    async def close(self) -> None:  # noqa: B027
+        """Stop receiving and release connections."""
+
+
+class LocalBroker(SignalBroker):
+    """In-process broker, reaching clients of this process only."""
+
+    async def publish(self, message: dict) -> None:
+        """Deliver to local clients."""
+        self.deliver(message)
+
+
+class RedisBroker(SignalBroker):
+    """
+    Redis pub/sub broker fanning out across API replicas.
+
+    Every replica listens on the channel and delivers to its own clients.
+    When Redis is unreachable, messages are delivered to local clients only.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        channel: Optional[str] = None,
+        buffer_size: Optional[int] = None,
+    ) -> None:
+        super().__init__(buffer_size)
+        self.url = url or settings.redis_url
+        self.channel = channel or settings.stream_channel
+        self.client = aioredis.from_url(self.url, decode_responses=True)
+        self._pubsub: Optional[Any] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, message: dict) -> None:
+        """Publish on the channel, or deliver locally if Redis fails."""
+        try:
+            await self.client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            logger.warning("broker_publish_error", channel=self.channel, error=str(e))
+            self.deliver(message)
+            return
+        # Without a live subscription this replica's clients would miss their own runs
+        if self._listener is None or self._listener.done():
+            self.deliver(message)
+
+    async def start(self) -> None:
+        """Subscribe to the channel and deliver its messages to local clients."""
+        try:
+            self._pubsub = self.client.pubsub()
+            await self._pubsub.subscribe(self.channel)
+        except Exception as e:
+            logger.warning("broker_subscribe_error", channel=self.channel, error=str(e))
+            self._pubsub = None
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        try:
+            async for message in self._pubsub.listen():
+                if message.get("type") == "message":
+                    self.deliver(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("broker_listen_error", channel=self.channel, error=str(e))
+
+    async def close(self) -> None:
+        """Stop listening and close the Redis connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_broker() -> SignalBroker:
+    """Process-wide broker selected by the ``stream_broker`` setting."""
+    return RedisBroker() if settings.stream_broker == "redis" else LocalBroker()
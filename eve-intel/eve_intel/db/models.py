@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional
 
 from sqlalchemy import (
+    JSON,
     BigInteger,
     Boolean,
     DateTime,
@@ -16,6 +17,9 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+# SQLite only autoincrements INTEGER primary keys (used by the test suite)
+BigIntegerPK = BigInteger().with_variant(Integer(), "sqlite")
+
 
 class Base(DeclarativeBase):
     """Base class for all models."""
@@ -62,7 +66,7 @@ class OrderSnapshot(Base):
 
     __tablename__ = "orders_snapshot"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     order_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     item_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     hub_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
@@ -84,7 +88,7 @@ class PriceHistory(Base):
 
     __tablename__ = "prices_history"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     item_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     hub_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -103,13 +107,18 @@ class AnalyticsArbitrageRun(Base):
 
     __tablename__ = "analytics_arbitrage_run"
 
-    run_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), index=True
     )
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     num_candidates: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     status: Mapped[str] = mapped_column(String(50), nullable=False, default="running")
+    meta: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Set once retention has downsampled the run's items to its top N
+    compacted_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
 
 class AnalyticsArbitrageItem(Base):
@@ -117,7 +126,7 @@ class AnalyticsArbitrageItem(Base):
 
     __tablename__ = "analytics_arbitrage_item"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
     run_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     item_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     from_hub_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -135,4 +144,183 @@ class AnalyticsArbitrageItem(Base):
         DateTime(timezone=True), server_default=func.now()
     )
 
-    __table_args__ = (Index("idx_arb_item_run", "run_id", "item_id"),)
+    __table_args__ = (
+        Index("idx_arb_item_run", "run_id", "item_id"),
+        # Keyset pages by EV; filter columns are included so filtering needs no heap access
+        Index(
+            "idx_arb_item_run_ev",
+            "run_id",
+            "ev_isk",
+            "id",
+            postgresql_include=[
+                "item_id",
+                "from_hub_id",
+                "to_hub_id",
+                "net_margin_pct",
+                "decay_score",
+            ],
+        ),
+        Index("idx_arb_item_run_route", "run_id", "from_hub_id", "to_hub_id", "ev_isk", "id"),
+    )
+
+
+class AnalyticsArbitrageSignal(Base):
+    """
+    Persistent arbitrage opportunity per route, upserted by every run that finds it.
+
+    ``first_seen``, ``first_run_id`` and ``run_count`` describe the current
+    episode: a route missing from a run goes inactive and starts a new
+    episode when it reappears. Metrics are those of the last run.
+    """
+
+    __tablename__ = "analytics_arbitrage_signal"
+
+    item_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    from_hub_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    to_hub_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    first_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    first_run_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_run_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    run_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    buy_price: Mapped[float] = mapped_column(Float, nullable=False)
+    sell_price: Mapped[float] = mapped_column(Float, nullable=False)
+    spread_pct: Mapped[float] = mapped_column(Float, nullable=False)
+    fees_total: Mapped[float] = mapped_column(Float, nullable=False)
+    liquidity_24h: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ev_isk: Mapped[float] = mapped_column(Float, nullable=False)
+    net_margin_pct: Mapped[float] = mapped_column(Float, nullable=False)
+    decay_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    capital_required: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("idx_arb_signal_last_run", "last_run_id"),
+        Index("idx_arb_signal_active_ev", "active", "ev_isk"),
+    )
+
+
+class AnalyticsRunDiff(Base):
+    """Route added, removed or moved in a run against its base run."""
+
+    __tablename__ = "analytics_run_diff"
+
+    id: Mapped[int] = mapped_column(BigIntegerPK, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    base_run_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # "added", "removed" or "changed"
+    change: Mapped[str] = mapped_column(String(16), nullable=False)
+    item_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    from_hub_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    to_hub_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Values in this run (None for removed routes) and in the base run (None for added ones)
+    ev_isk: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    net_margin_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    prev_ev_isk: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    prev_net_margin_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    __table_args__ = (Index("idx_run_diff_run", "run_id", "change"),)
+
+
+class AnalyticsRunSummary(Base):
+    """Aggregates of a run's candidates, written with the run for dashboards."""
+
+    __tablename__ = "analytics_run_summary"
+
+    run_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    candidates: Mapped[int] = mapped_column(Integer, nullable=False)
+    items: Mapped[int] = mapped_column(Integer, nullable=False)
+    hub_pairs: Mapped[int] = mapped_column(Integer, nullable=False)
+    ev_total: Mapped[float] = mapped_column(Float, nullable=False)
+    # EV percentiles and maximum, None for runs without candidates
+    ev_p50: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ev_p90: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ev_p99: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    ev_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    margin_avg: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    capital_total: Mapped[float] = mapped_column(Float, nullable=False)
+    # Count, total EV and best route per hub pair; top routes by EV
+    best_by_pair: Mapped[list] = mapped_column(JSON, nullable=False)
+    top: Mapped[list] = mapped_column(JSON, nullable=False)
+    # Seconds spent per analysis stage (load_books, load_quotes, score, save, ...)
+    stage_seconds: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+
+    __table_args__ = (Index("idx_run_summary_created", "created_at"),)
+
+
+class SeriesStats(Base):
+    """Rolling price statistics (Welford state) per (item, hub) series and window."""
+
+    __tablename__ = "analytics_series_stats"
+
+    item_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    hub_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    window_days: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    mean: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    last_date: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Trimmed mean daily traded ISK over the window
+    liquidity_isk: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Lowest and highest traded price over the window, for pair pruning
+    price_low: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    price_high: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (Index("idx_series_stats_window_hub", "window_days", "hub_id"),)
+
+
+class BookMarker(Base):
+    """Order book change marker per (item, hub) as of the last saved run."""
+
+    __tablename__ = "analytics_book_marker"
+
+    item_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    hub_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    book_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    run_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    params_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (Index("idx_book_marker_run", "run_id", "params_key"),)
+
+
+class DecayBucket(Base):
+    """Empirical spread survival per (margin, liquidity, volatility) bucket."""
+
+    __tablename__ = "analytics_decay_bucket"
+
+    margin_bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    liquidity_bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    volatility_bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    events: Mapped[int] = mapped_column(Integer, nullable=False)
+    median_hours: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Survival probability at each point of the decay hours grid
+    survival: Mapped[list] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class SeriesForecast(Base):
+    """Online Holt forecaster state (level and daily trend) per (item, hub) series."""
+
+    __tablename__ = "analytics_series_forecast"
+
+    item_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    hub_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    level: Mapped[float] = mapped_column(Float, nullable=False)
+    trend: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    observations: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (Index("idx_series_forecast_hub", "hub_id"),)
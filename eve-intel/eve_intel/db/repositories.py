@@ -1,21 +1,39 @@
 """Data access repositories."""
 
 from datetime import UTC, datetime
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import Row, and_, case, delete, func, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from eve_intel.db.models import (
     AnalyticsArbitrageItem,
     AnalyticsArbitrageRun,
+    AnalyticsArbitrageSignal,
+    AnalyticsRunDiff,
+    AnalyticsRunSummary,
+    BookMarker,
+    DecayBucket,
     Item,
     Market,
     OrderSnapshot,
     PriceHistory,
+    SeriesForecast,
+    SeriesStats,
 )
 
+# asyncpg caps one statement at 32767 bind parameters; multi-row writes stay under
+# this many for their VALUES, leaving room for the parameters of conflict clauses
+MAX_BATCH_PARAMS = 32000
+
+
+def batched_rows(rows: List[dict], max_params: int = MAX_BATCH_PARAMS) -> Iterator[List[dict]]:
+    """Split rows for multi-row VALUES statements of at most ``max_params`` parameters each."""
+    size = max(max_params // max(len(rows[0]), 1), 1) if rows else 1
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
 
 class ItemRepository:
     """Repository for Item operations."""
@@ -52,6 +70,17 @@ class ItemRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_volumes(self, item_ids: List[int]) -> Dict[int, float]:
+        """Get packaged volume (m3) for items that have one."""
+        if not item_ids:
+            return {}
+
+        stmt = select(Item.item_id, Item.volume_m3).where(
+            Item.item_id.in_(item_ids), Item.volume_m3.is_not(None)
+        )
+        result = await self.session.execute(stmt)
+        return dict(result.all())
+
 
 class MarketRepository:
     """Repository for Market operations."""
@@ -114,6 +143,97 @@ class OrderSnapshotRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_latest_snapshot_rows(
+        self, hub_ids: List[int], as_of: Optional[datetime] = None
+    ) -> List[Row]:
+        """
+        Get all orders from the most recent snapshot of each hub.
+
+        With ``as_of`` the most recent snapshot at or before that time is used.
+        Returns plain rows of (item_id, hub_id, order_id, side, price, qty, ts_snapshot)
+        to avoid ORM object overhead on large books.
+        """
+        if not hub_ids:
+            return []
+
+        latest = select(
+            OrderSnapshot.hub_id, func.max(OrderSnapshot.ts_snapshot).label("ts")
+        ).where(OrderSnapshot.hub_id.in_(hub_ids))
+        if as_of is not None:
+            latest = latest.where(OrderSnapshot.ts_snapshot <= as_of)
+        latest = latest.group_by(OrderSnapshot.hub_id).subquery()
+        stmt = select(
+            OrderSnapshot.item_id,
+            OrderSnapshot.hub_id,
+            OrderSnapshot.order_id,
+            OrderSnapshot.side,
+            OrderSnapshot.price,
+            OrderSnapshot.qty,
+            OrderSnapshot.ts_snapshot,
+        ).join(
+            latest,
+            and_(
+                OrderSnapshot.hub_id == latest.c.hub_id,
+                OrderSnapshot.ts_snapshot == latest.c.ts,
+            ),
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_first_snapshot_rows(self, hub_ids: List[int], at_or_after: datetime) -> List[Row]:
+        """
+        Get all orders from the first snapshot of each hub at or after a time.
+
+        Returns plain rows like ``get_latest_snapshot_rows``; hubs without a
+        snapshot since then are left out.
+        """
+        if not hub_ids:
+            return []
+
+        first = (
+            select(OrderSnapshot.hub_id, func.min(OrderSnapshot.ts_snapshot).label("ts"))
+            .where(OrderSnapshot.hub_id.in_(hub_ids), OrderSnapshot.ts_snapshot >= at_or_after)
+            .group_by(OrderSnapshot.hub_id)
+            .subquery()
+        )
+        stmt = select(
+            OrderSnapshot.item_id,
+            OrderSnapshot.hub_id,
+            OrderSnapshot.order_id,
+            OrderSnapshot.side,
+            OrderSnapshot.price,
+            OrderSnapshot.qty,
+            OrderSnapshot.ts_snapshot,
+        ).join(
+            first,
+            and_(
+                OrderSnapshot.hub_id == first.c.hub_id,
+                OrderSnapshot.ts_snapshot == first.c.ts,
+            ),
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_snapshot_times(
+        self, hub_ids: List[int], start: datetime, end: datetime
+    ) -> List[datetime]:
+        """Get distinct snapshot times of the given hubs within [start, end), oldest first."""
+        if not hub_ids:
+            return []
+
+        stmt = (
+            select(OrderSnapshot.ts_snapshot)
+            .where(
+                OrderSnapshot.hub_id.in_(hub_ids),
+                OrderSnapshot.ts_snapshot >= start,
+                OrderSnapshot.ts_snapshot < end,
+            )
+            .distinct()
+            .order_by(OrderSnapshot.ts_snapshot)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
 
 class PriceHistoryRepository:
     """Repository for PriceHistory operations."""
@@ -151,6 +271,224 @@ class PriceHistoryRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_range(
+        self,
+        item_ids: List[int],
+        hub_ids: List[int],
+        start: datetime,
+        end: datetime,
+    ) -> List[PriceHistory]:
+        """Get price history for a set of items and hubs within [start, end], oldest first."""
+        if not item_ids or not hub_ids:
+            return []
+
+        stmt = (
+            select(PriceHistory)
+            .where(
+                PriceHistory.item_id.in_(item_ids),
+                PriceHistory.hub_id.in_(hub_ids),
+                PriceHistory.date >= start,
+                PriceHistory.date <= end,
+            )
+            .order_by(PriceHistory.date)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_turnover(
+        self, hub_ids: List[int], start: datetime, end: datetime
+    ) -> List[Row]:
+        """
+        Get daily traded ISK (volume x avg_price) per series within [start, end].
+
+        Returns plain rows of (item_id, hub_id, date, turnover) grouped by series.
+        """
+        if not hub_ids:
+            return []
+
+        stmt = (
+            select(
+                PriceHistory.item_id,
+                PriceHistory.hub_id,
+                PriceHistory.date,
+                (PriceHistory.volume * PriceHistory.avg_price).label("turnover"),
+            )
+            .where(
+                PriceHistory.hub_id.in_(hub_ids),
+                PriceHistory.date >= start,
+                PriceHistory.date <= end,
+                PriceHistory.volume.is_not(None),
+                PriceHistory.avg_price.is_not(None),
+            )
+            .order_by(PriceHistory.item_id, PriceHistory.hub_id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_prices(self, hub_ids: List[int], start: datetime, end: datetime) -> List[Row]:
+        """
+        Get daily average prices per series within [start, end].
+
+        Returns plain rows of (item_id, hub_id, avg_price) grouped by series.
+        """
+        if not hub_ids:
+            return []
+
+        stmt = (
+            select(PriceHistory.item_id, PriceHistory.hub_id, PriceHistory.avg_price)
+            .where(
+                PriceHistory.hub_id.in_(hub_ids),
+                PriceHistory.date >= start,
+                PriceHistory.date <= end,
+                PriceHistory.avg_price.is_not(None),
+            )
+            .order_by(PriceHistory.item_id, PriceHistory.hub_id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_price_bands(
+        self, hub_ids: List[int], start: datetime, end: datetime
+    ) -> List[Row]:
+        """Get the lowest and highest traded price per series within [start, end]."""
+        if not hub_ids:
+            return []
+
+        stmt = (
+            select(
+                PriceHistory.item_id,
+                PriceHistory.hub_id,
+                func.min(PriceHistory.min_price),
+                func.max(PriceHistory.max_price),
+            )
+            .where(
+                PriceHistory.hub_id.in_(hub_ids),
+                PriceHistory.date >= start,
+                PriceHistory.date <= end,
+                PriceHistory.min_price.is_not(None),
+                PriceHistory.max_price.is_not(None),
+            )
+            .group_by(PriceHistory.item_id, PriceHistory.hub_id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_avg_daily_volume(
+        self, hub_ids: List[int], since: datetime
+    ) -> Dict[Tuple[int, int], float]:
+        """Average daily traded units per (item_id, hub_id) since a date."""
+        if not hub_ids:
+            return {}
+
+        stmt = (
+            select(PriceHistory.item_id, PriceHistory.hub_id, func.avg(PriceHistory.volume))
+            .where(
+                PriceHistory.hub_id.in_(hub_ids),
+                PriceHistory.date >= since,
+                PriceHistory.volume.is_not(None),
+            )
+            .group_by(PriceHistory.item_id, PriceHistory.hub_id)
+        )
+        result = await self.session.execute(stmt)
+        return {(item_id, hub_id): float(volume) for item_id, hub_id, volume in result.all()}
+
+    async def get_on_dates(
+        self, item_ids: List[int], hub_ids: List[int], dates: List[datetime]
+    ) -> List[PriceHistory]:
+        """Get price history for a set of items and hubs on specific dates."""
+        if not item_ids or not hub_ids or not dates:
+            return []
+
+        stmt = select(PriceHistory).where(
+            PriceHistory.item_id.in_(item_ids),
+            PriceHistory.hub_id.in_(hub_ids),
+            PriceHistory.date.in_(dates),
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class SeriesStatsRepository:
+    """Repository for SeriesStats operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def upsert_batch(self, stats: List[dict]) -> None:
+        """Upsert rolling statistics in batch."""
+        if not stats:
+            return
+
+        for batch in batched_rows(stats):
+            stmt = insert(SeriesStats).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "hub_id", "window_days"],
+                set_={
+                    "count": stmt.excluded.count,
+                    "mean": stmt.excluded.mean,
+                    "m2": stmt.excluded.m2,
+                    "last_date": stmt.excluded.last_date,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def upsert_liquidity(self, rows: List[dict]) -> None:
+        """Upsert cached liquidity, leaving the rolling statistics of existing rows untouched."""
+        if not rows:
+            return
+
+        values = [{"count": 0, "mean": 0.0, "m2": 0.0, **row} for row in rows]
+        for batch in batched_rows(values):
+            stmt = insert(SeriesStats).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "hub_id", "window_days"],
+                set_={
+                    "liquidity_isk": stmt.excluded.liquidity_isk,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def upsert_bands(self, rows: List[dict]) -> None:
+        """Upsert cached price bands, leaving the rolling statistics of existing rows untouched."""
+        if not rows:
+            return
+
+        values = [{"count": 0, "mean": 0.0, "m2": 0.0, **row} for row in rows]
+        for batch in batched_rows(values):
+            stmt = insert(SeriesStats).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "hub_id", "window_days"],
+                set_={
+                    "price_low": stmt.excluded.price_low,
+                    "price_high": stmt.excluded.price_high,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def get_for_series(self, item_ids: List[int], hub_ids: List[int]) -> List[SeriesStats]:
+        """Get statistics for all windows of the given items and hubs."""
+        if not item_ids or not hub_ids:
+            return []
+
+        stmt = select(SeriesStats).where(
+            SeriesStats.item_id.in_(item_ids), SeriesStats.hub_id.in_(hub_ids)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_by_window(
+        self, window_days: int, hub_ids: Optional[List[int]] = None
+    ) -> List[SeriesStats]:
+        """Get statistics for every series over one window."""
+        stmt = select(SeriesStats).where(SeriesStats.window_days == window_days)
+        if hub_ids:
+            stmt = stmt.where(SeriesStats.hub_id.in_(hub_ids))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
 
 class ArbitrageRunRepository:
     """Repository for ArbitrageRun operations."""
@@ -165,21 +503,94 @@ class ArbitrageRunRepository:
         await self.session.flush()
         return run.run_id
 
-    async def complete_run(self, run_id: int, num_candidates: int) -> None:
+    async def get_created_at(self, run_id: int) -> Optional[datetime]:
+        """Get a run's creation time as the database set it."""
+        stmt = select(AnalyticsArbitrageRun.created_at).where(
+            AnalyticsArbitrageRun.run_id == run_id
+        )
+        return await self.session.scalar(stmt)
+
+    async def complete_run(
+        self, run_id: int, num_candidates: int, meta: Optional[dict] = None
+    ) -> None:
         """Mark run as complete."""
         stmt = (
             update(AnalyticsArbitrageRun)
             .where(AnalyticsArbitrageRun.run_id == run_id)
-            .values(completed_at=datetime.now(UTC), num_candidates=num_candidates, status="completed")
+            .values(
+                completed_at=datetime.now(UTC),
+                num_candidates=num_candidates,
+                status="completed",
+                meta=meta,
+            )
         )
         await self.session.execute(stmt)
 
+    async def get_by_id(self, run_id: int) -> Optional[AnalyticsArbitrageRun]:
+        """Get a run by ID."""
+        return await self.session.get(AnalyticsArbitrageRun, run_id)
+
+    async def get_for_compaction(
+        self, created_before: datetime, limit: int, below_run_id: Optional[int] = None
+    ) -> List[AnalyticsArbitrageRun]:
+        """Get completed runs older than the cutoff whose items were not downsampled yet."""
+        stmt = select(AnalyticsArbitrageRun).where(
+            AnalyticsArbitrageRun.status == "completed",
+            AnalyticsArbitrageRun.created_at < created_before,
+            AnalyticsArbitrageRun.compacted_at.is_(None),
+        )
+        if below_run_id is not None:
+            stmt = stmt.where(AnalyticsArbitrageRun.run_id < below_run_id)
+        stmt = stmt.order_by(AnalyticsArbitrageRun.run_id).limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_expired_ids(
+        self, created_before: datetime, limit: int, below_run_id: Optional[int] = None
+    ) -> List[int]:
+        """Get IDs of runs created before the cutoff, oldest first."""
+        stmt = select(AnalyticsArbitrageRun.run_id).where(
+            AnalyticsArbitrageRun.created_at < created_before
+        )
+        if below_run_id is not None:
+            stmt = stmt.where(AnalyticsArbitrageRun.run_id < below_run_id)
+        stmt = stmt.order_by(AnalyticsArbitrageRun.run_id).limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def mark_compacted(self, run_id: int, meta: Optional[dict]) -> None:
+        """Record that a run was downsampled, with its updated metadata."""
+        stmt = (
+            update(AnalyticsArbitrageRun)
+            .where(AnalyticsArbitrageRun.run_id == run_id)
+            .values(compacted_at=datetime.now(UTC), meta=meta)
+        )
+        await self.session.execute(stmt)
+
+    async def delete_runs(self, run_ids: List[int]) -> None:
+        """Delete run rows (their items and diffs are deleted separately)."""
+        if not run_ids:
+            return
+        stmt = delete(AnalyticsArbitrageRun).where(AnalyticsArbitrageRun.run_id.in_(run_ids))
+        await self.session.execute(stmt)
+
     async def get_latest_run(self) -> Optional[AnalyticsArbitrageRun]:
         """Get the latest run."""
         stmt = select(AnalyticsArbitrageRun).order_by(AnalyticsArbitrageRun.created_at.desc()).limit(1)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_latest_completed_run(self) -> Optional[AnalyticsArbitrageRun]:
+        """Get the latest completed run."""
+        stmt = (
+            select(AnalyticsArbitrageRun)
+            .where(AnalyticsArbitrageRun.status == "completed")
+            .order_by(AnalyticsArbitrageRun.run_id.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
 
 class ArbitrageItemRepository:
     """Repository for ArbitrageItem operations."""
@@ -195,18 +606,373 @@ class ArbitrageItemRepository:
         stmt = insert(AnalyticsArbitrageItem).values(items)
         await self.session.execute(stmt)
 
-    async def get_by_run(self, run_id: int, limit: int = 100) -> List[AnalyticsArbitrageItem]:
-        """Get arbitrage items for a run, ordered by EV."""
+    async def get_by_run(
+        self, run_id: int, limit: Optional[int] = 100
+    ) -> List[AnalyticsArbitrageItem]:
+        """Get arbitrage items for a run, ordered by EV (all of them when ``limit`` is None)."""
         stmt = (
             select(AnalyticsArbitrageItem)
             .where(AnalyticsArbitrageItem.run_id == run_id)
             .order_by(AnalyticsArbitrageItem.ev_isk.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_page(
+        self,
+        run_id: int,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        item_id: Optional[int] = None,
+        from_hub_id: Optional[int] = None,
+        to_hub_id: Optional[int] = None,
+        min_ev: Optional[float] = None,
+        min_margin: Optional[float] = None,
+        min_decay: Optional[float] = None,
+    ) -> List[AnalyticsArbitrageItem]:
+        """
+        Get one page of a run's items, filtered in the database.
+
+        Pages are ordered by (``ev_isk``, ``id``) descending and continue
+        strictly after the ``after`` key of the previous page's last row, so
+        every page is an index seek on ``idx_arb_item_run_ev`` however deep.
+        """
+        model = AnalyticsArbitrageItem
+        conditions = [model.run_id == run_id]
+        if after is not None:
+            conditions.append(tuple_(model.ev_isk, model.id) < tuple_(*after))
+        if item_id is not None:
+            conditions.append(model.item_id == item_id)
+        if from_hub_id is not None:
+            conditions.append(model.from_hub_id == from_hub_id)
+        if to_hub_id is not None:
+            conditions.append(model.to_hub_id == to_hub_id)
+        if min_ev is not None:
+            conditions.append(model.ev_isk >= min_ev)
+        if min_margin is not None:
+            conditions.append(model.net_margin_pct >= min_margin)
+        if min_decay is not None:
+            conditions.append(model.decay_score >= min_decay)
+
+        stmt = (
+            select(model)
+            .where(*conditions)
+            .order_by(model.ev_isk.desc(), model.id.desc())
             .limit(limit)
         )
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_by_run_excluding_items(
+        self, run_id: int, item_ids: List[int]
+    ) -> List[AnalyticsArbitrageItem]:
+        """Get all arbitrage items for a run except those of the given items."""
+        stmt = select(AnalyticsArbitrageItem).where(AnalyticsArbitrageItem.run_id == run_id)
+        if item_ids:
+            stmt = stmt.where(AnalyticsArbitrageItem.item_id.not_in(item_ids))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def delete_by_run(self, run_id: int) -> None:
         """Delete all items for a run."""
         stmt = delete(AnalyticsArbitrageItem).where(AnalyticsArbitrageItem.run_id == run_id)
         await self.session.execute(stmt)
+
+    async def get_key_at(self, run_id: int, rank: int) -> Optional[Tuple[float, int]]:
+        """(``ev_isk``, ``id``) key of the run's item at a 0-based EV rank, if it has that many."""
+        stmt = (
+            select(AnalyticsArbitrageItem.ev_isk, AnalyticsArbitrageItem.id)
+            .where(AnalyticsArbitrageItem.run_id == run_id)
+            .order_by(AnalyticsArbitrageItem.ev_isk.desc(), AnalyticsArbitrageItem.id.desc())
+            .offset(rank)
+            .limit(1)
+        )
+        row = (await self.session.execute(stmt)).first()
+        return (row.ev_isk, row.id) if row is not None else None
+
+    async def get_run_stats(self, run_id: int) -> Dict[str, Optional[float]]:
+        """Aggregate statistics of a run's items."""
+        model = AnalyticsArbitrageItem
+        stmt = select(
+            func.count(model.id).label("items"),
+            func.sum(model.ev_isk).label("ev_total"),
+            func.max(model.ev_isk).label("ev_max"),
+            func.avg(model.ev_isk).label("ev_avg"),
+            func.avg(model.net_margin_pct).label("margin_avg"),
+            func.sum(model.capital_required).label("capital_total"),
+        ).where(model.run_id == run_id)
+        row = (await self.session.execute(stmt)).one()
+        return dict(row._mapping)
+
+    async def delete_batch(
+        self, run_ids: List[int], batch_size: int, after: Optional[Tuple[float, int]] = None
+    ) -> int:
+        """
+        Delete at most ``batch_size`` items of the given runs and return how many went.
+
+        With ``after`` (one run only) only items ranked strictly after that
+        (``ev_isk``, ``id``) key are deleted, keeping the top of the run.
+        """
+        model = AnalyticsArbitrageItem
+        ids = select(model.id).where(model.run_id.in_(run_ids))
+        if after is not None:
+            ids = ids.where(tuple_(model.ev_isk, model.id) < tuple_(*after))
+        ids = ids.limit(batch_size)
+        result = await self.session.execute(delete(model).where(model.id.in_(ids)))
+        return result.rowcount or 0
+
+
+class ArbitrageSignalRepository:
+    """Repository for AnalyticsArbitrageSignal operations."""
+
+    # Current metrics, overwritten by every run that finds the route
+    METRICS = (
+        "buy_price",
+        "sell_price",
+        "spread_pct",
+        "fees_total",
+        "liquidity_24h",
+        "ev_isk",
+        "net_margin_pct",
+        "decay_score",
+        "capital_required",
+    )
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def upsert_run(self, run_id: int, seen_at: datetime, rows: List[dict]) -> None:
+        """
+        Record one run's routes in bulk upserts, then retire the rest.
+
+        Routes active before this run extend their episode; new routes and
+        routes coming back after a gap start one at this run. Active routes
+        this run did not find are marked inactive once all of them are written.
+        """
+        signal = AnalyticsArbitrageSignal
+        values = [
+            {
+                "item_id": row["item_id"],
+                "from_hub_id": row["from_hub_id"],
+                "to_hub_id": row["to_hub_id"],
+                "first_seen": seen_at,
+                "last_seen": seen_at,
+                "first_run_id": run_id,
+                "last_run_id": run_id,
+                "run_count": 1,
+                "active": True,
+                **{name: row[name] for name in self.METRICS},
+            }
+            for row in rows
+        ]
+        for batch in batched_rows(values):
+            stmt = insert(signal).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "from_hub_id", "to_hub_id"],
+                set_={
+                    "first_seen": case(
+                        (signal.active, signal.first_seen), else_=stmt.excluded.first_seen
+                    ),
+                    "first_run_id": case(
+                        (signal.active, signal.first_run_id), else_=stmt.excluded.first_run_id
+                    ),
+                    "run_count": case((signal.active, signal.run_count + 1), else_=1),
+                    "last_seen": stmt.excluded.last_seen,
+                    "last_run_id": stmt.excluded.last_run_id,
+                    "active": True,
+                    **{name: getattr(stmt.excluded, name) for name in self.METRICS},
+                },
+            )
+            await self.session.execute(stmt)
+
+        retire = (
+            update(AnalyticsArbitrageSignal)
+            .where(
+                AnalyticsArbitrageSignal.active.is_(True),
+                AnalyticsArbitrageSignal.last_run_id != run_id,
+            )
+            .values(active=False)
+        )
+        await self.session.execute(retire)
+
+    async def get_by_last_run(
+        self, run_id: int, exclude_item_ids: Optional[List[int]] = None
+    ) -> List[AnalyticsArbitrageSignal]:
+        """Get the routes a run was the last to find, ordered by EV."""
+        stmt = select(AnalyticsArbitrageSignal).where(
+            AnalyticsArbitrageSignal.last_run_id == run_id
+        )
+        if exclude_item_ids:
+            stmt = stmt.where(AnalyticsArbitrageSignal.item_id.not_in(exclude_item_ids))
+        stmt = stmt.order_by(AnalyticsArbitrageSignal.ev_isk.desc())
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class RunDiffRepository:
+    """Repository for AnalyticsRunDiff operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def insert_batch(self, rows: List[dict]) -> None:
+        """Insert diff rows in batch."""
+        if not rows:
+            return
+
+        stmt = insert(AnalyticsRunDiff).values(rows)
+        await self.session.execute(stmt)
+
+    async def delete_by_runs(self, run_ids: List[int]) -> None:
+        """Delete the diff rows of the given runs."""
+        if not run_ids:
+            return
+        stmt = delete(AnalyticsRunDiff).where(AnalyticsRunDiff.run_id.in_(run_ids))
+        await self.session.execute(stmt)
+
+    async def get_by_run(self, run_id: int) -> List[AnalyticsRunDiff]:
+        """Get a run's diff rows in insertion order (new run's EV order, then removals)."""
+        stmt = (
+            select(AnalyticsRunDiff)
+            .where(AnalyticsRunDiff.run_id == run_id)
+            .order_by(AnalyticsRunDiff.id)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class RunSummaryRepository:
+    """Repository for AnalyticsRunSummary operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def insert(self, row: dict) -> None:
+        """Insert a run's summary row."""
+        await self.session.execute(insert(AnalyticsRunSummary).values(row))
+
+    async def set_stage_seconds(self, run_id: int, stage_seconds: Optional[dict]) -> None:
+        """Record a run's stage timings on its summary."""
+        stmt = (
+            update(AnalyticsRunSummary)
+            .where(AnalyticsRunSummary.run_id == run_id)
+            .values(stage_seconds=stage_seconds)
+        )
+        await self.session.execute(stmt)
+
+    async def delete_by_runs(self, run_ids: List[int]) -> None:
+        """Delete the summary rows of the given runs."""
+        if not run_ids:
+            return
+        stmt = delete(AnalyticsRunSummary).where(AnalyticsRunSummary.run_id.in_(run_ids))
+        await self.session.execute(stmt)
+
+    async def get_by_run(self, run_id: int) -> Optional[AnalyticsRunSummary]:
+        """Get a run's summary."""
+        return await self.session.get(AnalyticsRunSummary, run_id)
+
+
+class BookMarkerRepository:
+    """Repository for BookMarker operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def upsert_batch(self, markers: List[dict]) -> None:
+        """Upsert book markers in batch."""
+        if not markers:
+            return
+
+        # One marker per book in the market, more than one statement can take
+        for batch in batched_rows(markers):
+            stmt = insert(BookMarker).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "hub_id"],
+                set_={
+                    "book_hash": stmt.excluded.book_hash,
+                    "run_id": stmt.excluded.run_id,
+                    "params_key": stmt.excluded.params_key,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def get_all(self) -> List[BookMarker]:
+        """Get all book markers."""
+        stmt = select(BookMarker)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_for_run(self, run_id: int, params_key: str) -> List[BookMarker]:
+        """Get the markers a run recorded with the given parameters."""
+        stmt = select(BookMarker).where(
+            BookMarker.run_id == run_id, BookMarker.params_key == params_key
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class DecayBucketRepository:
+    """Repository for DecayBucket operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def replace_all(self, buckets: List[dict]) -> None:
+        """Replace the decay table with a freshly fitted one."""
+        await self.session.execute(delete(DecayBucket))
+        if buckets:
+            await self.session.execute(insert(DecayBucket).values(buckets))
+
+    async def get_all(self) -> List[DecayBucket]:
+        """Get all decay buckets."""
+        stmt = select(DecayBucket)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+class SeriesForecastRepository:
+    """Repository for SeriesForecast operations."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def upsert_batch(self, states: List[dict]) -> None:
+        """Upsert forecaster states in batch."""
+        if not states:
+            return
+
+        for batch in batched_rows(states):
+            stmt = insert(SeriesForecast).values(batch)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["item_id", "hub_id"],
+                set_={
+                    "level": stmt.excluded.level,
+                    "trend": stmt.excluded.trend,
+                    "observations": stmt.excluded.observations,
+                    "last_date": stmt.excluded.last_date,
+                    "updated_at": datetime.now(UTC),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def get_for_series(self, item_ids: List[int], hub_ids: List[int]) -> List[SeriesForecast]:
+        """Get forecaster states of the given items and hubs."""
+        if not item_ids or not hub_ids:
+            return []
+
+        stmt = select(SeriesForecast).where(
+            SeriesForecast.item_id.in_(item_ids), SeriesForecast.hub_id.in_(hub_ids)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_all(self, hub_ids: Optional[List[int]] = None) -> List[SeriesForecast]:
+        """Get forecaster states of every series, optionally restricted to some hubs."""
+        stmt = select(SeriesForecast)
+        if hub_ids:
+            stmt = stmt.where(SeriesForecast.hub_id.in_(hub_ids))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
@@ -46,6 +46,18 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0")
     cache_ttl_seconds: int = Field(default=300)
 
+    # Signal streaming: broker ("redis" or "local"), channel, per-client buffer, heartbeat
+    stream_broker: str = Field(default="redis")
+    stream_channel: str = Field(default="eve_intel:signals")
+    stream_client_buffer: int = Field(default=16)
+    stream_heartbeat_seconds: float = Field(default=15.0)
+
+    # Analysis jobs: record store ("redis" or "local"), concurrent runs, queue depth, result TTL
+    job_store: str = Field(default="redis")
+    job_max_workers: int = Field(default=2)
+    job_max_queued: int = Field(default=8)
+    job_result_ttl_seconds: int = Field(default=3600)
+
     # ESI API
     esi_base_url: str = Field(default="https://esi.evetech.net/latest")
     esi_user_agent: str = Field(default="eve-intel/0.1.0")
@@ -61,6 +73,19 @@ class Settings(BaseSettings):
         """Parse market hubs into list of integers."""
         return [int(h.strip()) for h in self.market_hubs.split(",") if h.strip()]
 
+    # Extra hubs (beyond market_hubs) included in the route graph
+    route_extra_hubs: str = Field(default="")
+
+    @property
+    def route_hub_ids(self) -> List[int]:
+        """Market hubs plus extra route hubs, as a list of integers."""
+        extra = [int(h.strip()) for h in self.route_extra_hubs.split(",") if h.strip()]
+        return sorted(set(self.market_hub_ids) | set(extra))
+
+    # Route graph: stargate adjacency CSV (empty disables jumps) and jump matrix cache
+    route_jumps_file: str = Field(default="")
+    route_cache_dir: str = Field(default=".cache/routes")
+
     # Trading parameters
     broker_fee_pct: float = Field(default=3.0)
     sales_tax_pct: float = Field(default=8.0)
@@ -69,9 +94,94 @@ class Settings(BaseSettings):
     min_net_margin_pct: float = Field(default=5.0)
     slippage_buffer_pct: float = Field(default=2.0)
 
+    # Online Holt price forecasts: smoothing factors, warm-up days and haul horizon
+    forecast_alpha: float = Field(default=0.3)
+    forecast_beta: float = Field(default=0.1)
+    forecast_min_observations: int = Field(default=5)
+    forecast_haul_hours: float = Field(default=6.0)
+    rank_by_forecast: bool = Field(default=False)
+
+    # Seconds between latest-run checks by read endpoints serving cached results
+    latest_run_check_seconds: float = Field(default=5.0)
+
+    # Keep per-run result rows (paging, history); signals are always kept, one row per route
+    store_run_items: bool = Field(default=True)
+
+    # Run retention: days of full detail, top N items kept after that, days before deletion
+    # (0 disables a horizon), rows deleted per committed batch, VACUUM ANALYZE afterwards
+    retention_full_days: int = Field(default=7)
+    retention_top_n: int = Field(default=100)
+    retention_max_days: int = Field(default=90)
+    retention_batch_size: int = Field(default=5000)
+    retention_vacuum: bool = Field(default=True)
+
+    # Top routes by EV kept in each run's summary row (dashboards' top opportunities)
+    summary_top_n: int = Field(default=50)
+
+    # Stored run diffs: EV or margin move (% of the previous value) that counts as changed
+    diff_change_pct: float = Field(default=5.0)
+
+    # Rows per Arrow record batch / NDJSON chunk in bulk signal exports
+    export_batch_rows: int = Field(default=10000)
+
+    # Pair pruning: traded price band window and slack added on both sides of the band
+    prune_band_days: int = Field(default=30)
+    prune_band_slack_pct: float = Field(default=10.0)
+
+    # Order quality filter: history window for reference prices, allowed band around the
+    # median (MADs, and a floor in % of the median), minimum order notional
+    order_reference_days: int = Field(default=14)
+    order_band_mad: float = Field(default=10.0)
+    order_band_min_pct: float = Field(default=50.0)
+    order_min_notional_isk: float = Field(default=1_000.0)
+
+    # Trade planner defaults (deep space transport cargo, one trip wallet)
+    planner_cargo_m3: float = Field(default=60_000.0)
+    planner_capital_isk: float = Field(default=1_000_000_000.0)
+
+    # Station trading: share of a hub's daily volume we expect to fill, volume window,
+    # trades kept with each saved run for GET /signals/station
+    station_market_share_pct: float = Field(default=5.0)
+    station_volume_days: int = Field(default=7)
+    station_min_ev_isk: float = Field(default=10_000_000)
+    station_run_top_n: int = Field(default=1000)
+
+    # Empirical decay: survival read at this horizon, min spreads per bucket, fit lookback
+    decay_horizon_hours: float = Field(default=4.0)
+    decay_min_samples: int = Field(default=20)
+    decay_fit_days: int = Field(default=30)
+
+    # Backtests: hauling time before the sell side executes, time window per worker task
+    backtest_horizon_hours: float = Field(default=4.0)
+    backtest_window_days: int = Field(default=7)
+
+    # Multi-hop chain search
+    chain_max_hops: int = Field(default=3)
+    chain_top_k: int = Field(default=20)
+
+    # Rolling statistics
+    stats_windows_days: str = Field(default="7,30")
+    volatility_window_days: int = Field(default=30)
+    # 24h liquidity: trailing window and % of days trimmed from each end
+    liquidity_window_days: int = Field(default=7)
+    liquidity_trim_pct: float = Field(default=10.0)
+
+    @property
+    def stats_window_list(self) -> List[int]:
+        """Parse rolling statistics windows into list of integers."""
+        return sorted({int(w.strip()) for w in self.stats_windows_days.split(",") if w.strip()})
+
+    # Worker processes for sharded analytics (1 = in-process)
+    analytics_workers: int = Field(default=1)
+
+    # Incremental analytics: force a full recomputation when the last run is older
+    incremental_full_refresh_minutes: int = Field(default=240)
+
     # Scheduler
     ingestion_cron_schedule: str = Field(default="0 */4 * * *")
     analytics_cron_schedule: str = Field(default="15 */4 * * *")
+    decay_fit_cron_schedule: str = Field(default="30 3 * * *")
+    retention_cron_schedule: str = Field(default="45 3 * * *")
 
     # Grafana
     gf_security_admin_user: str = Field(default="admin")
@@ -1,12 +1,14 @@
 """Background worker with scheduled jobs."""
 
 import asyncio
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.decay import fit_decay_table
+from eve_intel.analytics.retention import RetentionJob, vacuum_analyze
 from eve_intel.db.base import get_db_session
 from eve_intel.logging import configure_logging, get_logger
 from eve_intel.settings import settings
@@ -34,8 +36,14 @@ async def run_arbitrage_analytics() -> None:
         async with get_db_session() as session:
             engine = ArbitrageEngine(session)
 
-            # Find opportunities
-            candidates = await engine.find_arbitrage_opportunities()
+            # Find opportunities, recomputing only items whose books changed
+            candidates = await engine.find_arbitrage_opportunities(incremental=True)
+
+            # Multi-hop chains over the same candidates, kept in the run metadata
+            engine.find_chains(candidates)
+
+            # Station trading reuses the order books loaded above
+            await engine.find_station_trades()
 
             # Save results
             if candidates:
@@ -52,6 +60,35 @@ async def run_arbitrage_analytics() -> None:
         logger.error("arbitrage_analytics_failed", error=str(e))
 
 
+async def fit_decay_model() -> None:
+    """Refit the empirical decay table from recent snapshot history."""
+    logger.info("starting_decay_fit")
+
+    try:
+        end = datetime.now(UTC)
+        async with get_db_session() as session:
+            buckets = await fit_decay_table(
+                session, end - timedelta(days=settings.decay_fit_days), end
+            )
+        logger.info("decay_fit_complete", buckets=buckets)
+    except Exception as e:
+        logger.error("decay_fit_failed", error=str(e))
+
+
+async def apply_run_retention() -> None:
+    """Downsample old runs to their top N items and delete expired ones."""
+    logger.info("starting_run_retention")
+
+    try:
+        async with get_db_session() as session:
+            stats = await RetentionJob(session).run()
+            if settings.retention_vacuum and (stats.items_deleted or stats.runs_deleted):
+                await vacuum_analyze(session)
+        logger.info("run_retention_complete", **stats.as_meta())
+    except Exception as e:
+        logger.error("run_retention_failed", error=str(e))
+
+
 async def main() -> None:
     """Run worker with scheduled jobs."""
     configure_logging()
@@ -78,6 +115,24 @@ async def main() -> None:
         replace_existing=True,
     )
 
+    # Schedule empirical decay refit
+    scheduler.add_job(
+        fit_decay_model,
+        CronTrigger.from_crontab(settings.decay_fit_cron_schedule),
+        id="fit_decay_model",
+        name="Decay Model Fit",
+        replace_existing=True,
+    )
+
+    # Schedule run retention and compaction
+    scheduler.add_job(
+        apply_run_retention,
+        CronTrigger.from_crontab(settings.retention_cron_schedule),
+        id="apply_run_retention",
+        name="Run Retention",
+        replace_existing=True,
+    )
+
     scheduler.start()
     logger.info("worker_started", jobs=len(scheduler.get_jobs()))
 
@@ -3,7 +3,13 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.arbitrage import (
+    ArbitrageEngine,
+    QuoteColumns,
+    rank_candidates,
+    score_quotes,
+)
+from eve_intel.analytics.fees import FeeProfile, calculate_net_margin_pct, default_fee_profile
 
 
 @pytest.mark.asyncio
@@ -41,3 +47,136 @@ async def test_mock_candidates_generated(db_session: AsyncSession) -> None:
         assert c.to_hub_id > 0
         assert c.buy_price > 0
         assert c.sell_price > c.buy_price
+
+
+@pytest.mark.asyncio
+async def test_fee_scenarios_evaluated_per_profile(db_session: AsyncSession) -> None:
+    """Test that each fee profile gets its own ranked results."""
+    engine = ArbitrageEngine(db_session)
+    cheap = FeeProfile(name="cheap", broker_fee_pct=1.0, sales_tax_pct=3.6)
+    pricey = FeeProfile(name="pricey", broker_fee_pct=3.0, sales_tax_pct=8.0)
+
+    results = await engine.find_arbitrage_scenarios(
+        [cheap, pricey], min_ev_isk=1.0, min_margin_pct=0.01
+    )
+
+    assert set(results) == {"cheap", "pricey"}
+    assert len(results["cheap"]) >= len(results["pricey"])
+    for c in results["cheap"]:
+        expected = calculate_net_margin_pct(c.buy_price, c.sell_price, 1.0, 3.6)
+        assert c.net_margin_pct == pytest.approx(expected)
+
+    # Single-profile lookup matches the scenario result
+    single = await engine.find_arbitrage_opportunities(
+        min_ev_isk=1.0, min_margin_pct=0.01, fee_profile=pricey
+    )
+    assert [c.item_id for c in single] == [c.item_id for c in results["pricey"]]
+
+
+@pytest.mark.asyncio
+async def test_incremental_recomputes_only_changed_books(db_session: AsyncSession) -> None:
+    """Test that unchanged items are carried forward from the previous run."""
+    from datetime import UTC, datetime
+
+    from eve_intel.db.repositories import OrderSnapshotRepository, SeriesStatsRepository
+
+    def snapshot(ts: datetime, pyerite_ask: float) -> list:
+        asks = [
+            (1, 34, 60003760, 5.5),
+            (2, 34, 60008494, 6.8),
+            (3, 35, 60011866, pyerite_ask),
+            (4, 35, 60003760, 15.5),
+        ]
+        return [
+            {
+                "order_id": order_id,
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "side": "sell",
+                "price": price,
+                "qty": 1000,
+                "ts_snapshot": ts,
+            }
+            for order_id, item_id, hub_id, price in asks
+        ]
+
+    await SeriesStatsRepository(db_session).upsert_liquidity(
+        [
+            {"item_id": item_id, "hub_id": hub_id, "window_days": 7, "liquidity_isk": 1.5e9}
+            for item_id, hub_id in [(34, 60003760), (34, 60008494), (35, 60011866), (35, 60003760)]
+        ]
+    )
+    orders = OrderSnapshotRepository(db_session)
+    await orders.insert_batch(snapshot(datetime(2025, 1, 15, 0, tzinfo=UTC), 12.2))
+
+    engine = ArbitrageEngine(db_session)
+    first = await engine.find_arbitrage_opportunities(
+        min_ev_isk=1.0, min_margin_pct=0.1, incremental=True
+    )
+    assert {c.item_id for c in first} == {34, 35}
+    await engine.save_run_results(first)
+
+    # Only Pyerite's book moves in the next snapshot
+    await orders.insert_batch(snapshot(datetime(2025, 1, 15, 1, tzinfo=UTC), 12.0))
+
+    engine = ArbitrageEngine(db_session)
+    plan = await engine._plan_incremental(
+        engine._make_params_key(default_fee_profile(), 1.0, 0.1, None)
+    )
+    assert plan is not None
+    assert plan[0] == {35}
+
+    second = await engine.find_arbitrage_opportunities(
+        min_ev_isk=1.0, min_margin_pct=0.1, incremental=True
+    )
+    by_item = {c.item_id: c for c in second}
+    assert by_item[34].buy_price == 5.5
+    assert by_item[35].buy_price == 12.0
+
+    # A top-K base run stored only its top K, so incremental top-K runs recompute in full
+    engine = ArbitrageEngine(db_session)
+    top = await engine.find_arbitrage_opportunities(
+        min_ev_isk=1.0, min_margin_pct=0.1, incremental=True, top_k=1
+    )
+    await engine.save_run_results(top)
+    assert [c.item_id for c in top] == [35]
+
+    # Pyerite's margin collapses: the unchanged Tritanium route must take its place
+    await orders.insert_batch(snapshot(datetime(2025, 1, 15, 2, tzinfo=UTC), 15.0))
+    third = await ArbitrageEngine(db_session).find_arbitrage_opportunities(
+        min_ev_isk=1.0, min_margin_pct=0.1, incremental=True, top_k=1
+    )
+    assert [c.item_id for c in third] == [34]
+
+
+def test_rank_candidates_top_k_matches_full_sort() -> None:
+    """Test heap top-K selection against a full sort and lazy materialization."""
+    quotes = QuoteColumns()
+    for i in range(200):
+        buy = 100.0 + (i * 37) % 91
+        quotes.append(i, 60003760, 60008494, buy, buy * 1.3, 1_000_000_000.0)
+
+    scored = score_quotes(quotes, FeeProfile("p", 1.0, 2.0), 0.1)
+    full = rank_candidates(scored, 0.0, 0.0)
+    top = rank_candidates(scored, 0.0, 0.0, top_k=15)
+
+    assert len(full) == 200
+    assert [c.ev_isk for c in top] == [c.ev_isk for c in full[:15]]
+    assert all(0.0 <= c.decay_score <= 100.0 for c in top)
+
+
+def test_rank_by_forecast_uses_exit_price() -> None:
+    """Test that forecast ranking prefers the route whose destination is rising."""
+    quotes = QuoteColumns()
+    quotes.append(34, 60003760, 60008494, 100.0, 130.0, 1e9, exit_price=120.0)
+    quotes.append(35, 60003760, 60008494, 100.0, 125.0, 1e9, exit_price=140.0)
+    scored = score_quotes(quotes, FeeProfile("p", 1.0, 2.0), 0.1)
+
+    by_ev = rank_candidates(scored, 0.0, 0.0)
+    by_forecast = rank_candidates(scored, 0.0, 0.0, by_forecast=True)
+
+    assert [c.item_id for c in by_ev] == [34, 35]
+    assert [c.item_id for c in by_forecast] == [35, 34]
+    # (140 x 0.97 - 100 x 1.01) / 100 of 1e8 capital
+    assert by_forecast[0].forecast_ev_isk == pytest.approx(3.48e7)
+    assert by_forecast[0].forecast_sell_price == 140.0
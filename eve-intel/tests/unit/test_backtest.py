@@ -0,0 +1,134 @@
+"""Tests for historical backtests."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.backtest import (
+    BacktestSummary,
+    backtest_window,
+    replay_window,
+    split_windows,
+)
+from eve_intel.analytics.decay import DECAY_GRID_HOURS
+from eve_intel.analytics.fees import default_fee_profile
+
+
+@pytest.mark.asyncio
+async def test_backtest_realises_against_later_snapshot(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test settlement at the first snapshot past the horizon, scored without later decay."""
+    from eve_intel.db.repositories import (
+        DecayBucketRepository,
+        OrderSnapshotRepository,
+        PriceHistoryRepository,
+    )
+    from eve_intel.settings import settings
+
+    t0 = datetime(2025, 1, 15, 0, tzinfo=UTC)
+
+    # 1.5B ISK traded per day at both hubs in the week before
+    await PriceHistoryRepository(db_session).upsert_batch(
+        [
+            {
+                "item_id": 34,
+                "hub_id": hub_id,
+                "date": t0 - timedelta(days=day),
+                "avg_price": 6.0,
+                "volume": 250_000_000,
+            }
+            for hub_id in (60003760, 60008494)
+            for day in range(7)
+        ]
+    )
+
+    def asks(ts: datetime, amarr_ask: float, first_id: int) -> list:
+        return [
+            {
+                "order_id": first_id + k,
+                "item_id": 34,
+                "hub_id": hub_id,
+                "side": "sell",
+                "price": price,
+                "qty": 1000,
+                "ts_snapshot": ts,
+            }
+            for k, (hub_id, price) in enumerate([(60003760, 5.5), (60008494, amarr_ask)])
+        ]
+
+    orders = OrderSnapshotRepository(db_session)
+    await orders.insert_batch(asks(t0, 6.8, 1))
+    # Amarr's ask has collapsed by the first snapshot after the 3h haul; the earlier
+    # and later snapshots must not be used
+    for hours, amarr_ask in ((2, 6.4), (4, 6.0), (6, 7.0)):
+        await orders.insert_batch(asks(t0 + timedelta(hours=hours), amarr_ask, hours * 10))
+
+    # A present-day table fitted from later spreads that would score every route at zero
+    monkeypatch.setattr(settings, "decay_min_samples", 1)
+    await DecayBucketRepository(db_session).replace_all(
+        [
+            {
+                "margin_bucket": m,
+                "liquidity_bucket": lq,
+                "volatility_bucket": v,
+                "samples": 100,
+                "events": 100,
+                "median_hours": 0.5,
+                "survival": [0.0] * len(DECAY_GRID_HOURS),
+            }
+            for m in range(5)
+            for lq in range(4)
+            for v in range(5)
+        ]
+    )
+
+    window = (t0, t0 + timedelta(hours=1))
+    (result,) = [
+        r
+        async for r in replay_window(
+            db_session, *window, timedelta(hours=3), thresholds=(1.0, 0.1, None)
+        )
+    ]
+    assert result.realised_sell_price == 6.0
+    assert result.decay_score > 0.0
+
+    summary = await backtest_window(
+        db_session, *window, timedelta(hours=3), thresholds=(1.0, 0.1, None)
+    )
+
+    assert summary.snapshots == 1
+    assert summary.candidates == 1
+    assert summary.filled == 1
+
+    profile = default_fee_profile()
+    fees = 5.5 * profile.broker_fee_pct / 100 + 6.0 * (
+        (profile.broker_fee_pct + profile.sales_tax_pct) / 100
+    )
+    realised_margin = (6.0 - 5.5 - fees) / 5.5 * 100
+    assert summary.realised_ev_isk == pytest.approx(150_000_000 * realised_margin / 100)
+    assert summary.realised_ev_isk < summary.predicted_ev_isk
+
+
+def test_split_windows_and_merge() -> None:
+    """Test window splitting and summary merging across windows."""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    windows = split_windows(start, start + timedelta(days=10), timedelta(days=7))
+    assert windows == [
+        (start, start + timedelta(days=7)),
+        (start + timedelta(days=7), start + timedelta(days=10)),
+    ]
+
+    total = BacktestSummary()
+    for filled, realised in ((2, 5.0), (1, 10.0)):
+        total.merge(
+            BacktestSummary(
+                candidates=filled,
+                filled=filled,
+                predicted_ev_isk=10.0,
+                realised_ev_isk=realised,
+            )
+        )
+    assert total.candidates == 3
+    assert total.realisation_pct == pytest.approx(75.0)
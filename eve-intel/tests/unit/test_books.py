@@ -0,0 +1,46 @@
+"""Tests for top-of-book arrays."""
+
+import math
+from datetime import UTC, datetime
+
+from eve_intel.analytics.books import build_books
+
+TS = datetime(2025, 1, 15, tzinfo=UTC)
+
+
+def test_build_books_best_prices() -> None:
+    """Test best bid/ask and quantity at the top of the book."""
+    books = build_books(
+        [
+            (34, 60003760, 1, "buy", 5.0, 100, TS),
+            (34, 60003760, 2, "buy", 5.1, 50, TS),
+            (34, 60003760, 3, "sell", 6.0, 10, TS),
+            (34, 60003760, 4, "sell", 6.0, 15, TS),
+            (34, 60003760, 5, "sell", 6.5, 99, TS),
+            (35, 60008494, 6, "buy", 12.0, 7, TS),
+        ]
+    )
+
+    idx = books.index()
+    row = idx[(34, 60003760)]
+    assert books.best_bid[row] == 5.1
+    assert books.bid_qty[row] == 50
+    assert books.best_ask[row] == 6.0
+    assert books.ask_qty[row] == 25
+
+    # Bid-only book has no ask
+    assert math.isinf(books.best_ask[idx[(35, 60008494)]])
+    assert books.snapshot_ts[60003760] == TS
+
+
+def test_book_marker_tracks_changes() -> None:
+    """Test that the marker ignores row order but not order changes."""
+    orders = [
+        (34, 60003760, 1, "buy", 5.0, 100, TS),
+        (34, 60003760, 2, "sell", 6.0, 10, TS),
+    ]
+    same = build_books(list(reversed(orders))).marker[0]
+    assert build_books(orders).marker[0] == same
+
+    filled = [orders[0], (34, 60003760, 2, "sell", 6.0, 4, TS)]
+    assert build_books(filled).marker[0] != same
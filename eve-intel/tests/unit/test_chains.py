@@ -0,0 +1,86 @@
+"""Tests for multi-hop arbitrage chains."""
+
+import random
+from itertools import pairwise, permutations
+from typing import List, Sequence
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.chains import find_chains
+from eve_intel.analytics.latest import LatestRun, latest_run_cache
+from eve_intel.api.routers.arbitrage import get_arbitrage_chains
+
+
+def _leg(item_id: int, from_hub: int, to_hub: int, ev: float) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=from_hub,
+        to_hub_id=to_hub,
+        buy_price=1.0,
+        sell_price=2.0,
+        spread_pct=100.0,
+        fees_total=0.0,
+        liquidity_24h=0.0,
+        ev_isk=ev,
+        net_margin_pct=10.0,
+        decay_score=0.0,
+        capital_required=ev * 10,
+    )
+
+
+def test_find_chains_links_hubs() -> None:
+    """Test that legs are chained through the hub the previous leg sold into."""
+    legs = [_leg(1, 10, 20, 100.0), _leg(2, 20, 30, 50.0), _leg(3, 30, 10, 10.0)]
+
+    chains, stats = find_chains(legs, max_hops=2, top_k=5)
+
+    assert [c.hubs for c in chains] == [[10, 20, 30], [30, 10, 20], [20, 30, 10]]
+    assert chains[0].ev_isk == pytest.approx(150.0)
+    assert chains[0].capital_required == pytest.approx(1000.0)
+    assert stats.explored > 0
+
+
+def _brute_force(legs: Sequence[ArbitrageCandidate], max_hops: int) -> List[float]:
+    best = []
+    for n in range(2, max_hops + 1):
+        for path in permutations(legs, n):
+            hubs = [path[0].from_hub_id] + [p.to_hub_id for p in path]
+            if any(a.to_hub_id != b.from_hub_id for a, b in pairwise(path)):
+                continue
+            if len(set(hubs)) != len(hubs) or len({p.item_id for p in path}) != n:
+                continue
+            best.append(sum(p.ev_isk for p in path))
+    return sorted(best, reverse=True)
+
+
+def test_find_chains_matches_exhaustive_search() -> None:
+    """Test that pruning never drops a chain the exhaustive search would keep."""
+    rng = random.Random(7)  # noqa: S311 - reproducible test data, not security
+    legs = [
+        _leg(rng.randrange(6), a, b, rng.uniform(1, 100))
+        for a in range(5)
+        for b in range(5)
+        if a != b and rng.random() < 0.6
+    ]
+
+    chains, stats = find_chains(legs, max_hops=3, top_k=10, legs_per_hop=10)
+
+    assert [c.ev_isk for c in chains] == pytest.approx(_brute_force(legs, 3)[:10])
+    assert stats.pruned > 0
+
+
+@pytest.mark.asyncio
+async def test_chains_endpoint_uses_latest_run(db_session: AsyncSession) -> None:
+    """Test that GET /chains searches the cached run instead of rerunning the engine."""
+    latest_run_cache.clear()
+    latest_run_cache.publish(LatestRun(3, None, [_leg(1, 10, 20, 100.0), _leg(2, 20, 30, 50.0)]))
+
+    response = await get_arbitrage_chains(
+        max_hops=3, min_ev=None, min_margin=None, limit=5, session=db_session
+    )
+
+    assert response.run_id == 3
+    assert [chain.hubs for chain in response.chains] == [[10, 20, 30]]
+    latest_run_cache.clear()
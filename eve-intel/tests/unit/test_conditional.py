@@ -0,0 +1,48 @@
+"""Tests for conditional GET helpers."""
+
+from typing import List, Tuple
+
+from fastapi import Request, Response
+
+from eve_intel.api.conditional import not_modified, signal_etag
+
+
+def _request(query: str = "", headers: List[Tuple[str, str]] = ()) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/signals/arbitrage",
+            "query_string": query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        }
+    )
+
+
+def test_etag_depends_on_run_and_params_not_order() -> None:
+    """Test that the ETag changes with the run or the query, not parameter order."""
+    etag = signal_etag(7, _request("limit=5&min_ev=1"))
+
+    assert etag == signal_etag(7, _request("min_ev=1&limit=5"))
+    assert etag != signal_etag(8, _request("limit=5&min_ev=1"))
+    assert etag != signal_etag(7, _request("limit=6&min_ev=1"))
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_not_modified_answers_matching_etag() -> None:
+    """Test 304 for a matching If-None-Match and headers on full responses."""
+    etag = signal_etag(3, _request("limit=5"))
+
+    response = Response()
+    assert not_modified(_request("limit=5"), response, 3) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, no-cache"
+
+    unchanged = not_modified(
+        _request("limit=5", [("If-None-Match", f'"other", W/{etag}')]), Response(), 3
+    )
+    assert unchanged is not None
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+    assert not_modified(_request("limit=5", [("If-None-Match", etag)]), Response(), 4) is None
@@ -0,0 +1,173 @@
+"""Tests for the empirical decay model."""
+
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.decay import (
+    DECAY_GRID_HOURS,
+    DecayFitter,
+    DecayTable,
+    bucket_of,
+    fit_decay_table,
+    kaplan_meier,
+)
+
+
+def test_kaplan_meier_with_censoring() -> None:
+    """Test survival steps with a censored observation."""
+    # Ends at 1h and 4h, one spread still open at 2h when history ended
+    curve, median = kaplan_meier(Counter({(1.0, True): 1, (2.0, False): 1, (4.0, True): 1}))
+
+    points = dict(zip(DECAY_GRID_HOURS, curve, strict=True))
+    assert points[1] == pytest.approx(2 / 3, abs=1e-4)
+    assert points[2] == pytest.approx(2 / 3, abs=1e-4)
+    assert points[4] == 0.0
+    assert median == 4.0
+
+
+def test_decay_table_lookup() -> None:
+    """Test bucket lookup and the minimum sample cutoff."""
+    bucket = bucket_of(12.0, 2e9, 1.0)
+    rows = [
+        SimpleNamespace(
+            margin_bucket=bucket[0],
+            liquidity_bucket=bucket[1],
+            volatility_bucket=bucket[2],
+            samples=50,
+            events=40,
+            median_hours=6.0,
+            survival=[0.9, 0.8, 0.6, 0.4, 0.3, 0.2, 0.1, 0.0],
+        ),
+        SimpleNamespace(
+            margin_bucket=0,
+            liquidity_bucket=0,
+            volatility_bucket=0,
+            samples=3,
+            events=3,
+            median_hours=1.0,
+            survival=[0.0] * 8,
+        ),
+    ]
+
+    table = DecayTable.from_rows(rows, horizon_hours=4.0, min_samples=20)
+
+    assert table.lookup(15.0, 5e9, 1.5) == (60.0, 6.0)
+    assert table.lookup(1.0, 1.0, 0.0) is None
+
+
+async def _seed_spread_history(session: AsyncSession, t0: datetime) -> None:
+    """Store four hourly snapshots from ``t0`` of a Jita to Amarr spread that closes once."""
+    from eve_intel.db.repositories import OrderSnapshotRepository, PriceHistoryRepository
+
+    # 1.5B ISK a day traded in the week before the snapshots; nothing is cached yet, so
+    # the fit has to bucket liquidity from the history as of each snapshot
+    await PriceHistoryRepository(session).upsert_batch(
+        [
+            {
+                "item_id": 34,
+                "hub_id": hub_id,
+                "date": t0 - timedelta(days=d),
+                "avg_price": 6.0,
+                "volume": 250_000_000,
+            }
+            for hub_id in (60003760, 60008494)
+            for d in range(7)
+        ]
+    )
+
+    amarr_asks = [6.8, 6.8, 5.6, 6.8]
+    orders = OrderSnapshotRepository(session)
+    for k, amarr_ask in enumerate(amarr_asks):
+        ts = t0 + timedelta(hours=k)
+        await orders.insert_batch(
+            [
+                {
+                    "order_id": k * 10 + n,
+                    "item_id": 34,
+                    "hub_id": hub_id,
+                    "side": "sell",
+                    "price": price,
+                    "qty": 1000,
+                    "ts_snapshot": ts,
+                }
+                for n, (hub_id, price) in enumerate([(60003760, 5.5), (60008494, amarr_ask)])
+            ]
+        )
+
+
+@pytest.mark.asyncio
+async def test_fit_decay_table_feeds_engine(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test fitting spreads from snapshots and reading decay back in the engine."""
+    from eve_intel.db.repositories import SeriesStatsRepository
+
+    t0 = datetime(2025, 1, 15, tzinfo=UTC)
+    await _seed_spread_history(db_session, t0)
+
+    buckets = await fit_decay_table(db_session, t0, t0 + timedelta(days=1))
+    assert buckets == 1
+
+    from eve_intel.db.repositories import DecayBucketRepository
+
+    (row,) = await DecayBucketRepository(db_session).get_all()
+    assert row.liquidity_bucket == 2
+    # One spread lived 2h and closed, the reopened one is censored at 0h
+    assert row.samples == 2
+    assert row.events == 1
+    assert row.median_hours == 2.0
+
+    from eve_intel.settings import settings
+
+    monkeypatch.setattr(settings, "decay_min_samples", 1)
+    await SeriesStatsRepository(db_session).upsert_liquidity(
+        [
+            {"item_id": 34, "hub_id": hub_id, "window_days": 7, "liquidity_isk": 1.5e9}
+            for hub_id in (60003760, 60008494)
+        ]
+    )
+    engine = ArbitrageEngine(db_session)
+    candidates = await engine.find_arbitrage_opportunities(min_ev_isk=1.0, min_margin_pct=0.1)
+
+    assert candidates[0].lifetime_hours == 2.0
+    assert candidates[0].decay_score == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_fitter_reads_each_snapshot_once(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that advancing fits each window as a one-off fit would, walking snapshots once."""
+    t0 = datetime(2025, 1, 15, tzinfo=UTC)
+    await _seed_spread_history(db_session, t0)
+
+    fitter = DecayFitter(db_session, t0 - timedelta(days=30))
+    observed = []
+    observe = fitter._observe
+
+    async def counting(ts: datetime) -> None:
+        observed.append(ts)
+        await observe(ts)
+
+    monkeypatch.setattr(fitter, "_observe", counting)
+
+    # Before the spread closes it is censored at the last snapshot seen
+    await fitter.advance(t0 + timedelta(minutes=90))
+    (row,) = fitter.bucket_rows(t0, t0 + timedelta(minutes=90))
+    assert (row["samples"], row["events"]) == (1, 0)
+
+    await fitter.advance(t0 + timedelta(days=1))
+    (row,) = fitter.bucket_rows(t0, t0 + timedelta(days=1))
+    assert (row["samples"], row["events"], row["median_hours"]) == (2, 1, 2.0)
+    assert len(observed) == 4
+
+    from eve_intel.settings import settings
+
+    monkeypatch.setattr(settings, "decay_min_samples", 1)
+    assert await fitter.table(t0 + timedelta(days=1))
+    assert len(observed) == 4
@@ -0,0 +1,119 @@
+"""Tests for bulk signal export formats."""
+
+import io
+import json
+import sys
+from typing import List, Tuple
+
+import pytest
+from fastapi import HTTPException, Request
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.latest import LatestRun
+from eve_intel.api.export import (
+    ARROW_STREAM,
+    MSGPACK,
+    NDJSON,
+    arrow_stream,
+    concat_columns,
+    export_columns,
+    msgpack_body,
+    ndjson_lines,
+    negotiate_bulk,
+    require_encoder,
+)
+
+
+def _request(accept: str) -> Request:
+    headers: List[Tuple[bytes, bytes]] = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _run() -> LatestRun:
+    candidates = [
+        ArbitrageCandidate(
+            item_id=i,
+            from_hub_id=60003760,
+            to_hub_id=60008494,
+            buy_price=100.0,
+            sell_price=110.0,
+            spread_pct=10.0,
+            fees_total=1.0,
+            liquidity_24h=1e6,
+            ev_isk=1000.0 * i,
+            net_margin_pct=float(i),
+            decay_score=50.0,
+            capital_required=1e5,
+            jumps=9 if i % 2 else None,
+        )
+        for i in range(1, 6)
+    ]
+    return LatestRun(run_id=7, created_at=None, candidates=candidates)
+
+
+def test_negotiate_bulk() -> None:
+    """Test that explicit bulk types win over JSON ranges unless JSON is preferred."""
+    assert negotiate_bulk(_request("")) is None
+    assert negotiate_bulk(_request("*/*")) is None
+    assert negotiate_bulk(_request(f"{ARROW_STREAM}, */*")) == ARROW_STREAM
+    assert negotiate_bulk(_request(f"application/json, {NDJSON};q=0.5")) is None
+    assert negotiate_bulk(_request(f"{NDJSON};q=0.2, {MSGPACK};q=0.9")) == MSGPACK
+    assert negotiate_bulk(_request(f"{MSGPACK};q=0")) is None
+
+
+def test_select_columns_matches_select() -> None:
+    """Test that column selection keeps the same rows as candidate selection."""
+    run = _run()
+    for kwargs in ({}, {"min_ev": 2500.0}, {"min_margin": 3.0, "limit": 2}, {"limit": 1}):
+        columns = run.select_columns(**kwargs)
+        assert list(columns["item_id"]) == [c.item_id for c in run.select(**kwargs)]
+    assert run.select_columns(min_margin=4.0)["jumps"] == [9, None]
+
+
+def test_ndjson_lines_in_batches() -> None:
+    """Test that NDJSON rows use API field names and are chunked."""
+    columns = export_columns(_run().select_columns())
+    chunks = list(ndjson_lines(columns, batch_rows=2))
+    assert len(chunks) == 3
+
+    rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [r["item_id"] for r in rows] == [5, 4, 3, 2, 1]
+    assert rows[0]["from_hub"] == 60003760
+    assert rows[0]["daily_liquidity"] == 1e6
+    assert rows[1]["jumps"] is None
+
+
+def test_arrow_stream_round_trip() -> None:
+    """Test that the IPC stream reads back with types, nulls and run metadata."""
+    pa = pytest.importorskip("pyarrow")
+    columns = concat_columns(
+        [("default", _run().select_columns()), ("alpha", _run().select_columns(limit=2))]
+    )
+    body = b"".join(arrow_stream(pa, export_columns(columns), {"run_id": "7"}, batch_rows=3))
+
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    assert table.num_rows == 7
+    assert table.schema.metadata[b"run_id"] == b"7"
+    assert table.column("profile").to_pylist()[-2:] == ["alpha", "alpha"]
+    assert table.schema.field("item_id").type == pa.int64()
+    assert table.schema.field("jumps").type == pa.int64()
+    assert table.column("jumps").null_count == 3
+
+
+def test_msgpack_body_is_columnar() -> None:
+    """Test that msgpack carries run metadata and one list per column."""
+    msgpack = pytest.importorskip("msgpack")
+    columns = export_columns(_run().select_columns(limit=2))
+    data = msgpack.unpackb(msgpack_body(msgpack, columns, {"run_id": 7}))
+    assert data["run_id"] == 7
+    assert data["count"] == 2
+    assert data["columns"]["item_id"] == [5, 4]
+
+
+def test_missing_encoder_is_not_acceptable(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a bulk format without its optional package answers 406."""
+    monkeypatch.setitem(sys.modules, "msgpack", None)
+    with pytest.raises(HTTPException) as excinfo:
+        require_encoder(MSGPACK)
+    assert excinfo.value.status_code == 406
+    assert require_encoder(NDJSON) is None
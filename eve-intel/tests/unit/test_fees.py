@@ -3,12 +3,15 @@
 import pytest
 
 from eve_intel.analytics.fees import (
+    FeeProfile,
     calculate_broker_fee,
     calculate_net_margin_pct,
     calculate_net_profit,
     calculate_sales_tax,
     calculate_spread_pct,
     calculate_total_fees,
+    parse_fee_profile,
+    parse_fee_profiles,
 )
 
 
@@ -63,3 +66,22 @@ def test_zero_buy_price_edge_case() -> None:
     """Test edge case with zero buy price."""
     assert calculate_net_margin_pct(0.0, 100.0) == 0.0
     assert calculate_spread_pct(0.0, 100.0) == 0.0
+
+
+def test_parse_fee_profile() -> None:
+    """Test fee profile spec parsing."""
+    profile = parse_fee_profile("alt:1.5:3.6")
+    assert profile == FeeProfile(name="alt", broker_fee_pct=1.5, sales_tax_pct=3.6)
+
+    with pytest.raises(ValueError, match="expected name:broker_pct:tax_pct"):
+        parse_fee_profile("alt:1.5")
+    with pytest.raises(ValueError, match="Invalid fee rates"):
+        parse_fee_profile("alt:x:3.6")
+    with pytest.raises(ValueError, match="must be non-negative"):
+        parse_fee_profile("alt:-1:3.6")
+
+
+def test_parse_fee_profiles_rejects_duplicates() -> None:
+    """Test that duplicate profile names are rejected."""
+    with pytest.raises(ValueError, match="must be unique"):
+        parse_fee_profiles(["main:3:8", "main:1:4"])
@@ -0,0 +1,199 @@
+"""Tests for asynchronous analysis jobs."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict
+
+import pytest
+
+from eve_intel.analytics import jobs, latest
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.jobs import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobManager,
+    JobQueueFullError,
+)
+from eve_intel.api.routers.jobs import job_response
+from eve_intel.datasources.broker import LocalBroker
+from eve_intel.datasources.cache import InMemoryCache
+
+
+class GatedRunner:
+    """Runner whose jobs block until released, counting concurrent runs."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.running = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def __call__(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+            if params.get("fail"):
+                msg = "analysis failed"
+                raise RuntimeError(msg)
+            return {"run_id": None, "candidates": []}
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_identical_params_share_inflight_job() -> None:
+    """Test that resubmitting in-flight parameters joins the existing job."""
+    runner = GatedRunner()
+    manager = JobManager(runner, max_workers=1, max_queued=4)
+
+    first, created = await manager.submit({"min_ev": 1.0, "min_margin": 2.0})
+    again, created_again = await manager.submit({"min_margin": 2.0, "min_ev": 1.0})
+    assert created and not created_again
+    assert again is first
+
+    runner.release.set()
+    await manager.join()
+    assert runner.calls == 1
+    assert (await manager.get(first.job_id))["status"] == JOB_SUCCEEDED
+
+    # Once finished, the same parameters start a new job
+    second, created = await manager.submit({"min_ev": 1.0, "min_margin": 2.0})
+    assert created and second.job_id != first.job_id
+    await manager.join()
+
+
+@pytest.mark.asyncio
+async def test_bounded_workers_and_queue() -> None:
+    """Test that jobs beyond the workers queue, and beyond the queue are rejected."""
+    runner = GatedRunner()
+    manager = JobManager(runner, max_workers=2, max_queued=1)
+
+    jobs = [(await manager.submit({"n": n}))[0] for n in range(3)]
+    with pytest.raises(JobQueueFullError):
+        await manager.submit({"n": 3})
+
+    await asyncio.sleep(0)
+    assert [job.status for job in jobs] == [JOB_RUNNING, JOB_RUNNING, JOB_QUEUED]
+
+    runner.release.set()
+    await manager.join()
+    assert runner.peak == 2
+    assert all(job.status == JOB_SUCCEEDED for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_failure_recorded_and_shared() -> None:
+    """Test that failures are recorded and other processes read records from the store."""
+    runner = GatedRunner()
+    store = InMemoryCache()
+    manager = JobManager(runner, store=store)
+    job, _ = await manager.submit({"fail": True})
+
+    runner.release.set()
+    await manager.join()
+
+    other = JobManager(runner, store=store)
+    record = await other.get(job.job_id)
+    assert record["status"] == JOB_FAILED
+    assert record["error"] == "analysis failed"
+    assert await other.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire() -> None:
+    """Test that finished jobs are forgotten after the TTL."""
+    runner = GatedRunner()
+    runner.release.set()
+    manager = JobManager(runner, ttl_seconds=1)
+    job, _ = await manager.submit({"n": 1})
+    await manager.join()
+
+    manager._jobs[job.job_id] = (job, float("-inf"))
+    await manager.submit({"n": 2})
+    assert await manager.get(job.job_id) is None
+    await manager.join()
+
+    # With nothing submitted after it, the last job is still forgotten once its TTL passes
+    last = next(iter(manager._jobs))
+    await asyncio.sleep(1.1)
+    assert await manager.get(last) is None
+
+
+def test_job_response_converts_result() -> None:
+    """Test that a succeeded record is served with its signals."""
+    candidate = ArbitrageCandidate(
+        item_id=34,
+        from_hub_id=60003760,
+        to_hub_id=60008494,
+        buy_price=5.0,
+        sell_price=6.0,
+        spread_pct=20.0,
+        fees_total=0.3,
+        liquidity_24h=1e9,
+        ev_isk=1e6,
+        net_margin_pct=14.0,
+        decay_score=50.0,
+        capital_required=5e6,
+    )
+    response = job_response(
+        {
+            "job_id": "abc",
+            "status": JOB_SUCCEEDED,
+            "params": {},
+            "created_at": "2025-03-01T00:00:00+00:00",
+            "result": {
+                "run_id": 7,
+                "candidates": [asdict(candidate)],
+                "scenarios": [
+                    {
+                        "profile": "alt",
+                        "broker_fee_pct": 1.0,
+                        "sales_tax_pct": 2.0,
+                        "candidates": [asdict(candidate), asdict(candidate)],
+                    }
+                ],
+            },
+        }
+    )
+    assert response.run_id == 7
+    assert response.count == 1
+    assert response.signals[0].from_hub == 60003760
+    (scenario,) = response.scenarios
+    assert scenario.profile == "alt" and scenario.count == 2
+
+
+@pytest.mark.asyncio
+async def test_runs_saved_in_workers_publish_from_this_process(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a worker's saved run reaches stream clients subscribed here."""
+    diff = {
+        "type": "diff",
+        "run_id": 5,
+        "base_run_id": 4,
+        "added": [],
+        "removed": [],
+        "changed": [],
+    }
+    monkeypatch.setattr(
+        jobs, "run_analysis_process", lambda _params: {"run_id": 5, "candidates": [], "diff": diff}
+    )
+    broker = LocalBroker(buffer_size=4)
+    monkeypatch.setattr(latest, "get_broker", lambda: broker)
+    subscription = broker.subscribe()
+
+    manager = JobManager()
+    # Threads stand in for the process pool, which would import the real runner
+    manager._executor = ThreadPoolExecutor(max_workers=1)
+    job, _ = await manager.submit({"save_results": True})
+    await manager.join()
+    await broker.drain()
+
+    assert job.result == {"run_id": 5, "candidates": []}
+    assert await subscription.get(timeout=1.0) == diff
+    await manager.close()
@@ -0,0 +1,129 @@
+"""Tests for the latest-run cache served by read endpoints."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate, ArbitrageEngine
+from eve_intel.analytics.decay import DecayTable
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.latest import LatestRun, LatestRunCache, latest_run_cache
+
+
+def _candidate(item_id: int, ev: float, margin: float) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=60003760,
+        to_hub_id=60008494,
+        buy_price=100.0,
+        sell_price=100.0 * (1 + margin / 100.0),
+        spread_pct=margin,
+        fees_total=0.0,
+        liquidity_24h=1e9,
+        ev_isk=ev,
+        net_margin_pct=margin,
+        decay_score=50.0,
+        capital_required=1e8,
+        jumps=9,
+    )
+
+
+def test_select_filters_in_memory() -> None:
+    """Test EV prefix cut, margin filter and limit over the ranked run."""
+    run = LatestRun(
+        1,
+        None,
+        [_candidate(1, 5e8, 6.0), _candidate(2, 9e8, 3.0), _candidate(3, 2e8, 12.0)],
+    )
+
+    assert [c.item_id for c in run.select()] == [2, 1, 3]
+    assert [c.item_id for c in run.select(min_ev=5e8)] == [2, 1]
+    assert [c.item_id for c in run.select(min_margin=5.0)] == [1, 3]
+    assert [c.item_id for c in run.select(min_margin=5.0, limit=1)] == [1]
+
+
+def test_rescore_under_other_fees() -> None:
+    """Test that scenario profiles re-price cached candidates and keep jumps."""
+    run = LatestRun(1, None, [_candidate(1, 5e8, 30.0)])
+
+    (c,) = run.rescore(FeeProfile(name="alt", broker_fee_pct=1.0, sales_tax_pct=2.0))
+
+    # (130 - 100 - 1 - 3.9) / 100 on liquidity x capture ratio
+    assert c.net_margin_pct == pytest.approx(25.1)
+    assert c.ev_isk == pytest.approx(1e8 * 0.251)
+    assert c.jumps == 9
+    assert c.ev_per_jump == pytest.approx(c.ev_isk / 9)
+
+
+def test_rescore_scores_like_the_engine_once_per_profile() -> None:
+    """Test that rescoring uses the run's volatility and decay table and is kept per profile."""
+    # Bucket of a 25.1 % margin on 1e9 ISK/day at 12 % volatility
+    decay = DecayTable({(3, 2, 3): (77.0, 5.0)})
+    run = LatestRun(
+        1, None, [_candidate(1, 5e8, 30.0)], volatility={(1, 60008494): 12.0}, decay=decay
+    )
+    profile = FeeProfile(name="alt", broker_fee_pct=1.0, sales_tax_pct=2.0)
+
+    (c,) = run.rescore(profile)
+    assert c.decay_score == 77.0 and c.lifetime_hours == 5.0
+
+    # Same fees under another name reuse the scored columns
+    scored = run._rescored[(1.0, 2.0)]
+    (again,) = run.rescore(FeeProfile(name="same", broker_fee_pct=1.0, sales_tax_pct=2.0))
+    assert run._rescored == {(1.0, 2.0): scored}
+    assert again.ev_isk == c.ev_isk
+
+    # Without the run's volatility the spread falls in an unfitted bucket
+    (heuristic,) = LatestRun(1, None, [_candidate(1, 5e8, 30.0)], decay=decay).rescore(profile)
+    assert heuristic.lifetime_hours is None
+
+
+@pytest.mark.asyncio
+async def test_cache_published_on_commit(db_session: AsyncSession) -> None:
+    """Test that a saved run reaches the cache only once its transaction commits."""
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+    candidates = await engine.find_arbitrage_opportunities(min_ev_isk=1.0, min_margin_pct=0.1)
+    run_id = await engine.save_run_results(candidates)
+
+    assert latest_run_cache._run is None
+    await db_session.commit()
+
+    run = await latest_run_cache.get(db_session)
+    assert run is not None and run.run_id == run_id
+    assert len(run.candidates) == len(candidates)
+    latest_run_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_run_is_never_published(db_session: AsyncSession) -> None:
+    """Test that a later commit on the session does not publish a rolled-back run."""
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+    candidates = await engine.find_arbitrage_opportunities(min_ev_isk=1.0, min_margin_pct=0.1)
+    await engine.save_run_results(candidates)
+    await db_session.rollback()
+
+    await db_session.commit()
+    assert latest_run_cache._run is None
+
+
+@pytest.mark.asyncio
+async def test_cache_revalidates_from_database(db_session: AsyncSession) -> None:
+    """Test that runs saved elsewhere are loaded once the check interval passes."""
+    cache = LatestRunCache(check_seconds=0.0)
+    assert await cache.get(db_session) is None
+
+    engine = ArbitrageEngine(db_session)
+    candidates = await engine.find_arbitrage_opportunities(min_ev_isk=1.0, min_margin_pct=0.1)
+    run_id = await engine.save_run_results(candidates)
+
+    run = await cache.get(db_session)
+    assert run is not None and run.run_id == run_id
+    assert [c.ev_isk for c in run.candidates] == sorted(
+        (c.ev_isk for c in candidates), reverse=True
+    )
+
+    # Within the interval the cached run is served without a database check
+    cache.check_seconds = 3600.0
+    await engine.save_run_results(candidates)
+    assert (await cache.get(db_session)).run_id == run_id
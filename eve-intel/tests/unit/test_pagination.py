@@ -0,0 +1,87 @@
+"""Tests for keyset pagination of stored runs."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.api.pagination import decode_cursor, encode_cursor
+from eve_intel.db.repositories import ArbitrageItemRepository, ArbitrageRunRepository
+
+
+def _item(run_id: int, item_id: int, ev: float, from_hub: int = 1, to_hub: int = 2) -> dict:
+    return {
+        "run_id": run_id,
+        "item_id": item_id,
+        "from_hub_id": from_hub,
+        "to_hub_id": to_hub,
+        "buy_price": 100.0,
+        "sell_price": 120.0,
+        "spread_pct": 20.0,
+        "fees_total": 5.0,
+        "liquidity_24h": 1e6,
+        "ev_isk": ev,
+        "net_margin_pct": float(item_id),
+        "decay_score": 10.0 * item_id,
+        "capital_required": 1e5,
+    }
+
+
+def test_cursor_round_trip() -> None:
+    """Test that cursors encode the key exactly and reject tampering."""
+    key = (1234.5678901234, 42)
+    assert decode_cursor(encode_cursor(key)) == key
+    assert encode_cursor(None) is None
+
+    for bad in ("not-base64!", encode_cursor((1.0, 2))[:-2], "WzEsIjIiXQ"):
+        with pytest.raises(ValueError, match="Malformed cursor"):
+            decode_cursor(bad)
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_run_once_with_ties(db_session: AsyncSession) -> None:
+    """Test that pages follow EV order, break ties by ID and never repeat a row."""
+    run_id = await ArbitrageRunRepository(db_session).create_run()
+    evs = [500.0, 300.0, 300.0, 300.0, 200.0, 100.0, 100.0]
+    await ArbitrageItemRepository(db_session).insert_batch(
+        [_item(run_id, i + 1, ev) for i, ev in enumerate(evs)]
+    )
+    engine = ArbitrageEngine(db_session)
+
+    seen, after, pages = [], None, 0
+    while True:
+        page, after = await engine.load_run_page(run_id, 3, after)
+        seen.extend((c.ev_isk, c.item_id) for c in page)
+        pages += 1
+        if after is None:
+            break
+
+    assert pages == 3
+    assert [ev for ev, _ in seen] == sorted(evs, reverse=True)
+    assert len({item_id for _, item_id in seen}) == len(evs)
+
+
+@pytest.mark.asyncio
+async def test_page_filters_in_database(db_session: AsyncSession) -> None:
+    """Test item, hub, EV, margin and decay filters."""
+    run_id = await ArbitrageRunRepository(db_session).create_run()
+    other_run = await ArbitrageRunRepository(db_session).create_run()
+    await ArbitrageItemRepository(db_session).insert_batch(
+        [
+            _item(run_id, 1, 900.0),
+            _item(run_id, 2, 800.0, to_hub=3),
+            _item(run_id, 3, 700.0, from_hub=3),
+            _item(run_id, 4, 50.0),
+            _item(other_run, 5, 1000.0),
+        ]
+    )
+    repo = ArbitrageItemRepository(db_session)
+
+    async def ids(**filters: float) -> list:
+        return [row.item_id for row in await repo.get_page(run_id, 10, **filters)]
+
+    assert await ids() == [1, 2, 3, 4]
+    assert await ids(item_id=2) == [2]
+    assert await ids(from_hub_id=1, to_hub_id=2) == [1, 4]
+    assert await ids(min_ev=100.0) == [1, 2, 3]
+    assert await ids(min_margin=2.0, min_decay=30.0) == [3, 4]
+    assert await ids(min_ev=100.0, after=(800.0, 10**9)) == [2, 3]
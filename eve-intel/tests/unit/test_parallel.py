@@ -0,0 +1,88 @@
+"""Tests for process-pool sharded scoring."""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from eve_intel.analytics.arbitrage import quotes_from_books, rank_candidates, score_quotes
+from eve_intel.analytics.books import MarketBooks, build_books
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.parallel import (
+    attach_books,
+    get_pool,
+    score_books_parallel,
+    score_shard,
+    share_books,
+    shutdown_pool,
+)
+
+TS = datetime(2025, 1, 15, tzinfo=UTC)
+HUBS = [60003760, 60008494, 60011866]
+
+
+def _books() -> MarketBooks:
+    orders = []
+    order_id = 0
+    for item_id in range(30, 60):
+        for h, hub_id in enumerate(HUBS):
+            order_id += 1
+            price = 100.0 + item_id + 7.5 * h * (1 if item_id % 2 else -1)
+            orders.append((item_id, hub_id, order_id, "sell", price, 10, TS))
+    return build_books(orders)
+
+
+def test_shared_books_round_trip() -> None:
+    """Test that shared memory views match the source columns."""
+    books = _books()
+    shm = share_books(books)
+    try:
+        view = attach_books(shm, len(books))
+        assert list(view.item_id) == list(books.item_id)
+        assert list(view.best_ask) == list(books.best_ask)
+        del view
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@pytest.mark.asyncio
+async def test_parallel_matches_serial() -> None:
+    """Test that sharded scoring returns the serial top-K and reports efficiency."""
+    books = _books()
+    profile = FeeProfile(name="p", broker_fee_pct=1.0, sales_tax_pct=2.0)
+
+    serial = rank_candidates(score_quotes(quotes_from_books(books), profile, 0.1), 1.0, 0.1, 10)
+    results, meta = await score_books_parallel(
+        books, [profile], workers=2, capture_ratio=0.1, thresholds=(1.0, 0.1, 0.0), top_k=10
+    )
+
+    assert [c.ev_isk for c in results["p"]] == pytest.approx([c.ev_isk for c in serial])
+    assert meta["workers"] == 2
+    assert len(meta["shard_seconds"]) == 2
+    assert "efficiency_per_core" in meta
+
+
+@pytest.mark.asyncio
+async def test_pool_reused_across_runs() -> None:
+    """Test that runs share one set of worker processes."""
+    books = _books()
+    profile = FeeProfile(name="p", broker_fee_pct=1.0, sales_tax_pct=2.0)
+    try:
+        await score_books_parallel(books, [profile], 2, 0.1, (1.0, 0.1, 0.0), top_k=5)
+        pool = get_pool(2)
+        await score_books_parallel(books, [profile], 2, 0.1, (1.0, 0.1, 0.0), top_k=5)
+        assert get_pool(2) is pool
+    finally:
+        shutdown_pool()
+
+
+def test_shard_error_not_masked_by_shared_memory() -> None:
+    """Test that a failing shard raises its own error, with views released before close."""
+    books = _books()
+    shm = share_books(books)
+    try:
+        with pytest.raises(AttributeError):
+            score_shard(shm.name, len(books), 0, 1, [None], 0.1, (1.0, 0.1, 0.0), None, None)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,85 @@
+"""Tests for the trade plan optimizer."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.latest import LatestRun, latest_run_cache
+from eve_intel.analytics.planner import optimize_trade_plans
+from eve_intel.api.routers.arbitrage import get_trade_plan
+from eve_intel.db.repositories import ItemRepository
+
+
+def _candidate(item_id: int, buy: float, sell: float, to_hub: int = 2) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=1,
+        to_hub_id=to_hub,
+        buy_price=buy,
+        sell_price=sell,
+        spread_pct=0.0,
+        fees_total=0.0,
+        liquidity_24h=0.0,
+        ev_isk=0.0,
+        net_margin_pct=0.0,
+        decay_score=0.0,
+        capital_required=buy * 1000,
+    )
+
+
+def test_plan_respects_cargo_and_capital() -> None:
+    """Test that plans stay within both constraints and prefer dense profit."""
+    candidates = [
+        _candidate(1, 100.0, 150.0),  # bulky, 50 ISK per 10 m3
+        _candidate(2, 1000.0, 1100.0),  # compact, 100 ISK per 1 m3
+        _candidate(3, 10.0, 12.0),
+    ]
+    volumes = {1: 10.0, 2: 1.0, 3: 0.5}
+
+    plans = optimize_trade_plans(candidates, volumes, cargo_m3=500.0, capital_isk=200_000.0)
+
+    assert len(plans) == 1
+    plan = plans[0]
+    assert plan.total_volume_m3 <= 500.0
+    assert plan.total_capital_isk <= 200_000.0
+    by_item = {line.item_id: line for line in plan.lines}
+    assert by_item[2].quantity == 200
+    assert plan.expected_profit_isk == pytest.approx(sum(x.expected_profit_isk for x in plan.lines))
+
+
+def test_plan_per_route_and_filters() -> None:
+    """Test route grouping, hub filters and unknown volumes."""
+    candidates = [_candidate(1, 100.0, 150.0, to_hub=2), _candidate(2, 100.0, 150.0, to_hub=3)]
+
+    plans = optimize_trade_plans(candidates, {1: 1.0, 2: 1.0}, 100.0, 1e9)
+    assert {(p.from_hub_id, p.to_hub_id) for p in plans} == {(1, 2), (1, 3)}
+
+    plans = optimize_trade_plans(candidates, {1: 1.0, 2: 1.0}, 100.0, 1e9, to_hub_id=3)
+    assert [p.to_hub_id for p in plans] == [3]
+
+    assert optimize_trade_plans(candidates, {}, 100.0, 1e9) == []
+
+
+@pytest.mark.asyncio
+async def test_plan_endpoint_uses_latest_run(db_session: AsyncSession) -> None:
+    """Test that GET /plan plans over the cached run instead of rerunning the engine."""
+    await ItemRepository(db_session).upsert_batch(
+        [{"item_id": 1, "name": "Bulky", "volume_m3": 10.0}]
+    )
+    latest_run_cache.clear()
+    latest_run_cache.publish(LatestRun(7, None, [_candidate(1, 100.0, 150.0)]))
+
+    response = await get_trade_plan(
+        cargo_m3=500.0,
+        capital_isk=1e6,
+        from_hub=None,
+        to_hub=None,
+        min_ev=None,
+        min_margin=None,
+        max_routes=5,
+        session=db_session,
+    )
+
+    assert response.run_id == 7
+    assert [line.item_id for line in response.plans[0].lines] == [1]
+    latest_run_cache.clear()
@@ -0,0 +1,187 @@
+"""Tests for bounds-based pair pruning."""
+
+import math
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine, quotes_from_books
+from eve_intel.analytics.books import MarketBooks, build_books
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.pruning import PairPruner
+
+TS = datetime(2025, 1, 15, tzinfo=UTC)
+JITA, AMARR, DODIXIE = 60003760, 60008494, 60011866
+
+
+def _books(asks: dict, bands: dict) -> MarketBooks:
+    books = build_books(
+        [
+            (item_id, hub_id, n, "sell", price, 1000, TS)
+            for n, ((item_id, hub_id), price) in enumerate(sorted(asks.items()))
+        ]
+    )
+    for i in range(len(books)):
+        key = (books.item_id[i], books.hub_id[i])
+        if key in bands:
+            books.price_low[i], books.price_high[i] = bands[key]
+    return books
+
+
+def test_margin_bound_matches_fee_math() -> None:
+    """Test the bound against the net margin of buying low and selling high."""
+    pruner = PairPruner(broker=0.01, sell_rate=0.03, min_margin_pct=5.0)
+
+    # (110 - 100 - 1 - 3.3) / 100
+    assert pruner.margin_bound(100.0, 110.0) == pytest.approx(5.7)
+    assert math.isinf(pruner.margin_bound(0.0, 110.0))
+    assert math.isinf(pruner.margin_bound(100.0, math.inf))
+    # Current asks outside the band widen it
+    assert pruner.margin_bound(100.0, 110.0, sell_ask=120.0) == pytest.approx(15.4)
+    assert pruner.margin_bound(100.0, 110.0, buy_ask=105.0) == pytest.approx(5.7)
+
+
+def test_from_profiles_uses_cheapest_fees() -> None:
+    """Test that the pruner never prunes a pair any profile could pass."""
+    pruner = PairPruner.from_profiles(
+        [
+            FeeProfile(name="a", broker_fee_pct=3.0, sales_tax_pct=2.0),
+            FeeProfile(name="b", broker_fee_pct=1.0, sales_tax_pct=8.0),
+        ],
+        min_margin_pct=5.0,
+        slack_pct=0.0,
+    )
+
+    assert pruner.broker == pytest.approx(0.01)
+    assert pruner.sell_rate == pytest.approx(0.03)
+
+
+def test_quotes_skip_hopeless_items_and_pairs() -> None:
+    """Test that pruned pairs produce no quotes and are counted."""
+    books = _books(
+        {
+            # Tight historical band everywhere, no pair can reach 5%
+            (34, JITA): 5.0,
+            (34, AMARR): 5.05,
+            # Cheap at Jita, dear at Dodixie; Amarr never trades higher than Jita
+            (35, JITA): 10.0,
+            (35, AMARR): 10.1,
+            (35, DODIXIE): 12.0,
+            # No history at one hub, never pruned
+            (36, JITA): 20.0,
+            (36, AMARR): 20.2,
+        },
+        {
+            (34, JITA): (4.9, 5.1),
+            (34, AMARR): (4.95, 5.1),
+            (35, JITA): (9.8, 10.2),
+            (35, AMARR): (9.9, 10.2),
+            (35, DODIXIE): (11.5, 12.5),
+            (36, JITA): (19.5, 20.5),
+        },
+    )
+    pruner = PairPruner(broker=0.01, sell_rate=0.03, min_margin_pct=5.0)
+
+    quotes = quotes_from_books(books, pruner=pruner)
+    routes = set(zip(quotes.item_id, quotes.from_hub_id, quotes.to_hub_id, strict=True))
+
+    assert routes == {(35, JITA, DODIXIE), (35, AMARR, DODIXIE), (36, JITA, AMARR)}
+    assert pruner.stats.pairs == 2 + 6 + 2
+    assert pruner.stats.items_pruned == 1
+    # Item 34 as a whole, then Jita -> Amarr of item 35
+    assert pruner.stats.pruned == 3
+    assert pruner.stats.as_meta()["ratio"] == pytest.approx(0.3)
+
+    # Without pruning the same books quote every upward pair
+    assert len(quotes_from_books(books)) == 5
+
+
+def test_breakouts_from_band_are_not_pruned() -> None:
+    """Test that current asks outside the historical band keep their routes."""
+    books = _books(
+        {
+            # Amarr's ask broke out above its band
+            (37, JITA): 10.0,
+            (37, AMARR): 12.0,
+            # Jita's ask fell through the floor of its band
+            (38, JITA): 8.0,
+            (38, AMARR): 9.0,
+        },
+        {
+            (37, JITA): (9.8, 10.2),
+            (37, AMARR): (9.9, 10.2),
+            (38, JITA): (9.8, 10.2),
+            (38, AMARR): (9.9, 10.2),
+        },
+    )
+    pruner = PairPruner(broker=0.01, sell_rate=0.03, min_margin_pct=5.0)
+
+    quotes = quotes_from_books(books, pruner=pruner)
+
+    assert set(zip(quotes.item_id, quotes.from_hub_id, quotes.to_hub_id, strict=True)) == {
+        (37, JITA, AMARR),
+        (38, JITA, AMARR),
+    }
+    assert pruner.stats.pruned == 0
+
+
+@pytest.mark.asyncio
+async def test_engine_reports_pruning_ratio(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the engine prunes with cached bands and records the ratio."""
+    from eve_intel.db.repositories import OrderSnapshotRepository, SeriesStatsRepository
+    from eve_intel.settings import settings
+
+    monkeypatch.setattr(settings, "prune_band_slack_pct", 0.0)
+
+    asks = [(1, 34, JITA, 5.0), (2, 34, AMARR, 5.05), (3, 35, JITA, 10.0), (4, 35, AMARR, 12.0)]
+    await OrderSnapshotRepository(db_session).insert_batch(
+        [
+            {
+                "order_id": order_id,
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "side": "sell",
+                "price": price,
+                "qty": 1000,
+                "ts_snapshot": TS,
+            }
+            for order_id, item_id, hub_id, price in asks
+        ]
+    )
+    stats = SeriesStatsRepository(db_session)
+    await stats.upsert_liquidity(
+        [
+            {"item_id": item_id, "hub_id": hub_id, "window_days": 7, "liquidity_isk": 1.5e9}
+            for _, item_id, hub_id, _ in asks
+        ]
+    )
+    await stats.upsert_bands(
+        [
+            {
+                "item_id": 34,
+                "hub_id": hub_id,
+                "window_days": 30,
+                "price_low": low,
+                "price_high": 5.1,
+            }
+            for hub_id, low in [(JITA, 4.9), (AMARR, 5.0)]
+        ]
+    )
+
+    engine = ArbitrageEngine(db_session, workers=1)
+    candidates = await engine.find_arbitrage_opportunities(
+        min_ev_isk=1.0,
+        min_margin_pct=5.0,
+        fee_profile=FeeProfile(name="p", broker_fee_pct=1.0, sales_tax_pct=2.0),
+    )
+
+    assert [c.item_id for c in candidates] == [35]
+    assert engine.run_meta["pair_pruning"] == {
+        "pairs": 4,
+        "pruned": 2,
+        "items_pruned": 1,
+        "ratio": 0.5,
+    }
@@ -0,0 +1,39 @@
+"""Tests for the order quality filter."""
+
+from datetime import UTC, datetime
+
+from eve_intel.analytics.books import build_books
+from eve_intel.analytics.quality import filter_orders, reference_prices
+
+
+def test_filter_drops_bait_orders() -> None:
+    """Test that far-from-market and tiny orders never reach the books."""
+    ts = datetime(2025, 1, 15, tzinfo=UTC)
+    orders = [
+        (34, 1, 1, "buy", 99.0, 1000, ts),
+        (34, 1, 2, "sell", 101.0, 1000, ts),
+        (34, 1, 3, "buy", 0.01, 1, ts),  # bait buy
+        (34, 1, 4, "sell", 1e12, 1, ts),  # bait sell
+        (34, 1, 5, "sell", 100.5, 1, ts),  # in band, tiny notional
+        # No history: the book's own median is the reference
+        (35, 2, 6, "sell", 10.0, 500, ts),
+        (35, 2, 7, "sell", 11.0, 500, ts),
+        (35, 2, 8, "buy", 9.0, 500, ts),
+        (35, 2, 9, "sell", 500.0, 500, ts),
+    ]
+    references = reference_prices([(34, 1, 100.0), (34, 1, 101.0), (34, 1, 99.0)])
+
+    kept, report = filter_orders(
+        orders, references, band_mad=10.0, band_min_pct=50.0, min_notional=1_000.0
+    )
+
+    assert sorted(row[2] for row in kept) == [1, 2, 6, 7, 8]
+    assert report.kept == 5
+    assert report.outside_band == 3
+    assert report.below_notional == 1
+    assert report.by_hub[2] == {"kept": 3, "outside_band": 1, "below_notional": 0}
+
+    books = build_books(kept)
+    index = books.index()
+    assert books.best_bid[index[(34, 1)]] == 99.0
+    assert books.best_ask[index[(34, 1)]] == 101.0
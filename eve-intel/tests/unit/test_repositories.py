@@ -1,9 +1,22 @@
 """Tests for database repositories."""
 
+from datetime import UTC, datetime
+from typing import Any, List, Sequence
+
 import pytest
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from eve_intel.db.repositories import ItemRepository, MarketRepository
+from eve_intel.db.repositories import (
+    BookMarkerRepository,
+    ItemRepository,
+    MarketRepository,
+    SeriesForecastRepository,
+    SeriesStatsRepository,
+)
+
+# asyncpg's limit on bind parameters per statement
+MAX_BIND_PARAMS = 32767
 
 
 @pytest.mark.asyncio
@@ -39,3 +52,95 @@ async def test_empty_batch_upsert(db_session: AsyncSession) -> None:
     repo = ItemRepository(db_session)
     await repo.upsert_batch([])
     # Should not raise any error
+
+
+def _statement_params(session: AsyncSession) -> List[int]:
+    """Record the bind parameter count of every statement the session executes."""
+    counts: List[int] = []
+
+    def record(_conn: Any, _cursor: Any, _statement: str, parameters: Sequence, *_: Any) -> None:
+        counts.append(len(parameters))
+
+    event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+    return counts
+
+
+@pytest.mark.asyncio
+async def test_marker_upsert_split_under_parameter_cap(db_session: AsyncSession) -> None:
+    """Test that a market's worth of book markers is written in statements asyncpg accepts."""
+    repo = BookMarkerRepository(db_session)
+    markers = [
+        {"item_id": i, "hub_id": 60003760, "book_hash": "a", "run_id": 1, "params_key": "k"}
+        for i in range(7500)
+    ]
+    counts = _statement_params(db_session)
+
+    await repo.upsert_batch(markers)
+    await repo.upsert_batch([{**m, "run_id": 2} for m in markers])
+
+    assert len(counts) > 2
+    assert max(counts) <= MAX_BIND_PARAMS
+    stored = await repo.get_all()
+    assert len(stored) == 7500
+    assert {m.run_id for m in stored} == {2}
+
+
+@pytest.mark.asyncio
+async def test_series_upserts_split_under_parameter_cap(db_session: AsyncSession) -> None:
+    """Test that per-series refreshes over a whole market fit asyncpg's parameter cap."""
+    day = datetime(2025, 4, 1, tzinfo=UTC)
+    series = [(i, 60003760) for i in range(5000)]
+    stats = SeriesStatsRepository(db_session)
+    counts = _statement_params(db_session)
+
+    await stats.upsert_batch(
+        [
+            {
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "window_days": 30,
+                "count": 1,
+                "mean": 0.0,
+                "m2": 0.0,
+                "last_date": day,
+            }
+            for item_id, hub_id in series
+        ]
+    )
+    await stats.upsert_liquidity(
+        [
+            {"item_id": item_id, "hub_id": hub_id, "window_days": 30, "liquidity_isk": 1e9}
+            for item_id, hub_id in series
+        ]
+    )
+    await stats.upsert_bands(
+        [
+            {
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "window_days": 30,
+                "price_low": 90.0,
+                "price_high": 110.0,
+            }
+            for item_id, hub_id in series
+        ]
+    )
+    await SeriesForecastRepository(db_session).upsert_batch(
+        [
+            {
+                "item_id": item_id,
+                "hub_id": hub_id,
+                "level": 100.0,
+                "trend": 0.0,
+                "observations": 1,
+                "last_date": day,
+            }
+            for item_id, hub_id in series
+        ]
+    )
+
+    assert max(counts) <= MAX_BIND_PARAMS
+    rows = await stats.get_by_window(30)
+    assert len(rows) == 5000
+    assert all(r.count == 1 and r.liquidity_isk == 1e9 and r.price_high == 110.0 for r in rows)
+    assert len(await SeriesForecastRepository(db_session).get_all()) == 5000
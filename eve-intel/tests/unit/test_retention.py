@@ -0,0 +1,101 @@
+"""Tests for run retention and compaction."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.retention import RetentionJob
+from eve_intel.db.models import AnalyticsArbitrageItem, AnalyticsArbitrageRun, AnalyticsRunDiff
+from eve_intel.db.repositories import ArbitrageItemRepository
+
+NOW = datetime(2025, 4, 12, tzinfo=UTC)
+
+
+async def _run(session: AsyncSession, age_days: float, items: int) -> int:
+    run = AnalyticsArbitrageRun(
+        status="completed", created_at=NOW - timedelta(days=age_days), num_candidates=items
+    )
+    session.add(run)
+    await session.flush()
+    await ArbitrageItemRepository(session).insert_batch(
+        [
+            {
+                "run_id": run.run_id,
+                "item_id": i,
+                "from_hub_id": 1,
+                "to_hub_id": 2,
+                "buy_price": 100.0,
+                "sell_price": 110.0,
+                "spread_pct": 10.0,
+                "fees_total": 1.0,
+                "liquidity_24h": 1e6,
+                # Ties on EV, so the top N cut relies on the (ev_isk, id) key
+                "ev_isk": float(i // 2),
+                "net_margin_pct": 5.0,
+                "decay_score": 50.0,
+                "capital_required": 10.0,
+            }
+            for i in range(items)
+        ]
+    )
+    session.add(
+        AnalyticsRunDiff(
+            run_id=run.run_id, base_run_id=0, change="added", item_id=1, from_hub_id=1, to_hub_id=2
+        )
+    )
+    await session.commit()
+    return run.run_id
+
+
+async def _item_count(session: AsyncSession, run_id: int) -> int:
+    return await session.scalar(
+        select(func.count()).where(AnalyticsArbitrageItem.run_id == run_id)
+    )
+
+
+@pytest.mark.asyncio
+async def test_retention_horizons(db_session: AsyncSession) -> None:
+    """Test that old runs are downsampled, expired ones deleted and the latest kept whole."""
+    expired = await _run(db_session, 100, 20)
+    old = await _run(db_session, 10, 25)
+    recent = await _run(db_session, 1, 25)
+
+    job = RetentionJob(db_session, full_days=7, max_days=90, top_n=5, batch_size=4)
+    stats = await job.run(now=NOW)
+    db_session.expire_all()
+
+    assert stats.runs_deleted == 1
+    assert stats.runs_compacted == 1
+    assert stats.items_deleted == 20 + 20
+    assert await db_session.get(AnalyticsArbitrageRun, expired) is None
+    assert await db_session.scalar(
+        select(func.count()).where(AnalyticsRunDiff.run_id == expired)
+    ) == 0
+
+    # The old run keeps its top 5 by (EV, ID) and the full run's aggregates
+    kept = await ArbitrageItemRepository(db_session).get_by_run(old, limit=None)
+    assert sorted(row.item_id for row in kept) == [20, 21, 22, 23, 24]
+    run = await db_session.get(AnalyticsArbitrageRun, old)
+    assert run.compacted_at is not None
+    assert run.meta["compaction"]["items"] == 25
+    assert run.meta["compaction"]["kept"] == 5
+    assert run.meta["compaction"]["ev_max"] == 12.0
+
+    assert await _item_count(db_session, recent) == 25
+
+    # A second pass has nothing left to do
+    again = await RetentionJob(db_session, full_days=7, max_days=90, top_n=5).run(now=NOW)
+    assert again.runs_compacted == 0 and again.items_deleted == 0
+
+
+@pytest.mark.asyncio
+async def test_latest_run_never_compacted(db_session: AsyncSession) -> None:
+    """Test that the run read endpoints serve survives both horizons."""
+    latest = await _run(db_session, 200, 10)
+
+    stats = await RetentionJob(db_session, full_days=7, max_days=90, top_n=2).run(now=NOW)
+
+    assert stats.runs_deleted == 0 and stats.runs_compacted == 0
+    assert await _item_count(db_session, latest) == 10
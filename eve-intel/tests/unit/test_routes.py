@@ -0,0 +1,86 @@
+"""Tests for the hub route graph."""
+
+from pathlib import Path
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.routes import load_adjacency, load_route_graph, shortest_jumps
+
+
+def _write_jumps(path: Path) -> Path:
+    # 1 - 2 - 3 - 4, plus an isolated pair 8 - 9
+    path.write_text(
+        "fromRegionID,fromSolarSystemID,toRegionID,toSolarSystemID\n"
+        "1,1,1,2\n1,2,1,3\n1,3,1,4\n1,8,1,9\n"
+    )
+    return path
+
+
+def test_shortest_jumps(tmp_path: Path) -> None:
+    """Test BFS distances on an SDE-style adjacency file."""
+    adjacency = load_adjacency(_write_jumps(tmp_path / "jumps.csv"))
+    matrix = shortest_jumps(adjacency, [1, 4, 9])
+
+    assert list(matrix[0]) == [0, 3, -1]
+    assert list(matrix[1]) == [3, 0, -1]
+
+
+def test_route_graph_cache_and_annotate(tmp_path: Path) -> None:
+    """Test cached jump matrix reuse and per-jump EV annotation."""
+    jumps_file = str(_write_jumps(tmp_path / "jumps.csv"))
+    cache_dir = str(tmp_path / "cache")
+    hub_systems = {100: 1, 200: 4, 300: 9}
+
+    graph = load_route_graph(hub_systems, jumps_file, cache_dir)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    cached = load_route_graph(hub_systems, jumps_file, cache_dir)
+    assert cached.jumps(100, 200) == graph.jumps(100, 200) == 3
+    assert cached.jumps(100, 300) is None
+    assert cached.jumps(100, 999) is None
+
+    # A new gate (1 - 9) changes the file, so the matrix is rebuilt under a new key
+    with Path(jumps_file).open("a") as f:
+        f.write("1,1,1,9\n")
+    rebuilt = load_route_graph(hub_systems, jumps_file, cache_dir)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    assert rebuilt.jumps(100, 300) == 1
+
+    candidate = ArbitrageCandidate(
+        item_id=34,
+        from_hub_id=100,
+        to_hub_id=200,
+        buy_price=1.0,
+        sell_price=2.0,
+        spread_pct=100.0,
+        fees_total=0.0,
+        liquidity_24h=0.0,
+        ev_isk=300.0,
+        net_margin_pct=100.0,
+        decay_score=0.0,
+        capital_required=0.0,
+    )
+    graph.annotate([candidate])
+    assert candidate.jumps == 3
+    assert candidate.ev_per_jump == 100.0
+
+
+def test_route_graph_missing_file(tmp_path: Path) -> None:
+    """Test that a missing or unconfigured adjacency file disables the route graph."""
+    assert load_route_graph({100: 1}, str(tmp_path / "missing.csv"), str(tmp_path)) is None
+    assert load_route_graph({100: 1}, "", str(tmp_path)) is None
+
+
+def test_route_graph_truncated_cache_is_a_miss(tmp_path: Path) -> None:
+    """Test that a partly written cache file is rebuilt instead of failing the load."""
+    jumps_file = str(_write_jumps(tmp_path / "jumps.csv"))
+    cache_dir = tmp_path / "cache"
+    load_route_graph({100: 1, 200: 4}, jumps_file, str(cache_dir))
+    (cache_file,) = cache_dir.iterdir()
+    cache_file.write_text(cache_file.read_text()[:10])
+
+    graph = load_route_graph({100: 1, 200: 4}, jumps_file, str(cache_dir))
+
+    assert graph.jumps(100, 200) == 3
+    # Rewritten whole, with no temporary file left behind
+    assert [p.name for p in cache_dir.iterdir()] == [cache_file.name]
+    assert load_route_graph({100: 1, 200: 4}, jumps_file, str(cache_dir)).jumps(100, 200) == 3
@@ -0,0 +1,110 @@
+"""Tests for run-to-run diffs stored with each run."""
+
+from dataclasses import asdict, replace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate, ArbitrageEngine
+from eve_intel.analytics.diff import STORED_FIELDS, diff_candidates
+from eve_intel.analytics.latest import latest_run_cache
+from eve_intel.api.routers.arbitrage import get_run_diff
+from eve_intel.settings import settings
+
+
+def _candidate(item_id: int, ev: float, margin: float = 10.0) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=60003760,
+        to_hub_id=60008494,
+        buy_price=100.0,
+        sell_price=100.0 + margin,
+        spread_pct=margin,
+        fees_total=1.0,
+        liquidity_24h=1e6,
+        ev_isk=ev,
+        net_margin_pct=margin,
+        decay_score=50.0,
+        capital_required=1e5,
+    )
+
+
+def test_stored_fields_use_threshold() -> None:
+    """Test that only EV or margin moves beyond the threshold count as changed."""
+    base = [_candidate(1, 1000.0), _candidate(2, 1000.0), _candidate(3, 1000.0)]
+    new = [
+        replace(base[0], ev_isk=1040.0, buy_price=90.0),
+        replace(base[1], net_margin_pct=11.0),
+        _candidate(4, 500.0),
+    ]
+
+    diff = diff_candidates(base, new, 2, 1, rel_tol=0.05, fields=STORED_FIELDS)
+    assert [c.item_id for c in diff.added] == [4]
+    assert [c.item_id for c in diff.changed] == [2]
+    assert diff.removed == [(3, 60003760, 60008494)]
+
+    rows = {row["item_id"]: row for row in diff.as_rows()}
+    assert rows[2]["prev_net_margin_pct"] == 10.0 and rows[2]["net_margin_pct"] == 11.0
+    assert rows[3]["change"] == "removed" and rows[3]["ev_isk"] is None
+    assert rows[4]["change"] == "added" and rows[4]["prev_ev_isk"] is None
+
+
+@pytest.mark.asyncio
+async def test_save_stores_diff_against_previous_run(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that saving a run stores its diff and the endpoint serves it."""
+    monkeypatch.setattr(settings, "diff_change_pct", 5.0)
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+
+    first_id = await engine.save_run_results([_candidate(1, 1000.0), _candidate(2, 1000.0)])
+    await db_session.commit()
+    first = await get_run_diff(first_id, db_session)
+    assert first.base_run_id is None and not first.added
+
+    second_id = await engine.save_run_results([_candidate(1, 1200.0), _candidate(3, 900.0)])
+    await db_session.commit()
+    second = await get_run_diff(second_id, db_session)
+
+    assert second.base_run_id == first_id
+    assert second.change_pct == 5.0
+    assert [(c.item_id, c.prev_ev_isk, c.ev_isk) for c in second.changed] == [
+        (1, 1000.0, 1200.0)
+    ]
+    assert [c.item_id for c in second.added] == [3]
+    assert [c.item_id for c in second.removed] == [2]
+    latest_run_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_diff_base_not_behind_other_processes(db_session: AsyncSession) -> None:
+    """Test that a run saved elsewhere, unseen by the cache, is the one diffed against."""
+    from eve_intel.db.models import AnalyticsArbitrageItem
+    from eve_intel.db.repositories import ArbitrageItemRepository, ArbitrageRunRepository
+
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+    first_id = await engine.save_run_results([_candidate(1, 1000.0)])
+    await db_session.commit()
+
+    # Another process completes a run; this process's cache still holds the first
+    runs = ArbitrageRunRepository(db_session)
+    other_id = await runs.create_run()
+    other = asdict(_candidate(2, 1000.0))
+    columns = AnalyticsArbitrageItem.__table__.columns.keys()
+    await ArbitrageItemRepository(db_session).insert_batch(
+        [{"run_id": other_id, **{k: v for k, v in other.items() if k in columns}}]
+    )
+    await runs.complete_run(other_id, 1)
+    await db_session.commit()
+    assert latest_run_cache.current.run_id == first_id
+
+    third_id = await engine.save_run_results([_candidate(2, 1000.0), _candidate(3, 900.0)])
+    await db_session.commit()
+    third = await get_run_diff(third_id, db_session)
+
+    assert third.base_run_id == other_id
+    assert [c.item_id for c in third.added] == [3]
+    assert not third.removed
+    latest_run_cache.clear()
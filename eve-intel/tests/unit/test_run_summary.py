@@ -0,0 +1,92 @@
+"""Tests for per-run summary rows."""
+
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate, ArbitrageEngine
+from eve_intel.analytics.latest import latest_run_cache
+from eve_intel.analytics.summary import percentile, summarize_run
+from eve_intel.db.repositories import ArbitrageRunRepository, RunSummaryRepository
+from eve_intel.settings import settings
+
+
+def _candidate(item_id: int, to_hub_id: int, ev: float) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=60003760,
+        to_hub_id=to_hub_id,
+        buy_price=100.0,
+        sell_price=120.0,
+        spread_pct=20.0,
+        fees_total=5.0,
+        liquidity_24h=1e6,
+        ev_isk=ev,
+        net_margin_pct=ev / 100.0,
+        decay_score=50.0,
+        capital_required=1e5,
+    )
+
+
+def test_percentile_interpolates() -> None:
+    """Test linear interpolation between ranks, as percentile_cont does."""
+    values = [10.0, 20.0, 30.0, 40.0, 50.0]
+    assert percentile(values, 0.5) == 30.0
+    assert percentile(values, 0.9) == pytest.approx(46.0)
+    assert percentile(values, 1.0) == 50.0
+    assert percentile([], 0.5) is None
+
+
+def test_summarize_run() -> None:
+    """Test counts, EV aggregates, the best route per hub pair and the top cut."""
+    candidates = [
+        _candidate(1, 60008494, 100.0),
+        _candidate(2, 60008494, 300.0),
+        _candidate(1, 60011866, 200.0),
+        _candidate(3, 60011866, 400.0),
+    ]
+    created_at = datetime(2025, 4, 19, tzinfo=UTC)
+
+    row = summarize_run(7, created_at, candidates, top_n=2, stage_seconds={"score": 1.5})
+
+    assert row["candidates"] == 4 and row["items"] == 3 and row["hub_pairs"] == 2
+    assert row["ev_total"] == 1000.0
+    assert row["ev_p50"] == 250.0
+    assert row["ev_max"] == 400.0
+    assert row["capital_total"] == 4e5
+    assert [(p["to_hub_id"], p["item_id"], p["candidates"]) for p in row["best_by_pair"]] == [
+        (60011866, 3, 2),
+        (60008494, 2, 2),
+    ]
+    assert row["best_by_pair"][0]["ev_total"] == 600.0
+    assert [t["ev_isk"] for t in row["top"]] == [400.0, 300.0]
+    assert row["stage_seconds"] == {"score": 1.5}
+
+    empty = summarize_run(8, created_at, [], top_n=2)
+    assert empty["candidates"] == 0 and empty["ev_p90"] is None and empty["top"] == []
+
+
+@pytest.mark.asyncio
+async def test_save_writes_summary(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that saving a run writes its summary with the save stage timed."""
+    monkeypatch.setattr(settings, "summary_top_n", 1)
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+
+    run_id = await engine.save_run_results(
+        [_candidate(1, 60008494, 100.0), _candidate(2, 60008494, 300.0)]
+    )
+    await db_session.commit()
+
+    summary = await RunSummaryRepository(db_session).get_by_run(run_id)
+    assert summary.created_at == await ArbitrageRunRepository(db_session).get_created_at(run_id)
+    assert summary.candidates == 2
+    assert summary.ev_max == 300.0
+    assert [t["item_id"] for t in summary.top] == [2]
+    # The save stage, summary insert included, is recorded on the summary once it ends
+    assert summary.stage_seconds == engine.run_meta["stage_seconds"]
+    assert "save" in summary.stage_seconds
+    latest_run_cache.clear()
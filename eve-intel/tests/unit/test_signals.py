@@ -0,0 +1,138 @@
+"""Tests for the persistent arbitrage signal table."""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any, List, Sequence
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import (
+    ArbitrageCandidate,
+    ArbitrageEngine,
+    RunItemsNotStoredError,
+)
+from eve_intel.analytics.latest import latest_run_cache
+from eve_intel.db.models import AnalyticsArbitrageItem, AnalyticsArbitrageSignal
+from eve_intel.db.repositories import ArbitrageSignalRepository
+from eve_intel.settings import settings
+
+T0 = datetime(2025, 4, 1, tzinfo=UTC)
+
+
+def _row(item_id: int, ev: float) -> dict:
+    return {
+        "item_id": item_id,
+        "from_hub_id": 60003760,
+        "to_hub_id": 60008494,
+        "buy_price": 100.0,
+        "sell_price": 120.0,
+        "spread_pct": 20.0,
+        "fees_total": 5.0,
+        "liquidity_24h": 1e6,
+        "ev_isk": ev,
+        "net_margin_pct": 15.0,
+        "decay_score": 50.0,
+        "capital_required": 1e5,
+    }
+
+
+async def _signals(session: AsyncSession) -> dict:
+    result = await session.execute(select(AnalyticsArbitrageSignal))
+    return {s.item_id: s for s in result.scalars().all()}
+
+
+@pytest.mark.asyncio
+async def test_upsert_tracks_episodes(db_session: AsyncSession) -> None:
+    """Test first/last seen, run counts, retirement and new episodes after a gap."""
+    repo = ArbitrageSignalRepository(db_session)
+
+    await repo.upsert_run(1, T0, [_row(1, 100.0), _row(2, 200.0)])
+    await repo.upsert_run(2, T0 + timedelta(hours=1), [_row(1, 150.0)])
+    await repo.upsert_run(3, T0 + timedelta(hours=2), [_row(1, 120.0), _row(2, 250.0)])
+    db_session.expire_all()
+    signals = await _signals(db_session)
+
+    # Route 1 lasted the three runs, metrics are the last run's
+    assert signals[1].run_count == 3
+    assert signals[1].first_run_id == 1 and signals[1].last_run_id == 3
+    assert signals[1].first_seen.replace(tzinfo=UTC) == T0
+    assert signals[1].ev_isk == 120.0
+
+    # Route 2 was missing from run 2, so run 3 started a new episode
+    assert signals[2].active
+    assert signals[2].run_count == 1
+    assert signals[2].first_run_id == 3
+
+    await repo.upsert_run(4, T0 + timedelta(hours=3), [_row(2, 260.0)])
+    db_session.expire_all()
+    signals = await _signals(db_session)
+    assert not signals[1].active
+    assert signals[2].run_count == 2
+    assert [s.item_id for s in await repo.get_by_last_run(4)] == [2]
+
+
+@pytest.mark.asyncio
+async def test_large_run_upserts_in_batches(db_session: AsyncSession) -> None:
+    """Test that runs too large for one statement are written whole before retiring."""
+    repo = ArbitrageSignalRepository(db_session)
+    counts: List[int] = []
+
+    def record(_conn: Any, _cursor: Any, _statement: str, parameters: Sequence, *_: Any) -> None:
+        counts.append(len(parameters))
+
+    event.listen(db_session.bind.sync_engine, "before_cursor_execute", record)
+
+    await repo.upsert_run(1, T0, [_row(i, 100.0) for i in range(2500)])
+    await repo.upsert_run(2, T0 + timedelta(hours=1), [_row(i, 100.0) for i in range(100, 2500)])
+    db_session.expire_all()
+    signals = await _signals(db_session)
+
+    assert max(counts) <= 32767
+    assert len(signals) == 2500
+    assert not any(signals[i].active for i in range(100))
+    assert all(signals[i].active and signals[i].run_count == 2 for i in range(100, 2500))
+
+
+@pytest.mark.asyncio
+async def test_runs_without_items_load_from_signals(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that with per-run rows off, storage stays per route and only the latest run loads."""
+    monkeypatch.setattr(settings, "store_run_items", False)
+    latest_run_cache.clear()
+    engine = ArbitrageEngine(db_session)
+    candidates = [
+        ArbitrageCandidate(
+            item_id=i,
+            from_hub_id=60003760,
+            to_hub_id=60008494,
+            buy_price=100.0,
+            sell_price=120.0,
+            spread_pct=20.0,
+            fees_total=5.0,
+            liquidity_24h=1e6,
+            ev_isk=100.0 * i,
+            net_margin_pct=15.0,
+            decay_score=50.0,
+            capital_required=1e5,
+        )
+        for i in range(1, 4)
+    ]
+
+    first_id = await engine.save_run_results(candidates)
+    run_id = await engine.save_run_results(candidates[:2])
+
+    items = await db_session.scalar(select(func.count()).select_from(AnalyticsArbitrageItem))
+    assert items == 0
+    assert len(await _signals(db_session)) == 3
+
+    loaded = await engine.load_run(run_id)
+    assert [c.item_id for c in loaded] == [2, 1]
+
+    # The first run's routes 1 and 2 now belong to the second: no partial result
+    with pytest.raises(RunItemsNotStoredError, match=f"run {first_id} are not stored"):
+        await engine.load_run(first_id)
+    with pytest.raises(RunItemsNotStoredError, match="not stored"):
+        await engine.load_run_page(run_id, 10)
+    latest_run_cache.clear()
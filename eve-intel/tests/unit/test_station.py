@@ -0,0 +1,129 @@
+"""Tests for station trading analytics."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.arbitrage import ArbitrageEngine
+from eve_intel.analytics.books import build_books
+from eve_intel.analytics.fees import FeeProfile
+from eve_intel.analytics.latest import LatestRun, latest_run_cache
+from eve_intel.analytics.station import StationTradeCandidate, scan_station_trades
+from eve_intel.api.routers.arbitrage import get_station_trades
+
+
+def test_scan_station_trades_after_fees() -> None:
+    """Test that fees on both sides decide which spreads are tradeable."""
+    ts = datetime(2025, 1, 15, tzinfo=UTC)
+    books = build_books(
+        [
+            # Wide spread: 100 bid / 130 ask
+            (34, 1, 1, "buy", 100.0, 10, ts),
+            (34, 1, 2, "sell", 130.0, 10, ts),
+            # Spread smaller than fees: 100 bid / 105 ask
+            (35, 1, 3, "buy", 100.0, 10, ts),
+            (35, 1, 4, "sell", 105.0, 10, ts),
+            # One-sided book
+            (36, 1, 5, "sell", 50.0, 10, ts),
+        ]
+    )
+    profile = FeeProfile(name="test", broker_fee_pct=2.0, sales_tax_pct=4.0)
+
+    trades = scan_station_trades(
+        books, {(34, 1): 1000.0, (35, 1): 1000.0}, profile, 0.1, min_ev=0.0, min_margin=0.0
+    )
+
+    assert [t.item_id for t in trades] == [34]
+    trade = trades[0]
+    assert trade.fees_total == pytest.approx(100 * 0.02 + 130 * 0.06)
+    assert trade.units_per_day == pytest.approx(100.0)
+    assert trade.ev_isk == pytest.approx(100.0 * (130 - 100 - 9.8))
+    assert trade.net_margin_pct == pytest.approx((130 - 100 - 9.8) / 102 * 100)
+
+
+@pytest.mark.asyncio
+async def test_station_and_arbitrage_share_book_load(db_session: AsyncSession) -> None:
+    """Test that both engine modes run off one order book load."""
+    from eve_intel.db.repositories import (
+        OrderSnapshotRepository,
+        PriceHistoryRepository,
+        SeriesStatsRepository,
+    )
+
+    now = datetime.now(UTC)
+    await OrderSnapshotRepository(db_session).insert_batch(
+        [
+            {
+                "order_id": order_id,
+                "item_id": 34,
+                "hub_id": hub_id,
+                "side": side,
+                "price": price,
+                "qty": 1000,
+                "ts_snapshot": now,
+            }
+            for order_id, hub_id, side, price in [
+                (1, 60003760, "buy", 5.0),
+                (2, 60003760, "sell", 6.0),
+                (3, 60008494, "sell", 7.5),
+            ]
+        ]
+    )
+    await PriceHistoryRepository(db_session).upsert_batch(
+        [
+            {
+                "item_id": 34,
+                "hub_id": 60003760,
+                "date": now - timedelta(days=1),
+                "avg_price": 5.5,
+                "volume": 10_000_000,
+            }
+        ]
+    )
+
+    await SeriesStatsRepository(db_session).upsert_liquidity(
+        [
+            {"item_id": 34, "hub_id": hub_id, "window_days": 7, "liquidity_isk": 1.5e9}
+            for hub_id in (60003760, 60008494)
+        ]
+    )
+
+    engine = ArbitrageEngine(db_session)
+    arbitrage = await engine.find_arbitrage_opportunities(min_ev_isk=1.0, min_margin_pct=0.1)
+    books = engine._books
+
+    trades = await engine.find_station_trades(min_ev_isk=1.0, min_margin_pct=0.1)
+
+    assert engine._books is books
+    assert [c.to_hub_id for c in arbitrage] == [60008494]
+    assert [(t.item_id, t.hub_id) for t in trades] == [(34, 60003760)]
+    assert trades[0].daily_volume == pytest.approx(10_000_000)
+
+    # A saved run keeps the trades for GET /signals/station
+    latest_run_cache.clear()
+    run_id = await engine.save_run_results(arbitrage)
+    await db_session.commit()
+    run = await latest_run_cache.get(db_session)
+    assert run.run_id == run_id
+    assert [(t.item_id, t.hub_id) for t in run.station_trades] == [(34, 60003760)]
+    latest_run_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_station_endpoint_uses_latest_run(db_session: AsyncSession) -> None:
+    """Test that GET /station filters the cached run's trades instead of rerunning the engine."""
+    trades = [
+        StationTradeCandidate(34, 1, 100.0, 130.0, 30.0, 9.8, 20.0, 1e4, 100.0, ev, 1e4)
+        for ev in (2000.0, 500.0)
+    ]
+    latest_run_cache.clear()
+    latest_run_cache.publish(LatestRun(5, None, [], trades))
+
+    response = await get_station_trades(
+        min_ev=1000.0, min_margin=None, limit=10, session=db_session
+    )
+
+    assert response.run_id == 5
+    assert [s.ev_isk for s in response.signals] == [2000.0]
+    latest_run_cache.clear()
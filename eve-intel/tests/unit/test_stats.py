@@ -0,0 +1,207 @@
+"""Tests for incremental rolling statistics."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from eve_intel.analytics.risk import calculate_price_volatility
+from eve_intel.analytics.stats import (
+    ForecastUpdater,
+    HoltState,
+    RollingStats,
+    SeriesStatsUpdater,
+    liquidity_from_turnover,
+    load_forecast_drift,
+    load_liquidity,
+    load_price_bands,
+    load_volatility,
+    record_price_history,
+)
+from eve_intel.settings import settings
+
+
+def test_rolling_stats_matches_batch_volatility() -> None:
+    """Test sliding Welford window against a full recomputation."""
+    prices = [100.0, 104.0, 97.0, 110.0, 95.0, 101.0, 120.0, 99.0]
+    window = 3
+
+    stats = RollingStats()
+    for i, price in enumerate(prices):
+        if i >= window:
+            stats.remove(prices[i - window])
+        stats.add(price)
+
+        expected = calculate_price_volatility(prices[max(0, i - window + 1) : i + 1])
+        assert stats.cv_pct == pytest.approx(expected)
+
+
+def test_rolling_stats_edge_cases() -> None:
+    """Test empty and single-value windows."""
+    stats = RollingStats()
+    assert stats.cv_pct == 0.0
+
+    stats.add(50.0)
+    assert stats.cv_pct == 0.0
+
+    stats.remove(50.0)
+    assert stats.count == 0
+    assert stats.mean == 0.0
+
+
+@pytest.mark.asyncio
+async def test_updater_slides_window_per_day(db_session: AsyncSession) -> None:
+    """Test that daily updates match volatility over the stored window."""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    prices = [100.0, 104.0, 97.0, 110.0, 95.0, 101.0, 120.0, 99.0]
+    rows = [
+        {"item_id": 34, "hub_id": 60003760, "date": start + timedelta(days=i), "avg_price": p}
+        for i, p in enumerate(prices)
+    ]
+
+    # Seed with the first days, then feed one day at a time
+    await record_price_history(db_session, rows[:4])
+    updater = SeriesStatsUpdater(db_session, windows=[3])
+    await updater.apply(rows[:4])
+    for row in rows[4:]:
+        await record_price_history(db_session, [row])
+        assert await updater.apply([row]) == 1
+
+    # Re-applying an already folded day is a no-op
+    assert await updater.apply(rows[-1:]) == 0
+
+    volatility = await load_volatility(db_session, window_days=3)
+    assert volatility[(34, 60003760)] == pytest.approx(calculate_price_volatility(prices[-3:]))
+
+
+def test_liquidity_trims_outlier_days() -> None:
+    """Test that spikes are trimmed and missing days count as zero turnover."""
+    end = datetime(2025, 1, 10, tzinfo=UTC)
+    turnover = [100.0, 110.0, 90.0, 100.0, 105.0, 95.0, 100.0, 100.0, 100.0, 10_000.0]
+    rows = [(34, 1, end - timedelta(days=d), t) for d, t in enumerate(turnover)]
+    rows += [(35, 1, end, 500.0)]
+
+    liquidity = liquidity_from_turnover(rows, end, window_days=10, trim_pct=10.0)
+
+    # The 10k spike and the 90 low are dropped
+    assert liquidity[(34, 1)] == pytest.approx(810.0 / 8)
+    # One trading day in ten, the rest are zero and trimming drops the 500
+    assert liquidity[(35, 1)] == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_record_price_history_caches_liquidity(db_session: AsyncSession) -> None:
+    """Test that ingestion refreshes cached liquidity for the series."""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    await record_price_history(
+        db_session,
+        [
+            {
+                "item_id": 34,
+                "hub_id": 60003760,
+                "date": start + timedelta(days=d),
+                "avg_price": 5.0,
+                "volume": 1000,
+            }
+            for d in range(7)
+        ],
+    )
+
+    assert await load_liquidity(db_session) == {(34, 60003760): pytest.approx(5000.0)}
+
+
+@pytest.mark.asyncio
+async def test_record_price_history_caches_price_bands(db_session: AsyncSession) -> None:
+    """Test that ingestion refreshes the traded price band of the series."""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    await record_price_history(
+        db_session,
+        [
+            {
+                "item_id": 34,
+                "hub_id": 60003760,
+                "date": start + timedelta(days=d),
+                "avg_price": 5.0,
+                "min_price": 4.5 + d * 0.1,
+                "max_price": 5.5 - d * 0.1,
+                "volume": 1000,
+            }
+            for d in range(5)
+        ],
+    )
+
+    assert await load_price_bands(db_session) == {
+        (34, 60003760): (pytest.approx(4.5), pytest.approx(5.5))
+    }
+
+
+def test_holt_tracks_trend_and_gaps() -> None:
+    """Test that Holt picks up a linear trend and projects across missing days."""
+    state = HoltState(100.0)
+    for day in range(1, 60):
+        state.update(100.0 + 2.0 * day, 1.0, 0.5, 0.3)
+
+    assert state.trend == pytest.approx(2.0, rel=1e-3)
+    assert state.forecast(3.0) == pytest.approx(100.0 + 2.0 * 62, rel=1e-3)
+
+    # A three-day gap on trend barely moves the slope
+    state.update(100.0 + 2.0 * 62, 3.0, 0.5, 0.3)
+    assert state.trend == pytest.approx(2.0, rel=1e-3)
+    assert HoltState(1.0, -5.0).forecast(1.0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_forecasts_update_incrementally(db_session: AsyncSession) -> None:
+    """Test that ingestion updates forecasters in place and ignores replayed days."""
+    start = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    start -= timedelta(days=10)
+
+    def day(d: int) -> dict:
+        return {
+            "item_id": 34,
+            "hub_id": 60003760,
+            "date": start + timedelta(days=d),
+            "avg_price": 100.0 + 5.0 * d,
+            "volume": 1000,
+        }
+
+    await record_price_history(db_session, [day(d) for d in range(5)])
+    updater = ForecastUpdater(db_session)
+    assert await updater.apply([day(3), day(4)]) == 0
+    assert await updater.apply([day(5)]) == 1
+
+    # Six observations, rising: positive drift once warmed up
+    drift = await load_forecast_drift(
+        db_session, at=datetime.now(UTC) + timedelta(days=1), min_observations=6
+    )
+    assert drift[(34, 60003760)] > 0
+    assert await load_forecast_drift(db_session, min_observations=7) == {}
+
+
+@pytest.mark.asyncio
+async def test_updater_applies_overwritten_days(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that re-upserted days swap their price in the window instead of drifting."""
+    monkeypatch.setattr(settings, "stats_windows_days", "3")
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    prices = [100.0, 104.0, 97.0, 110.0, 95.0, 101.0, 120.0]
+
+    def row(day: int) -> dict:
+        return {
+            "item_id": 34,
+            "hub_id": 60003760,
+            "date": start + timedelta(days=day),
+            "avg_price": prices[day],
+        }
+
+    await record_price_history(db_session, [row(i) for i in range(5)])
+
+    # Day 3 is corrected after being folded, then the window slides past it
+    prices[3] = 130.0
+    await record_price_history(db_session, [row(3)])
+    for day in (5, 6):
+        await record_price_history(db_session, [row(day)])
+        volatility = await load_volatility(db_session, window_days=3)
+        expected = calculate_price_volatility(prices[day - 2 : day + 1])
+        assert volatility[(34, 60003760)] == pytest.approx(expected)
@@ -0,0 +1,109 @@
+"""Tests for run diffs and signal streaming."""
+
+import asyncio
+
+import pytest
+
+from eve_intel.analytics.arbitrage import ArbitrageCandidate
+from eve_intel.analytics.diff import diff_candidates
+from eve_intel.api.routers.stream import stream_signals
+from eve_intel.datasources.broker import LocalBroker, Subscription
+
+
+def _candidate(item_id: int, ev: float, to_hub: int = 60008494) -> ArbitrageCandidate:
+    return ArbitrageCandidate(
+        item_id=item_id,
+        from_hub_id=60003760,
+        to_hub_id=to_hub,
+        buy_price=100.0,
+        sell_price=120.0,
+        spread_pct=20.0,
+        fees_total=1.0,
+        liquidity_24h=1e9,
+        ev_isk=ev,
+        net_margin_pct=10.0,
+        decay_score=50.0,
+        capital_required=1e8,
+    )
+
+
+def test_diff_candidates_by_route() -> None:
+    """Test added, removed and changed routes between two runs."""
+    base = [_candidate(34, 1e8), _candidate(35, 2e8), _candidate(36, 3e8)]
+    new = [_candidate(37, 5e8), _candidate(35, 2e8), _candidate(36, 3.5e8)]
+
+    diff = diff_candidates(base, new, run_id=2, base_run_id=1)
+    message = diff.as_message()
+
+    assert [c.item_id for c in diff.added] == [37]
+    assert diff.removed == [(34, 60003760, 60008494)]
+    assert [c.item_id for c in diff.changed] == [36]
+    assert len(diff) == 3
+    assert message["removed"] == [[34, 60003760, 60008494]]
+    assert message["changed"][0]["ev_isk"] == 3.5e8
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_resync_instead_of_backlog() -> None:
+    """Test that a full per-client buffer is replaced by one resync message."""
+    subscription = Subscription(maxsize=2)
+    for run_id in range(5):
+        subscription.offer({"type": "diff", "run_id": run_id})
+
+    # 0 and 1 fill the buffer; 2 overflows it; 3 queues behind the resync; 4 overflows again
+    assert subscription.dropped == 5
+    assert await subscription.get(0.1) == {"type": "resync", "reason": "buffer_overflow"}
+    assert await subscription.get(0.01) is None
+
+    subscription.offer({"type": "diff", "run_id": 5})
+    assert (await subscription.get(0.1))["run_id"] == 5
+
+
+@pytest.mark.asyncio
+async def test_local_broker_fans_out() -> None:
+    """Test that every subscriber receives a published message."""
+    broker = LocalBroker(buffer_size=4)
+    first, second = broker.subscribe(), broker.subscribe()
+
+    await broker.publish({"type": "diff", "run_id": 1})
+    broker.unsubscribe(second)
+    await broker.publish({"type": "diff", "run_id": 2})
+
+    assert [(await first.get(0.1))["run_id"] for _ in range(2)] == [1, 2]
+    assert (await second.get(0.1))["run_id"] == 1
+    assert await second.get(0.01) is None
+
+
+class _Request:
+    def __init__(self) -> None:
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_pushes_diffs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test SSE framing of the hello, keep-alive and diff events."""
+    from eve_intel.api.routers import stream
+    from eve_intel.settings import settings
+
+    broker = LocalBroker(buffer_size=4)
+    monkeypatch.setattr(stream, "get_broker", lambda: broker)
+    monkeypatch.setattr(settings, "stream_heartbeat_seconds", 0.05)
+
+    request = _Request()
+    response = await stream_signals(request)
+    events = response.body_iterator
+
+    assert (await events.__anext__()).startswith("event: hello\n")
+    assert await events.__anext__() == ": keepalive\n\n"
+
+    await broker.publish({"type": "diff", "run_id": 7, "added": []})
+    event = await asyncio.wait_for(events.__anext__(), 1.0)
+    assert event.startswith("event: diff\nid: 7\ndata: {")
+
+    request.disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await events.__anext__()
+    assert not broker._subscriptions